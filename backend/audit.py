@@ -0,0 +1,235 @@
+"""Memory-bounded, append-only audit log.
+
+The most recent entries live in a fixed-size ring buffer. Entries pushed out
+of the ring are appended to JSONL segment files that rotate by size, so the
+process only ever holds the ring plus a sparse offset index per segment.
+Entry ids are contiguous, which lets cursor reads jump straight to the right
+segment and byte offset instead of materializing history. Ring entries are
+compact AuditEntry records; reads return plain dicts, or with ``raw=True``
+(id, JSON bytes) pairs: each ring entry's cached encoding and each segment's
+line as written, so unfiltered raw pages never decode or re-encode JSON.
+"""
+
+import bisect
+import json
+import os
+import threading
+from collections import deque
+from typing import List, Optional
+
+from records import AuditEntry
+from stores import Page, make_page
+
+# One (id, byte offset) index point per this many entries in a segment
+SPARSE_INDEX_EVERY = 256
+
+# Entries read per step when a filtered page has to scan for matches
+FILTER_SCAN_CHUNK = 512
+
+
+class _Segment:
+    __slots__ = ("path", "first_id", "last_id", "size", "offsets")
+
+    def __init__(self, path: str, first_id: int):
+        self.path = path
+        self.first_id = first_id
+        self.last_id = first_id - 1
+        self.size = 0
+        self.offsets: List[tuple] = []
+
+    def record(self, entry_id: int, length: int):
+        if (entry_id - self.first_id) % SPARSE_INDEX_EVERY == 0:
+            self.offsets.append((entry_id, self.size))
+        self.last_id = entry_id
+        self.size += length
+
+    def seek_point(self, entry_id: int) -> tuple:
+        """Nearest indexed (id, offset) at or before entry_id"""
+        i = bisect.bisect_right(self.offsets, (entry_id, float("inf"))) - 1
+        return self.offsets[max(i, 0)]
+
+
+class AuditLog:
+    """Ring buffer of recent audit entries backed by rotating segment files.
+
+    With no directory configured, entries leaving the ring are dropped, which
+    still bounds memory but keeps only the recent window.
+    """
+
+    def __init__(self, directory: Optional[str] = None, memory_entries: int = 1000,
+                 segment_bytes: int = 8 * 1024 * 1024, max_segments: int = 16):
+        self.directory = directory
+        self.memory_entries = max(1, memory_entries)
+        self.segment_bytes = segment_bytes
+        self.max_segments = max_segments
+        self._lock = threading.RLock()
+        self._ring: deque = deque()
+        self._segments: List[_Segment] = []
+        self._writer = None
+        self._next_id = 1
+
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            self._load_segments()
+
+    # ---- writes ----
+
+    def append(self, agent: str, action: str, details: str) -> dict:
+        with self._lock:
+            entry = AuditEntry.create(self._next_id, agent, action, details)
+            self._next_id += 1
+            self._ring.append(entry)
+            if len(self._ring) > self.memory_entries:
+                self._spill(self._ring.popleft())
+            return entry.to_dict()
+
+    def clear(self):
+        """Drop all entries, on disk and in memory; ids restart at 1"""
+        with self._lock:
+            self._close_writer()
+            for segment in self._segments:
+                self._remove(segment.path)
+            self._segments = []
+            self._ring.clear()
+            self._next_id = 1
+
+    def close(self):
+        """Spill the ring so a restart resumes with the full history"""
+        with self._lock:
+            if self.directory:
+                while self._ring:
+                    self._spill(self._ring.popleft())
+            self._close_writer()
+
+    def _spill(self, entry: AuditEntry):
+        if not self.directory:
+            return
+        line = entry.json() + b"\n"
+        segment = self._segments[-1] if self._segments and self._writer else None
+        if segment is None or segment.size + len(line) > self.segment_bytes:
+            segment = self._rotate(entry.id)
+        self._writer.write(line)
+        segment.record(entry.id, len(line))
+
+    def _rotate(self, first_id: int) -> _Segment:
+        self._close_writer()
+        path = os.path.join(self.directory, f"audit-{first_id:012d}.jsonl")
+        segment = _Segment(path, first_id)
+        self._segments.append(segment)
+        self._writer = open(path, "ab")
+        if self.max_segments and len(self._segments) > self.max_segments:
+            oldest = self._segments.pop(0)
+            self._remove(oldest.path)
+        return segment
+
+    def _close_writer(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def _load_segments(self):
+        """Rebuild the segment list and sparse indexes from files left by a previous run"""
+        names = sorted(n for n in os.listdir(self.directory) if n.startswith("audit-") and n.endswith(".jsonl"))
+        for name in names:
+            path = os.path.join(self.directory, name)
+            segment = _Segment(path, int(name[6:-6]))
+            with open(path, "rb") as f:
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break  # torn final write
+                    segment.record(segment.last_id + 1, len(line))
+            if segment.last_id >= segment.first_id:
+                self._segments.append(segment)
+            else:
+                self._remove(path)
+        if self._segments:
+            self._next_id = self._segments[-1].last_id + 1
+
+    # ---- reads ----
+
+    def first_id(self) -> int:
+        """Oldest retained entry id (equals next id when empty)"""
+        if self._segments:
+            return self._segments[0].first_id
+        if self._ring:
+            return self._ring[0].id
+        return self._next_id
+
+    def count(self) -> int:
+        return self._next_id - self.first_id()
+
+    def page(self, after: Optional[int] = None, before: Optional[int] = None, limit: int = 100,
+             agent: Optional[str] = None, raw: bool = False) -> Page:
+        """Entries in id order.
+
+        With ``after``: up to ``limit`` entries with id > after.
+        Otherwise: the newest ``limit`` entries with id < before (default: all).
+        ``has_more`` tells whether further entries exist in the paging direction.
+        An ``agent`` filter scans in chunks until the page is full.
+        With ``raw`` the items are (id, JSON bytes) pairs instead of dicts.
+        """
+        chunk = limit + 1 if agent is None else max(limit + 1, FILTER_SCAN_CHUNK)
+        rows = []
+        with self._lock:
+            first = self.first_id()
+            if after is not None:
+                position = max(after + 1, first)
+                while len(rows) <= limit and position < self._next_id:
+                    stop = min(position + chunk, self._next_id)
+                    rows.extend(self._read(position, stop, agent, raw))
+                    position = stop
+                return make_page(rows, limit, after)
+
+            position = min(before if before is not None else self._next_id, self._next_id)
+            while len(rows) <= limit and position > first:
+                start = max(position - chunk, first)
+                rows.extend(reversed(self._read(start, position, agent, raw)))
+                position = start
+        page = make_page(rows, limit, before)
+        page.items.reverse()
+        return page._replace(next_cursor=rows[0][0] if rows else before)
+
+    def _read(self, start: int, stop: int, agent: Optional[str], raw: bool) -> List[tuple]:
+        """(id, item) rows for entries with start <= id < stop (ids are contiguous) matching agent"""
+        rows = []
+        ring_first = self._ring[0].id if self._ring else self._next_id
+        if start < ring_first:
+            if self._writer is not None:
+                self._writer.flush()
+            rows.extend(self._read_segments(start, min(stop, ring_first), agent, raw))
+        if stop > ring_first:
+            for i in range(max(start, ring_first) - ring_first, stop - ring_first):
+                entry = self._ring[i]
+                if agent is None or entry.agent == agent:
+                    rows.append((entry.id, (entry.id, entry.json()) if raw else entry.to_dict()))
+        return rows
+
+    def _read_segments(self, start: int, stop: int, agent: Optional[str], raw: bool) -> List[tuple]:
+        rows = []
+        i = bisect.bisect_right([s.first_id for s in self._segments], start) - 1
+        for segment in self._segments[max(i, 0):]:
+            if segment.first_id >= stop:
+                break
+            wanted = max(start, segment.first_id)
+            entry_id, offset = segment.seek_point(wanted)
+            with open(segment.path, "rb") as f:
+                f.seek(offset)
+                for line in f:
+                    if entry_id >= stop:
+                        break
+                    if entry_id >= wanted:
+                        if raw and agent is None:
+                            rows.append((entry_id, (entry_id, line[:-1])))
+                        else:
+                            entry = json.loads(line)
+                            if agent is None or entry["agent"] == agent:
+                                rows.append((entry_id, (entry_id, line[:-1]) if raw else entry))
+                    entry_id += 1
+        return rows
@@ -0,0 +1,80 @@
+"""Process-pool fan-out for bulk email analysis"""
+
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, List, Optional, Sequence, Tuple
+
+BATCH_WORKERS = int(os.getenv("BATCH_WORKERS", "0")) or (os.cpu_count() or 1)
+BATCH_CHUNK_SIZE = max(1, int(os.getenv("BATCH_CHUNK_SIZE", "64")))
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _run_chunk(fn: Callable, items: Sequence) -> List[Tuple[bool, object]]:
+    """Apply fn to every item, capturing per-item errors instead of failing the chunk"""
+    results = []
+    for item in items:
+        try:
+            results.append((True, fn(item)))
+        except Exception as e:
+            results.append((False, str(e)))
+    return results
+
+
+def get_pool() -> ProcessPoolExecutor:
+    """Return the shared worker pool, starting it on first use"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=BATCH_WORKERS)
+        return _pool
+
+
+def shutdown_pool():
+    """Stop the worker pool (called on app shutdown)"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def _reset_pool(broken: ProcessPoolExecutor):
+    global _pool
+    with _pool_lock:
+        if _pool is broken:
+            _pool = None
+    broken.shutdown(wait=False, cancel_futures=True)
+
+
+def run_batch(fn: Callable, items: Sequence, chunk_size: int = BATCH_CHUNK_SIZE) -> List[Tuple[bool, object]]:
+    """Run fn over items across the process pool.
+
+    Returns one (ok, result_or_error) pair per item, in input order. fn must
+    be a picklable module-level function. Batches that fit in a single chunk
+    (or a single-worker deployment) run inline, since shipping them to a
+    worker would cost more than the work itself.
+    """
+    if len(items) <= chunk_size or BATCH_WORKERS <= 1:
+        return _run_chunk(fn, items)
+
+    chunks = [items[i:i + chunk_size] for i in range(0, len(items), chunk_size)]
+    pool = get_pool()
+    try:
+        futures = [pool.submit(_run_chunk, fn, chunk) for chunk in chunks]
+    except (BrokenProcessPool, RuntimeError):
+        _reset_pool(pool)
+        return _run_chunk(fn, items)
+
+    results = []
+    for chunk, future in zip(chunks, futures):
+        try:
+            results.extend(future.result())
+        except BrokenProcessPool:
+            # A worker died; recover this chunk inline and rebuild the pool next time
+            _reset_pool(pool)
+            results.extend(_run_chunk(fn, chunk))
+    return results
@@ -0,0 +1,83 @@
+"""CPU cost vs. transfer time of gzip levels on /tasks payloads.
+
+Builds a /tasks response body like the endpoint's (tasks carrying their
+email_text, as autonomous and approved tasks do), compresses it at every
+zlib level and reports the compressed size, the CPU time per response and
+the estimated time to deliver it (compression + transfer) on slow and fast
+links, next to sending it uncompressed.
+
+Run from the backend directory:
+
+    python benchmarks/bench_compression.py [--tasks 1000] [--rounds 5]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+import zlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastjson import dumps  # noqa: E402
+
+# Link speeds in Mbit/s
+LINKS = (1, 10, 100)
+
+SENDERS = ("Priya", "Marcus", "Elena", "Tom", "Aisha", "Jonas")
+SUBJECTS = ("the Q3 budget deck", "the client proposal", "the onboarding doc", "the release notes",
+            "the vendor contract", "the hiring plan")
+
+
+def email_text(rng: random.Random) -> str:
+    sender, subject = rng.choice(SENDERS), rng.choice(SUBJECTS)
+    return (f"Hi team,\n\nCould you please review {subject} and send your comments by "
+            f"{rng.choice(('Friday', 'Monday', 'tomorrow', 'end of day'))}? "
+            f"{sender} needs the final numbers before the meeting on the {rng.randrange(1, 29)}th. "
+            "Let me know if anything is unclear or if you need more context from the last thread.\n\n"
+            f"Thanks,\n{sender}\n\n> On a previous message: " + "quoted history line. " * rng.randrange(5, 30))
+
+
+def tasks_body(count: int, rng: random.Random) -> bytes:
+    tasks = [{
+        "id": i, "task": f"Review {rng.choice(SUBJECTS)}", "deadline": rng.choice(("Friday", "Monday", "Today")),
+        "priority": rng.choice(("High", "Medium", "Low")), "status": rng.choice(("Pending", "Completed")),
+        "reminder": "Reminder: follow up before the deadline", "created_at": f"2026-10-17T09:{i % 60:02d}:00.{i:06d}",
+        "autonomous": bool(i % 2), "calendar_event_id": None, "email_text": email_text(rng),
+        "approved_at": f"2026-10-17T10:{i % 60:02d}:00.{i:06d}", "approved_by": "system",
+    } for i in range(1, count + 1)]
+    return dumps({"tasks": tasks, "total": count, "pending": count // 2, "completed": count - count // 2,
+                  "next_cursor": None, "has_more": False})
+
+
+def transfer_ms(size: int, mbit: float) -> float:
+    return size * 8 / (mbit * 1e6) * 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tasks", type=int, default=1000)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    body = tasks_body(args.tasks, random.Random(args.seed))
+    links = "".join(f"{f'@{mbit}Mbit/s':>12}" for mbit in LINKS)
+    print(f"/tasks body: {args.tasks} tasks, {len(body)} bytes")
+    print(f"{'level':>5} {'bytes':>9} {'ratio':>6} {'cpu ms':>8}{links}   (ms to deliver)")
+    print(f"{'none':>5} {len(body):>9} {1:>6.1f} {0:>8.2f}"
+          + "".join(f"{transfer_ms(len(body), mbit):>12.1f}" for mbit in LINKS))
+    for level in range(1, 10):
+        start = time.perf_counter()
+        for _ in range(args.rounds):
+            compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+            out = compressor.compress(body) + compressor.flush()
+        cpu = (time.perf_counter() - start) / args.rounds * 1e3
+        assert zlib.decompress(out, 31) == body
+        print(f"{level:>5} {len(out):>9} {len(body) / len(out):>6.1f} {cpu:>8.2f}"
+              + "".join(f"{cpu + transfer_ms(len(out), mbit):>12.1f}" for mbit in LINKS))
+
+
+if __name__ == "__main__":
+    main()
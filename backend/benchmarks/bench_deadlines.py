@@ -0,0 +1,172 @@
+"""Property checks and benchmark for the deadline parser.
+
+Checks the parser against the original interpret_deadline on every phrase
+that version understood, round-trips formatted dates, and checks offsets,
+weekdays and explicit dates over many random "today" values. Then times the
+original substring chain against the parser with and without its memo.
+
+Run from the backend directory:
+
+    python benchmarks/bench_deadlines.py [--days 800] [--lookups 200000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from deadlines import _parse, parse_deadline  # noqa: E402
+
+
+def legacy_interpret(deadline_str: str, now: datetime) -> tuple:
+    """Original interpret_deadline body, with ``now`` passed in instead of read"""
+    deadline_lower = deadline_str.lower()
+
+    if "tomorrow" in deadline_lower:
+        target = now + timedelta(days=1)
+        return (target.strftime("%A, %B %d"), 1)
+
+    if "today" in deadline_lower:
+        return (now.strftime("%A, %B %d"), 0)
+
+    if "next monday" in deadline_lower or "monday" in deadline_lower:
+        days_ahead = 0 - now.weekday()
+        if days_ahead <= 0:
+            days_ahead += 7
+        target = now + timedelta(days=days_ahead)
+        return (target.strftime("%A, %B %d"), days_ahead)
+
+    days_map = {
+        "monday": 0, "tuesday": 1, "wednesday": 2, "thursday": 3,
+        "friday": 4, "saturday": 5, "sunday": 6
+    }
+
+    for day_name, day_num in days_map.items():
+        if day_name in deadline_lower:
+            days_ahead = day_num - now.weekday()
+            if days_ahead <= 0:
+                days_ahead += 7
+            target = now + timedelta(days=days_ahead)
+            return (target.strftime("%A, %B %d"), days_ahead)
+
+    if "end of week" in deadline_lower or "eow" in deadline_lower:
+        days_ahead = 4 - now.weekday()
+        if days_ahead <= 0:
+            days_ahead += 7
+        target = now + timedelta(days=days_ahead)
+        return (target.strftime("%A, %B %d"), days_ahead)
+
+    return (deadline_str, 1)
+
+
+WEEKDAY_NAMES = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+LEGACY_PHRASES = (
+    ["Today", "Tomorrow", "End Of Week", "EOW", "Report", "Month"]
+    + WEEKDAY_NAMES + [f"Next {day}" for day in WEEKDAY_NAMES]
+)
+NUMBER_WORDS = ["one", "two", "three", "four", "five", "six", "seven", "eight", "nine", "ten"]
+
+
+def check(failures: list, ok: bool, message: str):
+    if not ok and len(failures) < 20:
+        failures.append(message)
+    return ok
+
+
+def run_properties(days: int, seed: int) -> list:
+    rng = random.Random(seed)
+    failures = []
+    start = date(2025, 1, 1)
+    for offset in range(days):
+        today = start + timedelta(days=offset)
+        now = datetime.combine(today, datetime.min.time())
+
+        # 1. Same answer as the original on everything it understood
+        for phrase in LEGACY_PHRASES:
+            got = parse_deadline(phrase, today)
+            want = legacy_interpret(phrase, now)
+            same_year = got.date is None or got.date.year == today.year
+            check(failures, got.days_until == want[1] and (not same_year or got.formatted == want[0]),
+                  f"{today} {phrase!r}: {got.formatted, got.days_until} != {want}")
+
+        # 2. A formatted date parses back to the same day (also for past dates)
+        target = today + timedelta(days=rng.randint(-400, 800))
+        formatted = parse_deadline(target.isoformat(), today).formatted
+        check(failures, parse_deadline(formatted, today).date == target,
+              f"{today} round trip {target} via {formatted!r}")
+
+        # 3. Explicit dates: ISO exact; numeric and month-day without a year are the next such day
+        check(failures, parse_deadline(target.isoformat(), today).date == target, f"{today} iso {target}")
+        if target >= today and (target.month, target.day) != (2, 29):
+            upcoming = target if target < date(today.year + 1, today.month, min(today.day, 28)) else None
+            for phrase in (f"{target.month}/{target.day}", target.strftime("%B %d"), target.strftime("%d %b")):
+                got = parse_deadline(phrase, today).date
+                check(failures, got is not None and (got.month, got.day) == (target.month, target.day)
+                      and today <= got < today.replace(year=today.year + 1) + timedelta(days=1),
+                      f"{today} {phrase!r} -> {got}")
+                if upcoming:
+                    check(failures, got == upcoming, f"{today} {phrase!r} -> {got}, expected {upcoming}")
+        check(failures, parse_deadline(f"{target.year}-02-30", today).kind == "unparsed", f"{today} feb 30")
+
+        # 4. Offsets and weekdays
+        n = rng.randint(1, 10)
+        word = NUMBER_WORDS[n - 1]
+        check(failures, parse_deadline(f"in {n} days", today).days_until == n, f"{today} in {n} days")
+        check(failures, parse_deadline(f"within {word} weeks", today).days_until == 7 * n, f"{today} {word} weeks")
+        business = parse_deadline(f"in {n} business days", today).date
+        check(failures, business is not None and business.weekday() < 5
+              and sum((today + timedelta(days=i)).weekday() < 5 for i in range(1, (business - today).days + 1)) == n,
+              f"{today} {n} business days -> {business}")
+        weekday = rng.randrange(7)
+        got = parse_deadline(WEEKDAY_NAMES[weekday], today)
+        check(failures, got.date.weekday() == weekday and 1 <= got.days_until <= 7,
+              f"{today} {WEEKDAY_NAMES[weekday]} -> {got}")
+    return failures
+
+
+def best_of(fn, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main_bench():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--days", type=int, default=800, help="consecutive 'today' values to check")
+    parser.add_argument("--lookups", type=int, default=200000)
+    parser.add_argument("--seed", type=int, default=3)
+    args = parser.parse_args()
+
+    failures = run_properties(args.days, args.seed)
+    print(f"property checks over {args.days} days: {len(failures)} failures")
+    for failure in failures:
+        print("  " + failure)
+    if failures:
+        sys.exit(1)
+
+    # Deadline phrases as extract_task_info produces them, with a realistic amount of repetition
+    rng = random.Random(args.seed)
+    vocabulary = LEGACY_PHRASES + ["March 15", "4/15", "2026-11-02", "In 3 Days", "Evening", "Next Week"]
+    phrases = [rng.choice(vocabulary) for _ in range(args.lookups)]
+    now = datetime.now()
+    today = now.date()
+    uncached = _parse.__wrapped__
+
+    legacy = best_of(lambda: [legacy_interpret(p, datetime.now()) for p in phrases])
+    raw = best_of(lambda: [uncached(p, today) for p in phrases])
+    memo = best_of(lambda: [parse_deadline(p) for p in phrases])
+    print(f"{len(phrases)} lookups over {len(vocabulary)} distinct phrases:")
+    print(f"  original chain  : {legacy * 1e6 / len(phrases):6.2f} us/phrase")
+    print(f"  grammar, no memo: {raw * 1e6 / len(phrases):6.2f} us/phrase")
+    print(f"  parse_deadline  : {memo * 1e6 / len(phrases):6.2f} us/phrase ({legacy / memo:.2f}x vs original)")
+
+
+if __name__ == "__main__":
+    main_bench()
@@ -0,0 +1,198 @@
+"""Micro-benchmark: precompiled ExtractionEngine vs the original per-rule loops.
+
+Run from the backend directory:
+
+    python benchmarks/bench_extraction.py [--emails 5000] [--repeat 5]
+"""
+
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from extraction import (  # noqa: E402
+    ACTION_VERBS, DEADLINE_PATTERNS, HIGH_PRIORITY_KEYWORDS, LOW_PRIORITY_KEYWORDS,
+    ExtractionEngine,
+)
+import main  # noqa: E402
+
+
+def legacy_rules(email_text: str) -> tuple:
+    """Original rule loops only: (task, deadline, base_priority)"""
+    email_lower = email_text.lower()
+
+    task = None
+    for verb in ACTION_VERBS:
+        match = re.search(rf"{verb}[^.!?]*[.!?]", email_lower)
+        if match:
+            task = match.group(0)
+            break
+
+    deadline = None
+    for pattern in DEADLINE_PATTERNS:
+        match = re.search(pattern, email_lower)
+        if match:
+            deadline = match.group(1) if match.groups() else match.group(0)
+            break
+
+    priority = "Medium"
+    for keyword in HIGH_PRIORITY_KEYWORDS:
+        if keyword in email_lower:
+            priority = "High"
+            break
+
+    for keyword in LOW_PRIORITY_KEYWORDS:
+        if keyword in email_lower:
+            priority = "Low"
+            break
+
+    return task, deadline, priority
+
+
+def legacy_extract(email_text: str) -> dict:
+    """Original extract_task_info, kept verbatim as the reference"""
+    email_lower = email_text.lower()
+
+    task = "Review email and take action"
+    for verb in ACTION_VERBS:
+        pattern = rf"{verb}[^.!?]*[.!?]"
+        match = re.search(pattern, email_lower)
+        if match:
+            task = match.group(0).strip()
+            break
+
+    if task == "Review email and take action":
+        sentences = email_text.split('.')
+        if sentences:
+            task = sentences[0].strip()[:100]
+
+    deadline = "Not specified"
+    for pattern in DEADLINE_PATTERNS:
+        match = re.search(pattern, email_lower)
+        if match:
+            deadline = match.group(1) if match.groups() else match.group(0)
+            deadline = deadline.title()
+            break
+
+    priority = "Medium"
+    for keyword in HIGH_PRIORITY_KEYWORDS:
+        if keyword in email_lower:
+            priority = "High"
+            break
+
+    for keyword in LOW_PRIORITY_KEYWORDS:
+        if keyword in email_lower:
+            priority = "Low"
+            break
+
+    actual_deadline, days_until = main.interpret_deadline(deadline) if deadline != "Not specified" else (deadline, 999)
+    priority = main.apply_priority_rules({"deadline": actual_deadline}, email_text, priority)
+
+    draft_reply = f"""Thank you for your email. 
+
+I have received your request to {task.lower().rstrip('.')}. 
+
+I will ensure this is handled {
+        'immediately' if priority == 'High' else 'as soon as possible' if priority == 'Medium' else 'at my earliest convenience'
+}.
+
+{'Please let me know if you need any additional information.' if priority != 'High' else 'I appreciate your patience and will prioritize this accordingly.'}
+
+Best regards"""
+
+    reminder_time = "09:00 AM"
+    if days_until == 0:
+        reminder_time = "02:00 PM (today)"
+    elif days_until == 1:
+        reminder_time = "09:00 AM (tomorrow)"
+
+    return {
+        "task": task,
+        "deadline": actual_deadline,
+        "priority": priority,
+        "draftReply": draft_reply,
+        "reminder": f"Reminder scheduled for {reminder_time}",
+        "days_until": days_until
+    }
+
+
+FILLER = [
+    "Hope you are doing well", "Following up on our call", "The team met yesterday",
+    "Numbers look good this quarter", "Thanks again for the help", "See the notes below",
+    "We discussed the roadmap at length", "Let me know what you think",
+]
+PHRASES = [
+    "by Friday", "by end of March 3", "by 4/15", "due on June 12", "deadline: 7/1",
+    "before end of week", "by tomorrow", "by this evening", "by next week", "before Monday",
+]
+KEYWORDS = HIGH_PRIORITY_KEYWORDS + LOW_PRIORITY_KEYWORDS + ["fyi", "heads up", "preview"]
+
+
+def synthetic_corpus(count: int, seed: int = 7) -> list:
+    """Build a reproducible corpus of emails of mixed length and content"""
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(count):
+        parts = []
+        for _ in range(rng.randint(2, 30)):
+            roll = rng.random()
+            if roll < 0.15:
+                sentence = f"Please {rng.choice(ACTION_VERBS)} the {rng.choice(['report', 'deck', 'budget', 'PR'])} {rng.choice(PHRASES)}"
+            elif roll < 0.25:
+                sentence = f"This is {rng.choice(KEYWORDS)}"
+            else:
+                sentence = rng.choice(FILLER)
+            parts.append(sentence + rng.choice([".", "!", "?", ".", ""]))
+        text = " ".join(parts)
+        corpus.append(text.upper() if rng.random() < 0.05 else text)
+    return corpus
+
+
+def bench(fn, corpus, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for email in corpus:
+            fn(email)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main_bench():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--emails", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    corpus = synthetic_corpus(args.emails)
+    # Time the analysis itself, not the result cache in front of it
+    extract_task_info = main.extract_task_info.__wrapped__
+    extraction_engine = ExtractionEngine()
+
+    mismatches = sum(
+        1 for email in corpus
+        if legacy_rules(email) != extraction_engine.extract(email)
+        or legacy_extract(email) != extract_task_info(email)
+    )
+    print(f"corpus: {len(corpus)} emails, mismatches vs legacy: {mismatches}")
+    if mismatches:
+        sys.exit(1)
+
+    for label, legacy_fn, engine_fn in (
+        ("rule matching", legacy_rules, extraction_engine.extract),
+        ("extract_task_info", legacy_extract, extract_task_info),
+    ):
+        legacy = bench(legacy_fn, corpus, args.repeat)
+        engine = bench(engine_fn, corpus, args.repeat)
+        print(f"{label}:")
+        print(f"  legacy loops : {legacy * 1e6 / len(corpus):8.1f} us/email")
+        print(f"  engine       : {engine * 1e6 / len(corpus):8.1f} us/email")
+        print(f"  speedup      : {legacy / engine:8.2f}x")
+
+
+if __name__ == "__main__":
+    main_bench()
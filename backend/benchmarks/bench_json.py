@@ -0,0 +1,77 @@
+"""Rendering list responses: FastAPI's default path vs. the fastjson path.
+
+For /tasks-style pages, compares jsonable_encoder + Starlette's JSONResponse
+(what a returned dict went through before) with FastJSONResponse rendering
+the page directly. For /audit pages, also times splicing the entries' cached
+encodings (the second and later reads of the same ring entries).
+
+Run from the backend directory:
+
+    python benchmarks/bench_json.py [--items 1000] [--rounds 50]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from starlette.responses import JSONResponse  # noqa: E402
+
+from fastjson import FastJSONResponse, FragmentList, orjson  # noqa: E402
+from records import AuditEntry  # noqa: E402
+
+
+def task(i: int) -> dict:
+    return {
+        "id": i, "task": f"Review the deck for thread {i}", "deadline": "Friday", "priority": "High",
+        "status": "Pending", "reminder": "Reminder: due in 2 days", "created_at": "2026-10-17T09:30:00.123456",
+        "autonomous": bool(i % 2), "calendar_event_id": None,
+        "email_text": "Hi team, please review the attached deck and send comments by Friday. " * 5,
+        "approved_at": "2026-10-17T09:31:00.654321", "approved_by": "system",
+    }
+
+
+def timed(label: str, rounds: int, items: int, render):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        body = render()
+    elapsed = (time.perf_counter() - start) / rounds
+    print(f"{label:<36} {elapsed * 1e3:8.2f} ms/page  {elapsed / items * 1e6:7.2f} us/item  {len(body)} bytes")
+    return body
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=1000)
+    parser.add_argument("--rounds", type=int, default=50)
+    args = parser.parse_args()
+    print(f"orjson: {'yes' if orjson is not None else 'no (stdlib fallback)'}")
+
+    tasks = [task(i) for i in range(1, args.items + 1)]
+    page = {"tasks": tasks, "total": len(tasks), "pending": len(tasks), "completed": 0,
+            "next_cursor": None, "has_more": False}
+    old = timed("tasks: jsonable_encoder + JSONResponse", args.rounds, args.items,
+                lambda: JSONResponse(jsonable_encoder(page)).body)
+    new = timed("tasks: FastJSONResponse", args.rounds, args.items, lambda: FastJSONResponse(page).body)
+    assert json.loads(old) == json.loads(new)
+
+    entries = [AuditEntry.create(i, "Task Agent", "create_task", f"Created task: {i}") for i in range(1, args.items + 1)]
+
+    def audit(logs):
+        return {"logs": logs, "total": len(entries), "next_cursor": None, "prev_cursor": 1, "has_more": False}
+
+    old = timed("audit: jsonable_encoder + JSONResponse", args.rounds, args.items,
+                lambda: JSONResponse(jsonable_encoder(audit([e.to_dict() for e in entries]))).body)
+    timed("audit: FastJSONResponse (dicts)", args.rounds, args.items,
+          lambda: FastJSONResponse(audit([e.to_dict() for e in entries])).body)
+    new = timed("audit: cached fragments", args.rounds, args.items,
+                lambda: FastJSONResponse(audit(FragmentList(e.json() for e in entries))).body)
+    assert json.loads(old) == json.loads(new)
+
+
+if __name__ == "__main__":
+    main()
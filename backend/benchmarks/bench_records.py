@@ -0,0 +1,121 @@
+"""Memory of dict records vs. the compact record types.
+
+Builds the same tasks and audit entries both ways, measures the heap they
+take with tracemalloc and reports bytes per record and per million records.
+Task email bodies are drawn from --distinct-emails different texts, so the
+blob table's deduplication shows up when emails repeat (threads, forwards,
+batch re-runs); pass --distinct-emails 0 for every body to be unique.
+
+Run from the backend directory:
+
+    python benchmarks/bench_records.py [--records 200000] [--distinct-emails 1000]
+"""
+
+import argparse
+import gc
+import os
+import random
+import sys
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from records import AuditEntry, BlobTable, TaskRecord  # noqa: E402
+
+PRIORITIES = ("High", "Medium", "Low")
+DEADLINES = ("Today", "Tomorrow", "Friday", "Monday", "Not specified")
+AGENTS = ("Email Agent", "Decision Agent", "Calendar Agent", "Task Agent", "Orchestrator")
+ACTIONS = ("extract_task", "assign_priority", "suggest_time", "create_task", "workflow_complete")
+
+
+def email_body(i: int) -> str:
+    return (f"Hi team, following up on thread {i}: please review the attached deck and send "
+            f"your comments by Friday. " + "Context and quoted history. " * 20)
+
+
+def task_dicts(count: int, distinct: int, rng: random.Random):
+    start = datetime(2026, 1, 1)
+    for i in range(1, count + 1):
+        # Fresh strings each time, as they would arrive from parsed requests
+        stamp = (start + timedelta(seconds=i, microseconds=rng.randrange(1_000_000))).isoformat()
+        body = email_body(rng.randrange(distinct) if distinct else i)
+        yield {
+            "id": i,
+            "task": f"Review the deck for thread {i}",
+            "deadline": "".join(rng.choice(DEADLINES)),
+            "priority": "".join(rng.choice(PRIORITIES)),
+            "status": "".join("Pending"),
+            "reminder": f"Reminder: due {i % 7} days from now",
+            "created_at": stamp,
+            "autonomous": bool(i % 2),
+            "calendar_event_id": None,
+            "email_text": "".join(body),
+            "approved_at": stamp[:],
+            "approved_by": "".join(("system", "user")[i % 2]),
+        }
+
+
+def audit_dicts(count: int, rng: random.Random):
+    start = datetime(2026, 1, 1)
+    for i in range(1, count + 1):
+        yield {
+            "id": i,
+            "timestamp": (start + timedelta(seconds=i, microseconds=rng.randrange(1_000_000))).isoformat(),
+            "agent": "".join(rng.choice(AGENTS)),
+            "action": "".join(rng.choice(ACTIONS)),
+            "details": f"Created task: {i}",
+        }
+
+
+def measure(build):
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    gc.collect()
+    return after - before
+
+
+def report(name: str, count: int, old: int, new: int):
+    print(f"{name:<8} dict {old / count:8.0f} B/record   compact {new / count:8.0f} B/record   "
+          f"per million: {old / count * 1e6 / 2**20:8.1f} MiB -> {new / count * 1e6 / 2**20:8.1f} MiB "
+          f"({old / max(new, 1):.1f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--records", type=int, default=200_000)
+    parser.add_argument("--distinct-emails", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    def old_tasks():
+        return list(task_dicts(args.records, args.distinct_emails, random.Random(args.seed)))
+
+    def new_tasks():
+        blobs = BlobTable()
+        records = [TaskRecord.from_dict(d, blobs) for d in task_dicts(args.records, args.distinct_emails,
+                                                                      random.Random(args.seed))]
+        return records, blobs
+
+    def old_audit():
+        return list(audit_dicts(args.records, random.Random(args.seed)))
+
+    def new_audit():
+        return [AuditEntry.from_dict(d) for d in audit_dicts(args.records, random.Random(args.seed))]
+
+    # Same input must come back unchanged
+    records, _ = new_tasks()
+    assert [r.to_dict() for r in records[:1000]] == old_tasks()[:1000]
+    del records
+
+    report("tasks", args.records, measure(old_tasks), measure(new_tasks))
+    report("audit", args.records, measure(old_audit), measure(new_audit))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""Benchmark: vectorized batch priority scoring vs the per-email keyword loops.
+
+Run from the backend directory:
+
+    python benchmarks/bench_scoring.py [--emails 100000] [--repeat 3]
+"""
+
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scoring import (  # noqa: E402
+    IMPORTANCE_KEYWORDS, LOW_PRIORITY_TERMS, URGENCY_KEYWORDS, VIP_PATTERNS, np, score_batch, score_email,
+)
+
+
+def legacy_score(email_text: str) -> dict:
+    """Original /priority/score body, kept verbatim as the reference"""
+    email_lower = email_text.lower()
+
+    scores = {
+        "urgency_score": 0,
+        "importance_score": 0,
+        "deadline_score": 0,
+        "sender_score": 0,
+        "keyword_score": 0
+    }
+
+    reasons = []
+
+    urgent_keywords = {
+        "urgent": 30, "asap": 30, "immediately": 35, "critical": 40,
+        "emergency": 40, "now": 25, "rush": 25, "deadline": 15,
+        "time-sensitive": 20, "quick": 15
+    }
+    for keyword, score in urgent_keywords.items():
+        if keyword in email_lower:
+            scores["urgency_score"] = max(scores["urgency_score"], score)
+            reasons.append(f"Found urgency keyword: '{keyword}' (+{score})")
+
+    important_keywords = {
+        "important": 20, "priority": 25, "key": 15, "critical": 30,
+        "essential": 20, "required": 15, "mandatory": 25, "must": 15
+    }
+    for keyword, score in important_keywords.items():
+        if keyword in email_lower:
+            scores["importance_score"] = max(scores["importance_score"], score)
+            reasons.append(f"Found importance keyword: '{keyword}' (+{score})")
+
+    deadline_match = re.search(r"(by|due|deadline)\s+(.+?)(?:\.|$)", email_lower)
+    if deadline_match:
+        deadline_text = deadline_match.group(2).strip()
+        if "today" in deadline_text:
+            scores["deadline_score"] = 50
+            reasons.append("Deadline: Today (+50)")
+        elif "tomorrow" in deadline_text:
+            scores["deadline_score"] = 45
+            reasons.append("Deadline: Tomorrow (+45)")
+        elif any(day in deadline_text for day in ["monday", "tuesday", "wednesday", "thursday", "friday"]):
+            scores["deadline_score"] = 30
+            reasons.append("Deadline: This week (+30)")
+        elif "next week" in deadline_text:
+            scores["deadline_score"] = 15
+            reasons.append("Deadline: Next week (+15)")
+
+    vip_patterns = ["ceo", "cto", "cfo", "director", "vp ", "president", "founder", "boss"]
+    for pattern in vip_patterns:
+        if pattern in email_lower[:200]:
+            scores["sender_score"] = 20
+            reasons.append(f"VIP sender detected: '{pattern}' (+20)")
+            break
+
+    low_priority = ["fyi", "for your information", "just letting you know",
+                    "heads up", "when possible", "at your leisure"]
+    is_low_priority = any(term in email_lower for term in low_priority)
+
+    if is_low_priority:
+        scores["urgency_score"] = max(0, scores["urgency_score"] - 30)
+        scores["importance_score"] = max(0, scores["importance_score"] - 20)
+        reasons.append("Low priority indicators found (FYI/Info)")
+
+    total_score = sum(scores.values())
+
+    if total_score >= 70:
+        priority_level = "High"
+    elif total_score >= 40:
+        priority_level = "Medium"
+    else:
+        priority_level = "Low"
+
+    decision_explanation = f"AI calculated priority score: {total_score}/100 → {priority_level} priority"
+
+    return {
+        "priority_level": priority_level,
+        "total_score": total_score,
+        "scores": scores,
+        "reasons": reasons,
+        "decision_explanation": decision_explanation,
+        "is_low_priority": is_low_priority
+    }
+
+
+FILLER = [
+    "Hope you are doing well", "Following up on our call", "The team met yesterday",
+    "Numbers look good this quarter", "Thanks again for the help", "See the notes below",
+    "We discussed the roadmap at length", "Let me know what you think", "İstanbul office update",
+]
+DEADLINES = ["by today", "by tomorrow", "due Friday", "deadline next week", "by the end of the month"]
+VOCABULARY = list(URGENCY_KEYWORDS) + list(IMPORTANCE_KEYWORDS) + VIP_PATTERNS + LOW_PRIORITY_TERMS
+
+
+def synthetic_corpus(count: int, seed: int = 11) -> list:
+    """Reproducible emails mixing filler, scoring vocabulary and deadline phrases"""
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(count):
+        parts = []
+        for _ in range(rng.randint(2, 25)):
+            roll = rng.random()
+            if roll < 0.2:
+                sentence = f"This is {rng.choice(VOCABULARY)}"
+            elif roll < 0.3:
+                sentence = f"Please send it {rng.choice(DEADLINES)}"
+            else:
+                sentence = rng.choice(FILLER)
+            parts.append(sentence + rng.choice([".", "!", "\n", ". ", ""]))
+        text = " ".join(parts)
+        corpus.append(text.upper() if rng.random() < 0.05 else text)
+    return corpus
+
+
+def best_of(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main_bench():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--emails", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    corpus = synthetic_corpus(args.emails)
+    expected = [legacy_score(email) for email in corpus]
+    mismatches = sum(1 for email, want in zip(corpus, expected) if score_email(email) != want)
+    mismatches += sum(1 for got, want in zip(score_batch(corpus), expected) if got != want)
+    print(f"corpus: {len(corpus)} emails, numpy: {np is not None}, mismatches vs legacy: {mismatches}")
+    if mismatches:
+        sys.exit(1)
+
+    legacy = best_of(lambda: [legacy_score(email) for email in corpus], args.repeat)
+    batch = best_of(lambda: score_batch(corpus), args.repeat)
+    print(f"  per-email loops : {legacy * 1e6 / len(corpus):8.1f} us/email")
+    print(f"  score_batch     : {batch * 1e6 / len(corpus):8.1f} us/email")
+    print(f"  speedup         : {legacy / batch:8.2f}x")
+
+
+if __name__ == "__main__":
+    main_bench()
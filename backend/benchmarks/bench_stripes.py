@@ -0,0 +1,78 @@
+"""Thread churn against the striped metrics and telemetry histograms.
+
+Starts and joins many short-lived threads that each record once (as anyio's
+threadpool does when idle workers retire), then checks that the exited
+threads' stripes were folded away, that totals and series are still exact,
+and how long a read takes afterwards.
+
+Run from the backend directory:
+
+    python benchmarks/bench_stripes.py [--threads 5000]
+"""
+
+import argparse
+import gc
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from metrics import StripedMetrics  # noqa: E402
+from telemetry import Histogram  # noqa: E402
+
+# Live stripes allowed after the churn: this thread's plus a few stragglers
+MAX_LIVE_STRIPES = 4
+
+
+def churn(record, threads: int):
+    for _ in range(threads):
+        thread = threading.Thread(target=record)
+        thread.start()
+        thread.join()
+    gc.collect()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, default=5000)
+    args = parser.parse_args()
+    failed = False
+
+    metrics = StripedMetrics(("emails", "tasks"))
+    now = time.time()
+    metrics.record({"emails": 1}, now)
+    churn(lambda: metrics.record({"emails": 1, "tasks": 2}, now), args.threads)
+    started = time.perf_counter()
+    totals = metrics.totals()
+    minute = metrics.series("minute", now)[-1][1]
+    read_ms = (time.perf_counter() - started) * 1000
+    live = len(metrics._stripes)
+    print(f"StripedMetrics: {live} live stripes after {args.threads} threads, read {read_ms:.2f} ms, "
+          f"totals {totals}")
+    if live > MAX_LIVE_STRIPES:
+        failed = True
+    if totals != {"emails": args.threads + 1, "tasks": 2 * args.threads}:
+        failed = True
+    if minute != [args.threads + 1, 2 * args.threads]:
+        print(f"  minute slot {minute}")
+        failed = True
+
+    histogram = Histogram()
+    churn(lambda: histogram.observe(0.003), args.threads)
+    started = time.perf_counter()
+    cumulative, total = histogram.snapshot()
+    read_ms = (time.perf_counter() - started) * 1000
+    live = len(histogram._stripes)
+    print(f"Histogram: {live} live stripes after {args.threads} threads, read {read_ms:.2f} ms, "
+          f"count {cumulative[-1]}")
+    if live > MAX_LIVE_STRIPES or cumulative[-1] != args.threads or abs(total - 0.003 * args.threads) > 1e-6:
+        failed = True
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
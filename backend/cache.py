@@ -0,0 +1,173 @@
+"""LRU + TTL result cache for email analysis.
+
+Results are keyed on a hash of the email text plus the current date, since
+deadline interpretation is relative to today, and on the tenant, since
+tenants can have their own keyword rules. The whole cache is dropped
+the first time it is touched after midnight, so no entry computed yesterday
+is ever served.
+
+Callers get their own mutable copy of a result. Entries hold the result's
+orjson encoding, so a hit is one orjson.loads (several times cheaper than a
+deep copy of the same dict); results orjson cannot encode exactly (non-str
+keys, non-JSON types), or all of them without orjson, are deep-copied.
+"""
+
+import copy
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+from functools import wraps
+from typing import Callable, Dict, Optional
+
+from tenancy import current_tenant
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - deep copies instead
+    orjson = None
+
+ANALYSIS_CACHE_SIZE = int(os.getenv("ANALYSIS_CACHE_SIZE", "4096"))
+ANALYSIS_CACHE_TTL_SECONDS = float(os.getenv("ANALYSIS_CACHE_TTL_SECONDS", "3600"))
+
+
+def text_key(text: str) -> bytes:
+    # The exact text: analyzers react to whitespace (the "vp " VIP pattern), so no normalization is safe
+    return hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+
+
+def freeze(value) -> tuple:
+    """Snapshot of a result that later changes to it cannot reach"""
+    if orjson is not None:
+        try:
+            return (True, orjson.dumps(value))
+        except TypeError:
+            pass
+    return (False, copy.deepcopy(value))
+
+
+def thaw(frozen: tuple):
+    """A fresh mutable copy of a frozen result"""
+    encoded, payload = frozen
+    return orjson.loads(payload) if encoded else copy.deepcopy(payload)
+
+
+class ResultCache:
+    """Thread-safe LRU cache with per-entry TTL and hit/miss counters"""
+
+    def __init__(self, name: str, maxsize: int = 4096, ttl: float = 3600):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._day = date.today()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def _roll_day(self):
+        today = date.today()
+        if today != self._day:
+            self._day = today
+            if self._entries:
+                self._entries.clear()
+                self.invalidations += 1
+
+    def get(self, key: bytes):
+        """Cached value for key (in the current tenant), or None"""
+        with self._lock:
+            self._roll_day()
+            full_key = (key, current_tenant(), self._day)
+            entry = self._entries.get(full_key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[full_key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(full_key)
+            self.hits += 1
+        return thaw(value)
+
+    def put(self, key: bytes, value):
+        if self.maxsize <= 0:
+            return
+        value = freeze(value)
+        with self._lock:
+            self._roll_day()
+            full_key = (key, current_tenant(), self._day)
+            self._entries[full_key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(full_key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations
+        }
+
+    def cached(self, text_of: Callable = lambda text: text,
+               cacheable: Callable[[dict], bool] = lambda result: True):
+        """Decorator caching fn's result under the email text picked out by text_of.
+
+        Results rejected by ``cacheable`` (e.g. error responses) are not stored.
+        """
+        def decorator(fn):
+            @wraps(fn)
+            def wrapper(*args, **kwargs):
+                if self.maxsize <= 0:
+                    return fn(*args, **kwargs)
+                key = text_key(text_of(*args, **kwargs))
+                result = self.get(key)
+                if result is None:
+                    result = fn(*args, **kwargs)
+                    if cacheable(result):
+                        self.put(key, result)
+                return result
+            return wrapper
+        return decorator
+
+
+_caches: Dict[str, ResultCache] = {}
+
+
+def get_cache(name: str, maxsize: Optional[int] = None, ttl: Optional[float] = None) -> ResultCache:
+    """Named cache, created on first use with the configured size and TTL"""
+    if name not in _caches:
+        _caches[name] = ResultCache(
+            name,
+            ANALYSIS_CACHE_SIZE if maxsize is None else maxsize,
+            ANALYSIS_CACHE_TTL_SECONDS if ttl is None else ttl,
+        )
+    return _caches[name]
+
+
+def cache_stats() -> Dict[str, dict]:
+    return {name: cache.stats() for name, cache in _caches.items()}
+
+
+def clear_caches():
+    for cache in _caches.values():
+        cache.clear()
@@ -0,0 +1,170 @@
+"""Gzip response compression with the stdlib zlib encoder.
+
+Responses are compressed when the client accepts gzip, the content type is
+compressible and the body is at least GZIP_MIN_SIZE bytes. A single-message
+body is compressed in one go (on a worker thread once it is large enough to
+stall the event loop); streamed bodies (NDJSON batches) go through one
+compressor, flushed per chunk so clients still receive every line promptly.
+Event streams are left alone: EventSource clients and proxies expect them
+unencoded.
+
+Strong ETags name one representation, so a compressed response carries
+``"<etag>-gzip"``; the suffix is stripped from If-None-Match before the app
+compares tags and put back on the 304.
+"""
+
+import os
+import zlib
+from typing import Optional, Set
+
+import anyio
+from starlette.datastructures import Headers, MutableHeaders
+
+GZIP_MIN_SIZE = int(os.getenv("GZIP_MIN_SIZE", "1024"))
+# Level 6 delivers a 1000-task /tasks page fastest on 1-10 Mbit/s links; 1-3 win
+# only on fast links (see benchmarks/bench_compression.py)
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "6"))
+
+# Bodies at least this large are compressed off the event loop
+OFFLOAD_BYTES = 64 * 1024
+
+COMPRESSIBLE_TYPES = (
+    "application/json", "application/x-ndjson", "application/javascript",
+    "text/plain", "text/html", "text/css", "text/csv",
+)
+
+_VARIANT = "-gzip"
+
+
+def accepts_gzip(accept_encoding: str) -> bool:
+    """Whether an Accept-Encoding value allows gzip (explicitly or via *, with q > 0)"""
+    for coding in accept_encoding.split(","):
+        name, _, params = coding.partition(";")
+        if name.strip().lower() not in ("gzip", "*"):
+            continue
+        q = params.strip().lower()
+        if not q.startswith("q="):
+            return True
+        try:
+            return float(q[2:]) > 0
+        except ValueError:
+            return False
+    return False
+
+
+def _variant_tag(etag: str) -> str:
+    return etag[:-1] + _VARIANT + '"'
+
+
+class GZipMiddleware:
+    """Pure ASGI middleware compressing eligible HTTP responses"""
+
+    def __init__(self, app, minimum_size: int = GZIP_MIN_SIZE, level: int = GZIP_LEVEL,
+                 content_types=COMPRESSIBLE_TYPES):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.level = level
+        self.content_types = tuple(content_types)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not accepts_gzip(Headers(scope=scope).get("accept-encoding", "")):
+            await self.app(scope, receive, send)
+            return
+        scope, requested = self._strip_variants(scope)
+        await self.app(scope, receive, _GZipResponder(self, send, requested).send)
+
+    @staticmethod
+    def _strip_variants(scope) -> tuple:
+        """Scope whose If-None-Match names the identity tags, and the tags that were gzip variants"""
+        headers = Headers(scope=scope)
+        value = headers.get("if-none-match")
+        if not value or _VARIANT not in value:
+            return scope, set()
+        requested, tags = set(), []
+        for tag in value.split(","):
+            tag = tag.strip()
+            if tag.endswith(_VARIANT + '"'):
+                tag = tag[:-len(_VARIANT) - 1] + '"'
+                requested.add(tag)
+            tags.append(tag)
+        raw = [(k, v) for k, v in scope["headers"] if k != b"if-none-match"]
+        raw.append((b"if-none-match", ", ".join(tags).encode("latin-1")))
+        return {**scope, "headers": raw}, requested
+
+    def compressor(self):
+        return zlib.compressobj(self.level, zlib.DEFLATED, 31)  # wbits 31: gzip container
+
+    def compress(self, body: bytes) -> bytes:
+        compressor = self.compressor()
+        return compressor.compress(body) + compressor.flush()
+
+
+class _GZipResponder:
+    """Per-response state: holds the start message until the first body chunk decides"""
+
+    def __init__(self, middleware: GZipMiddleware, send, requested: Set[str]):
+        self.middleware = middleware
+        self._send = send
+        self.requested = requested
+        self.start: Optional[dict] = None
+        self.eligible = False
+        self.compressor = None
+        self.started = False
+
+    async def send(self, message):
+        if message["type"] == "http.response.start":
+            self.start = message
+            headers = Headers(raw=message["headers"])
+            content_type = headers.get("content-type", "").partition(";")[0].strip().lower()
+            self.eligible = (message["status"] not in (204, 304) and "content-encoding" not in headers
+                             and content_type in self.middleware.content_types)
+            if message["status"] == 304:
+                etag = headers.get("etag")
+                if etag in self.requested:
+                    MutableHeaders(scope=message)["etag"] = _variant_tag(etag)
+            if not self.eligible:
+                await self._start()
+            return
+
+        if message["type"] != "http.response.body" or not self.eligible:
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if not self.started:
+            if not more_body and len(body) < self.middleware.minimum_size:
+                await self._start()
+                await self._send(message)
+                return
+            self._encode_headers()
+            if not more_body:
+                if len(body) >= OFFLOAD_BYTES:
+                    body = await anyio.to_thread.run_sync(self.middleware.compress, body)
+                else:
+                    body = self.middleware.compress(body)
+                MutableHeaders(scope=self.start)["content-length"] = str(len(body))
+                await self._start()
+                await self._send({"type": "http.response.body", "body": body})
+                return
+            self.compressor = self.middleware.compressor()
+            await self._start()
+
+        data = self.compressor.compress(body)
+        data += self.compressor.flush(zlib.Z_SYNC_FLUSH if more_body else zlib.Z_FINISH)
+        await self._send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+    def _encode_headers(self):
+        headers = MutableHeaders(scope=self.start)
+        headers["content-encoding"] = "gzip"
+        headers.add_vary_header("Accept-Encoding")
+        if "content-length" in headers:
+            del headers["content-length"]
+        etag = headers.get("etag")
+        if etag and etag.startswith('"'):
+            headers["etag"] = _variant_tag(etag)
+
+    async def _start(self):
+        if not self.started:
+            self.started = True
+            await self._send(self.start)
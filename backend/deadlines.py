@@ -0,0 +1,205 @@
+"""Deadline phrase parser behind interpret_deadline.
+
+Understands relative phrases ("today", "tomorrow", "end of week", "next
+week"), weekday names, "in 3 days" / "within 2 weeks" offsets, month-day
+dates ("March 15", "15th of March", "Friday, October 23, 2026"), numeric
+US dates ("3/15", "3/15/27") and ISO dates ("2026-11-02"). Explicit dates
+win over relative words, so a date formatted by ``Deadline.formatted``
+parses back to the same day.
+
+Results depend on the current date, so they are memoized per
+(phrase, today); the memo is dropped the first time it is used on a new day.
+"""
+
+import os
+import re
+from datetime import date, timedelta
+from functools import lru_cache
+from typing import NamedTuple, Optional
+
+DEADLINE_CACHE_SIZE = int(os.getenv("DEADLINE_CACHE_SIZE", "4096"))
+
+# Days reported for phrases that name no recognizable date (treated as due soon)
+UNPARSED_DAYS = 1
+
+# Longer "in N days" offsets are not taken as deadlines
+MAX_OFFSET_DAYS = 3660
+
+MONTHS = {
+    "january": 1, "february": 2, "march": 3, "april": 4, "may": 5, "june": 6, "july": 7,
+    "august": 8, "september": 9, "october": 10, "november": 11, "december": 12,
+    "jan": 1, "feb": 2, "mar": 3, "apr": 4, "jun": 6, "jul": 7, "aug": 8,
+    "sep": 9, "sept": 9, "oct": 10, "nov": 11, "dec": 12,
+}
+
+WEEKDAYS = {
+    "monday": 0, "tuesday": 1, "wednesday": 2, "thursday": 3, "friday": 4, "saturday": 5, "sunday": 6,
+    "mon": 0, "tue": 1, "tues": 1, "wed": 2, "thu": 3, "thur": 3, "thurs": 3, "fri": 4, "sat": 5, "sun": 6,
+}
+
+NUMBER_WORDS = {
+    "a": 1, "an": 1, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5,
+    "six": 6, "seven": 7, "eight": 8, "nine": 9, "ten": 10,
+}
+
+# Relative phrase -> (kind, argument); see _relative_date
+RELATIVE = {
+    "today": ("days", 0), "tonight": ("days", 0), "this evening": ("days", 0), "evening": ("days", 0),
+    "end of day": ("days", 0), "end of the day": ("days", 0), "eod": ("days", 0),
+    "tomorrow": ("days", 1), "day after tomorrow": ("days", 2),
+    "end of week": ("weekday", 4), "end of the week": ("weekday", 4), "eow": ("weekday", 4),
+    "next week": ("weekday", 0),
+    "end of month": ("month_end", 0), "end of the month": ("month_end", 0), "eom": ("month_end", 0),
+}
+
+
+def _alternation(words) -> str:
+    # Longest first, so "sept" is tried before "sep" and "day after tomorrow" before "tomorrow"
+    return "|".join(re.escape(w) for w in sorted(words, key=len, reverse=True))
+
+
+_MONTH = _alternation(MONTHS)
+_ORDINAL = r"(?:st|nd|rd|th)?"
+_YEAR = r"(?:,?\s+(\d{4}))?"
+
+# Grammar rules in precedence order: explicit dates, offsets, relative words, weekdays
+_ISO = re.compile(r"\b(\d{4})-(\d{1,2})-(\d{1,2})\b")
+_NUMERIC = re.compile(r"\b(\d{1,2})/(\d{1,2})(?:/(\d{4}|\d{2}))?\b")
+_MONTH_DAY = re.compile(rf"\b({_MONTH})\.?\s+(\d{{1,2}}){_ORDINAL}\b{_YEAR}")
+_DAY_MONTH = re.compile(rf"\b(\d{{1,2}}){_ORDINAL}\s+(?:of\s+)?({_MONTH})\b{_YEAR}")
+_OFFSET = re.compile(
+    rf"\b(?:in|within)\s+(\d+|{_alternation(NUMBER_WORDS)})\s+(business\s+|working\s+)?(day|week)s?\b"
+)
+_RELATIVE = re.compile(rf"\b({_alternation(RELATIVE)})\b")
+_WEEKDAY = re.compile(rf"\b({_alternation(WEEKDAYS)})\b")
+
+
+class Deadline(NamedTuple):
+    """A parsed deadline; ``date`` is None when the phrase named no date"""
+
+    phrase: str
+    date: Optional[date]
+    days_until: int
+    kind: str  # iso | numeric | month_day | offset | relative | weekday | unparsed
+
+    @property
+    def formatted(self) -> str:
+        """Display form: "Friday, October 23", else the phrase.
+
+        The year is added for past dates and dates in another year, so the
+        result always parses back to the same day.
+        """
+        if self.date is None:
+            return self.phrase
+        today = self.date - timedelta(days=self.days_until)
+        if self.days_until >= 0 and self.date.year == today.year:
+            return self.date.strftime("%A, %B %d")
+        return self.date.strftime("%A, %B %d, %Y")
+
+
+def _next_weekday(today: date, weekday: int) -> date:
+    """Next occurrence of weekday after today (1-7 days ahead)"""
+    return today + timedelta(days=(weekday - today.weekday()) % 7 or 7)
+
+
+def _add_business_days(today: date, days: int) -> date:
+    current = today
+    while days > 0:
+        current += timedelta(days=1)
+        if current.weekday() < 5:
+            days -= 1
+    return current
+
+
+def _calendar_date(today: date, year: Optional[str], month: int, day: int) -> Optional[date]:
+    """Date for month/day; without a year, the next such day on or after today"""
+    try:
+        if year:
+            return date(int(year) + (2000 if len(year) == 2 else 0), month, day)
+        target = date(today.year, month, day)
+        if target < today:
+            target = date(today.year + 1, month, day)
+        return target
+    except ValueError:
+        # Out-of-range month/day, or Feb 29 in the wrong year
+        return None
+
+
+def _relative_date(today: date, phrase: str) -> date:
+    kind, arg = RELATIVE[phrase]
+    if kind == "days":
+        return today + timedelta(days=arg)
+    if kind == "weekday":
+        return _next_weekday(today, arg)
+    first_of_next = date(today.year + today.month // 12, today.month % 12 + 1, 1)
+    return first_of_next - timedelta(days=1)
+
+
+def _match(text: str, today: date):
+    """(date, kind) for the first grammar rule that yields a valid date, or None"""
+    for m in _ISO.finditer(text):
+        target = _calendar_date(today, m.group(1), int(m.group(2)), int(m.group(3)))
+        if target:
+            return target, "iso"
+    for m in _NUMERIC.finditer(text):
+        target = _calendar_date(today, m.group(3), int(m.group(1)), int(m.group(2)))
+        if target:
+            return target, "numeric"
+    for pattern, month_group, day_group in ((_MONTH_DAY, 1, 2), (_DAY_MONTH, 2, 1)):
+        for m in pattern.finditer(text):
+            target = _calendar_date(today, m.group(3), MONTHS[m.group(month_group)], int(m.group(day_group)))
+            if target:
+                return target, "month_day"
+    m = _OFFSET.search(text)
+    if m:
+        count = int(m.group(1)) if m.group(1).isdigit() else NUMBER_WORDS[m.group(1)]
+        if count * (7 if m.group(3) == "week" else 1) > MAX_OFFSET_DAYS:
+            return None
+        if m.group(3) == "week":
+            return today + timedelta(weeks=count), "offset"
+        if m.group(2):
+            return _add_business_days(today, count), "offset"
+        return today + timedelta(days=count), "offset"
+    m = _RELATIVE.search(text)
+    if m:
+        return _relative_date(today, m.group(1)), "relative"
+    m = _WEEKDAY.search(text)
+    if m:
+        return _next_weekday(today, WEEKDAYS[m.group(1)]), "weekday"
+    return None
+
+
+@lru_cache(maxsize=DEADLINE_CACHE_SIZE)
+def _parse(phrase: str, today: date) -> Deadline:
+    found = _match(" ".join(phrase.lower().split()), today)
+    if found is None:
+        return Deadline(phrase, None, UNPARSED_DAYS, "unparsed")
+    target, kind = found
+    return Deadline(phrase, target, (target - today).days, kind)
+
+
+_memo_day: Optional[date] = None
+
+
+def parse_deadline(phrase: str, today: Optional[date] = None) -> Deadline:
+    """Parse a deadline phrase relative to today (memoized per phrase and day)"""
+    global _memo_day
+    if today is None:
+        today = date.today()
+        if today != _memo_day:
+            # Entries from earlier days can never be hit again
+            _parse.cache_clear()
+            _memo_day = today
+    return _parse(phrase, today)
+
+
+def deadline_cache_stats() -> dict:
+    info = _parse.cache_info()
+    lookups = info.hits + info.misses
+    return {
+        "size": info.currsize,
+        "maxsize": info.maxsize,
+        "hits": info.hits,
+        "misses": info.misses,
+        "hit_rate": round(info.hits / lookups, 4) if lookups else 0.0
+    }
@@ -0,0 +1,173 @@
+"""In-process pub/sub bus behind the /events/stream change feed.
+
+Publishers call ``event_bus.publish(topic, data)`` from any thread. Every
+event gets a sequence number and is kept in a bounded replay buffer, so a
+client that reconnects with ``Last-Event-ID`` only receives what it missed.
+Each subscriber has its own bounded queue; a client that falls too far
+behind is disconnected with an ``overflow`` event instead of letting its
+backlog grow without limit. Events are stamped with the publishing
+request's tenant and only delivered to subscribers of the same tenant.
+
+Listeners registered with ``add_listener`` see every event synchronously,
+on the publishing thread and in its context, which lets the app derive
+state (such as the automation metrics) from what it publishes.
+"""
+
+import asyncio
+import os
+import threading
+from collections import deque
+from datetime import datetime
+from typing import AsyncIterator, Callable, List, Optional
+
+from fastjson import dumps
+from tenancy import current_tenant
+
+EVENT_HISTORY = int(os.getenv("EVENT_HISTORY", "1000"))
+EVENT_QUEUE_SIZE = int(os.getenv("EVENT_QUEUE_SIZE", "256"))
+EVENT_HEARTBEAT_SECONDS = float(os.getenv("EVENT_HEARTBEAT_SECONDS", "15"))
+
+
+class Subscription:
+    """One client's bounded queue, filled on the event loop it was created on"""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, max_queue: int, topics: Optional[set] = None,
+                 tenant: Optional[str] = None):
+        self.loop = loop
+        self.max_queue = max_queue
+        self.topics = topics
+        self.tenant = tenant
+        self.overflowed = False
+        self._queue: deque = deque()
+        self._ready = asyncio.Event()
+
+    def wants(self, topic: str, tenant: Optional[str] = None) -> bool:
+        if tenant != self.tenant:
+            return False
+        return self.topics is None or topic.split(".", 1)[0] in self.topics
+
+    def offer(self, event: dict):
+        """Queue an event (runs on the subscriber's loop)"""
+        if self.overflowed:
+            return
+        if len(self._queue) >= self.max_queue:
+            self.overflowed = True
+        else:
+            self._queue.append(event)
+        self._ready.set()
+
+    async def get(self, timeout: float) -> List[dict]:
+        """Wait up to timeout for queued events; an empty list means the wait timed out"""
+        if not self._queue and not self.overflowed:
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return []
+        self._ready.clear()
+        events = list(self._queue)
+        self._queue.clear()
+        return events
+
+
+class EventBus:
+    """Sequence-numbered publish/subscribe with a replay buffer"""
+
+    def __init__(self, history: int = 1000, max_queue: int = 256):
+        self.max_queue = max_queue
+        self._lock = threading.Lock()
+        self._history: deque = deque(maxlen=max(1, history))
+        self._subscribers: List[Subscription] = []
+        self._listeners: List[Callable[[dict], None]] = []
+        self._seq = 0
+
+    @property
+    def last_seq(self) -> int:
+        return self._seq
+
+    def publish(self, topic: str, data, tenant: Optional[str] = None) -> int:
+        """Record an event for tenant (default: the current one) and fan it out; returns its sequence number"""
+        tenant = tenant or current_tenant()
+        with self._lock:
+            self._seq += 1
+            event = {"seq": self._seq, "topic": topic, "timestamp": datetime.now().isoformat(), "data": data,
+                     "tenant": tenant}
+            self._history.append(event)
+            # Scheduling under the lock keeps every subscriber's queue in sequence order
+            for sub in self._subscribers:
+                if sub.wants(topic, tenant):
+                    try:
+                        sub.loop.call_soon_threadsafe(sub.offer, event)
+                    except RuntimeError:
+                        pass  # loop already closed; unsubscribe will follow
+            seq = self._seq
+        # Outside the lock, so listeners may publish themselves
+        for listener in self._listeners:
+            listener(event)
+        return seq
+
+    def add_listener(self, listener: Callable[[dict], None]):
+        """Call listener(event) after every publish, on the publishing thread"""
+        self._listeners.append(listener)
+
+    def subscribe(self, since: Optional[int] = None, topics: Optional[set] = None, tenant: Optional[str] = None):
+        """Register a subscriber for tenant's events (default: the current tenant) on the running loop.
+
+        Returns (subscription, replay) where replay holds buffered events
+        after ``since``, or None when ``since`` is older than the buffer and
+        the client has to reload full state.
+        """
+        sub = Subscription(asyncio.get_running_loop(), self.max_queue, topics, tenant or current_tenant())
+        with self._lock:
+            replay: Optional[List[dict]] = []
+            if since is not None and since < self._seq:
+                oldest = self._history[0]["seq"] if self._history else self._seq + 1
+                if since + 1 < oldest:
+                    replay = None
+                else:
+                    replay = [e for e in self._history if e["seq"] > since and sub.wants(e["topic"], e["tenant"])]
+            self._subscribers.append(sub)
+        return sub, replay
+
+    def unsubscribe(self, sub: Subscription):
+        with self._lock:
+            if sub in self._subscribers:
+                self._subscribers.remove(sub)
+
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+
+def format_sse(event: dict) -> str:
+    """Encode one bus event as a Server-Sent Events frame"""
+    data = dumps(event["data"]).decode("utf-8")
+    return f"id: {event['seq']}\nevent: {event['topic']}\ndata: {data}\n\n"
+
+
+async def sse_stream(bus: EventBus, since: Optional[int] = None, topics: Optional[set] = None,
+                     heartbeat: float = EVENT_HEARTBEAT_SECONDS) -> AsyncIterator[str]:
+    """SSE frames for one client: replay after ``since``, then live events"""
+    sub, replay = bus.subscribe(since, topics)
+    try:
+        yield "retry: 3000\n\n"
+        if replay is None:
+            yield format_sse({"seq": bus.last_seq, "topic": "reset", "data": {"reason": "history_expired"}})
+        else:
+            for event in replay:
+                yield format_sse(event)
+        while True:
+            events = await sub.get(heartbeat)
+            if not events and not sub.overflowed:
+                yield ": keepalive\n\n"
+                continue
+            for event in events:
+                yield format_sse(event)
+            if sub.overflowed:
+                last = events[-1]["seq"] if events else since
+                yield format_sse({"seq": last or 0, "topic": "overflow", "data": {"reason": "client_too_slow"}})
+                return
+    finally:
+        bus.unsubscribe(sub)
+
+
+# Shared bus for the app process
+event_bus = EventBus(EVENT_HISTORY, EVENT_QUEUE_SIZE)
@@ -0,0 +1,53 @@
+"""JSON encoding for responses: orjson when installed, else the stdlib.
+
+``FastJSONResponse`` is the app's default response class. List endpoints
+return it directly, which skips FastAPI's ``jsonable_encoder`` pass (their
+items are already plain JSON types), and can hand it pre-encoded item
+fragments - e.g. the cached encodings of immutable audit entries - which
+are spliced into the body instead of being encoded again.
+"""
+
+import json
+from typing import Iterable
+
+from starlette.responses import Response
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - stdlib fallback
+    orjson = None
+
+
+def dumps(content) -> bytes:
+    """Compact UTF-8 JSON (same output shape as Starlette's JSONResponse)"""
+    if orjson is not None:
+        return orjson.dumps(content, default=str, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":"),
+                      default=str).encode("utf-8")
+
+
+class FragmentList(list):
+    """Already-encoded JSON values (bytes) to be emitted as a JSON array"""
+
+    def __init__(self, fragments: Iterable[bytes] = ()):
+        super().__init__(fragments)
+
+    def encode(self) -> bytes:
+        return b"[" + b",".join(self) + b"]"
+
+
+def encode(content) -> bytes:
+    """dumps(), splicing FragmentList values of a top-level dict in verbatim"""
+    if type(content) is dict and any(type(value) is FragmentList for value in content.values()):
+        return b"{" + b",".join(
+            dumps(key) + b":" + (value.encode() if type(value) is FragmentList else dumps(value))
+            for key, value in content.items()
+        ) + b"}"
+    return dumps(content)
+
+
+class FastJSONResponse(Response):
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        return encode(content)
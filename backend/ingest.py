@@ -0,0 +1,332 @@
+"""Streaming ingestion of NDJSON / mbox mailbox exports.
+
+Records are parsed line by line, pushed through the agent pipeline in small
+batches and written back out as NDJSON, so memory stays bounded by the batch
+size no matter how large the export is.
+
+CLI usage (from the backend directory):
+
+    python ingest.py export.ndjson > results.ndjson
+    python ingest.py mailbox.mbox --format mbox -o results.ndjson
+    cat export.ndjson | python ingest.py -
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from email import policy
+from email.parser import BytesParser
+from typing import AsyncIterator, Awaitable, Callable, Iterable, Iterator, List, Optional, Tuple
+
+from starlette.responses import StreamingResponse
+
+INGEST_BATCH_SIZE = max(1, int(os.getenv("INGEST_BATCH_SIZE", "32")))
+INGEST_MAX_RECORD_BYTES = int(os.getenv("INGEST_MAX_RECORD_BYTES", str(1024 * 1024)))
+
+# (email_text, error) - exactly one of the two is set
+Record = Tuple[Optional[str], Optional[str]]
+
+
+class NDJSONParser:
+    """One JSON record per line: an object with emailText/body/text, or a bare string"""
+
+    def feed(self, line: bytes) -> Optional[Record]:
+        line = line.strip()
+        if not line:
+            return None
+        if len(line) > INGEST_MAX_RECORD_BYTES:
+            return (None, f"Record exceeds {INGEST_MAX_RECORD_BYTES} bytes")
+        try:
+            obj = json.loads(line)
+        except ValueError as e:
+            return (None, f"Invalid JSON: {e}")
+        if isinstance(obj, str):
+            return (obj, None)
+        if isinstance(obj, dict):
+            for key in ("emailText", "body", "text"):
+                if isinstance(obj.get(key), str):
+                    return (obj[key], None)
+        return (None, "Record has no emailText")
+
+    def close(self) -> Optional[Record]:
+        return None
+
+
+class MboxParser:
+    """mbox(rd) messages separated by 'From ' lines; yields subject + plain-text body"""
+
+    def __init__(self):
+        self._lines: List[bytes] = []
+        self._size = 0
+        self._started = False
+
+    def feed(self, line: bytes) -> Optional[Record]:
+        if line.startswith(b"From "):
+            record = self._flush() if self._started else None
+            self._started = True
+            return record
+        if not self._started:
+            return None
+        if line.startswith(b">") and line.lstrip(b">").startswith(b"From "):
+            line = line[1:]
+        # Anything past the cap is attachment payload we never analyze
+        if self._size < INGEST_MAX_RECORD_BYTES:
+            self._lines.append(line)
+            self._size += len(line)
+        return None
+
+    def close(self) -> Optional[Record]:
+        return self._flush() if self._started else None
+
+    def _flush(self) -> Record:
+        raw = b"".join(self._lines)
+        self._lines = []
+        self._size = 0
+        try:
+            message = BytesParser(policy=policy.default).parsebytes(raw)
+            body = message.get_body(preferencelist=("plain", "html"))
+            text = body.get_content() if body is not None else ""
+            subject = message.get("subject", "")
+            return (f"{subject}\n\n{text}" if subject else text, None)
+        except Exception as e:
+            return (None, f"Unparseable message: {e}")
+
+
+def make_parser(fmt: str, first_line: bytes):
+    """Pick a parser; 'auto' sniffs the first line for an mbox 'From ' separator"""
+    if fmt == "auto":
+        fmt = "mbox" if first_line.startswith(b"From ") else "ndjson"
+    if fmt == "mbox":
+        return MboxParser()
+    if fmt == "ndjson":
+        return NDJSONParser()
+    raise ValueError(f"Unknown format: {fmt}")
+
+
+def iter_records(lines: Iterable[bytes], fmt: str = "auto") -> Iterator[Record]:
+    """Parse records lazily from an iterable of raw lines"""
+    parser = None
+    for line in lines:
+        if parser is None:
+            parser = make_parser(fmt, line)
+        record = parser.feed(line)
+        if record is not None:
+            yield record
+    if parser is not None:
+        record = parser.close()
+        if record is not None:
+            yield record
+
+
+def process_batch(records: List[Record], handler: Callable[[str], dict], offset: int) -> List[dict]:
+    """Run handler over a batch of records, keeping per-record errors"""
+    results = []
+    for i, (text, error) in enumerate(records):
+        if error is None:
+            try:
+                result = {"index": offset + i, **handler(text)}
+            except Exception as e:
+                result = {"index": offset + i, "success": False, "error": str(e)}
+        else:
+            result = {"index": offset + i, "success": False, "error": error}
+        results.append(result)
+    return results
+
+
+async def aprocess_batch(records: List[Record], handler: Callable[[str], Awaitable[dict]], offset: int,
+                         concurrency: int) -> List[dict]:
+    """process_batch() for a coroutine handler: up to `concurrency` records at a time, results in input order"""
+    limiter = asyncio.Semaphore(concurrency)
+
+    async def run_one(i: int, text: Optional[str], error: Optional[str]) -> dict:
+        if error is not None:
+            return {"index": offset + i, "success": False, "error": error}
+        try:
+            async with limiter:
+                return {"index": offset + i, **await handler(text)}
+        except Exception as e:
+            return {"index": offset + i, "success": False, "error": str(e)}
+
+    return list(await asyncio.gather(*(run_one(i, text, error) for i, (text, error) in enumerate(records))))
+
+
+class IngestStats:
+    """Running counters for an ingestion run"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.records = 0
+        self.failed = 0
+
+    def add(self, results: List[dict]):
+        self.records += len(results)
+        self.failed += sum(1 for r in results if not r.get("success"))
+
+    def summary(self) -> dict:
+        elapsed = time.perf_counter() - self.started
+        return {
+            "records": self.records,
+            "failed": self.failed,
+            "elapsed_seconds": round(elapsed, 3),
+            "records_per_sec": round(self.records / elapsed, 2) if elapsed > 0 else 0.0
+        }
+
+
+def _encode(obj: dict) -> bytes:
+    return (json.dumps(obj, default=str) + "\n").encode()
+
+
+def iter_lines(stream) -> Iterator[bytes]:
+    """Read lines from a binary stream, truncating any line longer than the record cap"""
+    skipping = False
+    for line in iter(lambda: stream.readline(INGEST_MAX_RECORD_BYTES + 1), b""):
+        if skipping:
+            skipping = not line.endswith(b"\n")
+            continue
+        if len(line) > INGEST_MAX_RECORD_BYTES and not line.endswith(b"\n"):
+            skipping = True
+        yield line
+
+
+async def aingest_lines(lines: Iterable[bytes], handler: Callable[[str], Awaitable[dict]], fmt: str = "auto",
+                         stats: Optional[IngestStats] = None, concurrency: int = 8) -> AsyncIterator[bytes]:
+    """CLI pipeline: raw lines -> records -> results (each batch's records run concurrently) -> NDJSON lines,
+    then a summary line"""
+    stats = stats or IngestStats()
+    batch: List[Record] = []
+    for record in iter_records(lines, fmt):
+        batch.append(record)
+        if len(batch) >= INGEST_BATCH_SIZE:
+            results = await aprocess_batch(batch, handler, stats.records, concurrency)
+            stats.add(results)
+            batch = []
+            for result in results:
+                yield _encode(result)
+    if batch:
+        results = await aprocess_batch(batch, handler, stats.records, concurrency)
+        stats.add(results)
+        for result in results:
+            yield _encode(result)
+    yield _encode({"summary": stats.summary()})
+
+
+async def aiter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Re-split an async byte stream into lines without buffering more than one line"""
+    pending = b""
+    skipping = False
+    async for chunk in chunks:
+        pending += chunk
+        start = 0
+        while True:
+            end = pending.find(b"\n", start)
+            if end < 0:
+                break
+            if not skipping:
+                yield pending[start:end + 1]
+            skipping = False
+            start = end + 1
+        pending = pending[start:]
+        if len(pending) > INGEST_MAX_RECORD_BYTES:
+            # Oversized line: hand the head on so the parser rejects it, drop the rest
+            if not skipping:
+                yield pending[:INGEST_MAX_RECORD_BYTES + 1]
+            skipping = True
+            pending = b""
+    if pending and not skipping:
+        yield pending
+
+
+async def aingest(chunks: AsyncIterator[bytes], handler: Callable[[str], dict], fmt: str, run_sync) -> AsyncIterator[bytes]:
+    """Async pipeline over a request body; run_sync moves each batch off the event loop.
+
+    The body is only pulled when the client has consumed the previous batch of
+    results, so a slow reader throttles ingestion instead of growing buffers.
+    """
+    stats = IngestStats()
+    parser = None
+    batch: List[Record] = []
+
+    async for line in aiter_lines(chunks):
+        if parser is None:
+            parser = make_parser(fmt, line)
+        record = parser.feed(line)
+        if record is not None:
+            batch.append(record)
+        if len(batch) >= INGEST_BATCH_SIZE:
+            results = await run_sync(process_batch, batch, handler, stats.records)
+            stats.add(results)
+            batch = []
+            yield b"".join(_encode(r) for r in results)
+
+    if parser is not None:
+        record = parser.close()
+        if record is not None:
+            batch.append(record)
+    if batch:
+        results = await run_sync(process_batch, batch, handler, stats.records)
+        stats.add(results)
+        yield b"".join(_encode(r) for r in results)
+    yield _encode({"summary": stats.summary()})
+
+
+class RequestBodyStreamingResponse(StreamingResponse):
+    """StreamingResponse whose body generator reads the request body itself.
+
+    The stock response listens for client disconnect on ``receive`` while
+    streaming, which would swallow request body chunks; here the generator
+    is the only reader, and a disconnect surfaces from ``request.stream()``.
+    """
+
+    async def __call__(self, scope, receive, send) -> None:
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream a mailbox export through the FlowPilot agent pipeline")
+    parser.add_argument("path", help="NDJSON or mbox file, or - for stdin")
+    parser.add_argument("--format", choices=["auto", "ndjson", "mbox"], default="auto")
+    parser.add_argument("-o", "--output", help="write results here instead of stdout")
+    args = parser.parse_args()
+
+    # Imported here so `--help` works without loading the app
+    from main import WORKFLOW_CONCURRENCY, EmailRequest, orchestrate_agents, stop_batch_pool
+
+    def handler(text: str) -> Awaitable[dict]:
+        return orchestrate_agents(EmailRequest(emailText=text))
+
+    source = sys.stdin.buffer if args.path == "-" else open(args.path, "rb")
+    sink = open(args.output, "wb") if args.output else sys.stdout.buffer
+    stats = IngestStats()
+
+    async def run():
+        async for line in aingest_lines(iter_lines(source), handler, args.format, stats, WORKFLOW_CONCURRENCY):
+            sink.write(line)
+
+    try:
+        # One event loop for the whole run, as under the server
+        asyncio.run(run())
+    finally:
+        if source is not sys.stdin.buffer:
+            source.close()
+        if sink is not sys.stdout.buffer:
+            sink.close()
+        else:
+            sink.flush()
+        # The app's shutdown hook: finish queued jobs, spill the audit ring, close storage
+        stop_batch_pool()
+
+    summary = stats.summary()
+    print(
+        f"Processed {summary['records']} records ({summary['failed']} failed) "
+        f"in {summary['elapsed_seconds']}s - {summary['records_per_sec']} records/sec",
+        file=sys.stderr
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+"""In-process background jobs for work that does not need to finish within the request.
+
+Autonomous-mode approvals and Slack commands enqueue their task creation
+here and answer immediately with a job id; a pool of worker threads drains
+the queue, High-priority tasks first (the DecisionAgent's priority), FIFO
+within a priority. A failing job is retried with exponential backoff up to
+JOB_MAX_ATTEMPTS times, re-running its function from the top; side effects
+that must not repeat go through ``effect_ledger.once()``. Each job runs in
+the tenant that submitted it.
+
+Jobs live in the process that accepted them, so in multi-worker mode their
+status is only known to that worker.
+"""
+
+import itertools
+import os
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from datetime import datetime
+from typing import Callable, Dict, Hashable, Optional
+
+from telemetry import telemetry
+from tenancy import current_tenant, tenant_scope
+
+JOB_WORKERS = max(1, int(os.getenv("JOB_WORKERS", "4")))
+JOB_MAX_ATTEMPTS = max(1, int(os.getenv("JOB_MAX_ATTEMPTS", "3")))
+JOB_RETRY_SECONDS = float(os.getenv("JOB_RETRY_SECONDS", "0.5"))
+JOB_QUEUE_SIZE = int(os.getenv("JOB_QUEUE_SIZE", "10000"))
+JOB_HISTORY = int(os.getenv("JOB_HISTORY", "1000"))
+
+# Side effects remembered by the ledger; far more than can be retrying at once
+EFFECT_LEDGER_SIZE = 10000
+
+PRIORITY_RANKS = {"High": 0, "Medium": 1, "Low": 2}
+
+# Sorts after every real job, so shutdown drains the queue first
+_STOP_RANK = len(PRIORITY_RANKS) + 1
+
+
+class JobQueueFull(Exception):
+    """Raised by submit() when JOB_QUEUE_SIZE jobs are already waiting"""
+
+
+class Job:
+    __slots__ = ("id", "kind", "tenant", "priority", "fn", "args", "status", "attempts",
+                 "created_at", "started_at", "finished_at", "result", "error", "enqueued")
+
+    def __init__(self, kind: str, tenant: str, priority: str, fn: Callable, args: tuple):
+        self.id = str(uuid.uuid4())
+        self.kind = kind
+        self.tenant = tenant
+        self.priority = priority
+        self.fn = fn
+        self.args = args
+        self.status = "queued"
+        self.attempts = 0
+        self.created_at = datetime.now().isoformat()
+        self.started_at: Optional[str] = None
+        self.finished_at: Optional[str] = None
+        self.result = None
+        self.error: Optional[str] = None
+        self.enqueued = time.perf_counter()
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "priority": self.priority,
+            "attempts": self.attempts,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "result": self.result,
+            "error": self.error
+        }
+
+
+class JobQueue:
+    """Priority queue of jobs drained by a pool of worker threads (started on first submit)"""
+
+    def __init__(self, workers: int = JOB_WORKERS, max_attempts: int = JOB_MAX_ATTEMPTS,
+                 retry_seconds: float = JOB_RETRY_SECONDS, max_queued: int = JOB_QUEUE_SIZE,
+                 history: int = JOB_HISTORY):
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.retry_seconds = retry_seconds
+        self.max_queued = max_queued
+        self._queue: queue.PriorityQueue = queue.PriorityQueue()
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        self._jobs: Dict[str, Job] = {}
+        self._finished: deque = deque()
+        self._history = history
+        self._threads = []
+        self._timers: Dict[str, threading.Timer] = {}
+        self._closed = False
+
+    def submit(self, kind: str, fn: Callable, *args, priority: str = "Medium") -> Job:
+        """Queue fn(*args) to run in the current tenant"""
+        job = Job(kind, current_tenant(), priority, fn, args)
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Job queue is shut down")
+            if self.max_queued and self._queue.qsize() >= self.max_queued:
+                raise JobQueueFull(f"{self.max_queued} jobs already queued")
+            if not self._threads:
+                self._start()
+            self._jobs[job.id] = job
+        self._put(job)
+        return job
+
+    def get(self, job_id: str) -> Optional[dict]:
+        """A job of the current tenant"""
+        job = self._jobs.get(job_id)
+        return job.to_dict() if job is not None and job.tenant == current_tenant() else None
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            counts = {"queued": 0, "running": 0, "retrying": 0, "completed": 0, "failed": 0}
+            for job in self._jobs.values():
+                counts[job.status] += 1
+            return counts
+
+    def shutdown(self, timeout: float = 5.0) -> bool:
+        """Finish the queued jobs (within timeout), then stop the workers; pending retries fail.
+
+        Returns whether every worker exited, i.e. no job is still running.
+        """
+        with self._lock:
+            self._closed = True
+            threads, self._threads = self._threads, []
+            timers, self._timers = self._timers, {}
+        for job_id, timer in timers.items():
+            timer.cancel()
+            self._fail(self._jobs[job_id], "cancelled at shutdown")
+        for _ in threads:
+            self._queue.put((_STOP_RANK, next(self._seq), None))
+        deadline = time.monotonic() + timeout
+        for thread in threads:
+            thread.join(max(0.0, deadline - time.monotonic()))
+        return not any(thread.is_alive() for thread in threads)
+
+    def _start(self):
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"job-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def _put(self, job: Job):
+        job.enqueued = time.perf_counter()
+        self._queue.put((PRIORITY_RANKS.get(job.priority, 1), next(self._seq), job))
+
+    def _retry(self, job: Job):
+        """Timer callback: requeue a job after its backoff, unless shutdown took it over"""
+        with self._lock:
+            if self._timers.pop(job.id, None) is None:
+                return
+        self._put(job)
+
+    def _work(self):
+        while True:
+            _, _, job = self._queue.get()
+            if job is None:
+                return
+            self._run(job)
+
+    def _run(self, job: Job):
+        telemetry.stage_seconds.labels("job_queue_wait").observe(time.perf_counter() - job.enqueued)
+        job.status = "running"
+        job.attempts += 1
+        job.started_at = datetime.now().isoformat()
+        try:
+            with tenant_scope(job.tenant), telemetry.stage(f"job_{job.kind}"):
+                result = job.fn(*job.args)
+        except Exception as e:
+            job.error = str(e)
+            if job.attempts < self.max_attempts:
+                timer = threading.Timer(self.retry_seconds * 2 ** (job.attempts - 1), self._retry, (job,))
+                timer.daemon = True
+                with self._lock:
+                    if not self._closed:
+                        job.status = "retrying"
+                        self._timers[job.id] = timer
+                        timer.start()
+                        return
+            self._fail(job, job.error)
+            return
+        job.status = "completed"
+        job.result = result
+        job.error = None
+        job.finished_at = datetime.now().isoformat()
+        self._retire(job)
+
+    def _fail(self, job: Job, error: str):
+        job.status = "failed"
+        job.error = error
+        job.finished_at = datetime.now().isoformat()
+        self._retire(job)
+
+    def _retire(self, job: Job):
+        """Keep the newest JOB_HISTORY finished jobs available for status lookups"""
+        with self._lock:
+            self._finished.append(job.id)
+            while len(self._finished) > self._history:
+                self._jobs.pop(self._finished.popleft(), None)
+
+
+class EffectLedger:
+    """Side effects already performed, keyed by (tenant, key, effect).
+
+    A retried job runs its function again from the start; effects wrapped in
+    once() happen a single time per key however often that is. An effect is
+    recorded only after it succeeded, so one that failed is attempted again.
+    The oldest keys are forgotten first.
+    """
+
+    def __init__(self, size: int = EFFECT_LEDGER_SIZE):
+        self.size = size
+        self._lock = threading.Lock()
+        self._done: "OrderedDict[tuple, None]" = OrderedDict()
+
+    def once(self, key: Hashable, effect: str, fn: Callable, *args) -> bool:
+        """Run fn(*args) unless this effect already ran for key; True if it ran"""
+        entry = (current_tenant(), key, effect)
+        with self._lock:
+            if entry in self._done:
+                return False
+        fn(*args)
+        with self._lock:
+            self._done[entry] = None
+            while len(self._done) > self.size:
+                self._done.popitem(last=False)
+        return True
+
+
+# Shared job queue and effect ledger for the app process
+job_queue = JobQueue()
+effect_ledger = EffectLedger()
@@ -1,41 +1,82 @@
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import Response, StreamingResponse
+from pydantic import BaseModel, Field
 from fastapi.middleware.cors import CORSMiddleware
 import re
 from dotenv import load_dotenv
-from datetime import datetime, timedelta
+from datetime import datetime
 import os
+import sys
 import json
+import asyncio
+import anyio
+import hashlib
+import time
 import uuid
 from typing import List, Optional
+from batch import run_batch, shutdown_pool
+from ingest import RequestBodyStreamingResponse, aingest
+from stores import DEFAULT_EVENT_MINUTES, event_duration, format_minutes, parse_date, parse_time_minutes
+from storage import METRIC_NAMES, create_storage
+from events import event_bus, sse_stream
+from fastjson import FastJSONResponse, FragmentList
+from jobs import JobQueueFull, effect_ledger, job_queue
+from orchestrator import agent_tracker
+from cache import cache_stats, clear_caches, get_cache
+from scoring import SCORE_CHUNK
+from deadlines import deadline_cache_stats, parse_deadline
+from rules import RuleSet, current_rules, rule_registry, score_batch_chunk
+from compression import GZipMiddleware
+from telemetry import PROMETHEUS_CONTENT_TYPE, TelemetryMiddleware, telemetry
+from tenancy import TenantMiddleware, current_tenant, tenant_scope
 
 # Load environment variables
 load_dotenv()
 
-app = FastAPI()
+class InstrumentedJSONResponse(FastJSONResponse):
+    """orjson-backed JSON response that records its rendering time as the json_render stage.
 
-# In-memory storage
-tasks = []
-task_id_counter = 0
+    List endpoints return it directly: their items are already plain JSON
+    types, so FastAPI's jsonable_encoder pass over every item is skipped.
+    """
 
-# Audit log storage
-audit_logs = []
+    def render(self, content) -> bytes:
+        with telemetry.stage("json_render"):
+            return super().render(content)
 
-# Calendar events storage
-calendar_events = []
 
-# Slack messages storage
-slack_messages = []
+app = FastAPI(default_response_class=InstrumentedJSONResponse)
 
-# Multi-Agent state
-agent_states = {
-    "email_agent": {"status": "idle", "last_run": None},
-    "decision_agent": {"status": "idle", "last_run": None},
-    "calendar_agent": {"status": "idle", "last_run": None},
-    "task_agent": {"status": "idle", "last_run": None},
-}
+# Tasks, audit log, calendar, Slack messages and metrics (STORAGE_BACKEND=memory|sqlite),
+# one shard per tenant
+storage = create_storage()
+
+# Cached analyses were computed with the old rules, so drop them on every rule swap
+rule_registry.on_reload(lambda rules: clear_caches())
+
+# Working hours used for free-slot suggestions (unparseable values fall back to 09:00-17:00)
+WORK_DAY_START = parse_time_minutes(os.getenv("WORK_DAY_START", "09:00"))
+if WORK_DAY_START is None:
+    WORK_DAY_START = 9 * 60
+WORK_DAY_END = parse_time_minutes(os.getenv("WORK_DAY_END", "17:00"))
+if WORK_DAY_END is None:
+    WORK_DAY_END = 17 * 60
+SLOT_STEP_MINUTES = max(1, int(os.getenv("SLOT_STEP_MINUTES", "30")))
+
+# Largest page a single list request may ask for
+PAGE_MAX = 1000
+
+# Workflows orchestrated at once by the batch endpoint
+WORKFLOW_CONCURRENCY = int(os.getenv("WORKFLOW_CONCURRENCY", "8"))
+
+# Tasks kept per tenant before the oldest completed ones are evicted (0 = no cap)
+TENANT_MAX_TASKS = int(os.getenv("TENANT_MAX_TASKS", "0"))
+
+# Resolve the tenant (X-Tenant-ID header or API key) for every request
+app.add_middleware(TenantMiddleware)
 
-# Enable CORS
+# Enable CORS (added after TenantMiddleware so it wraps tenant resolution and answers preflights itself)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -44,6 +85,12 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Gzip large JSON / NDJSON / text responses (GZIP_MIN_SIZE, GZIP_LEVEL); wraps CORS, so CORS headers are set before compression
+app.add_middleware(GZipMiddleware)
+
+# Time every request (added last, so it is the outermost layer: Telemetry > GZip > CORS > Tenant > app)
+app.add_middleware(TelemetryMiddleware, telemetry=telemetry)
+
 # ============== Pydantic Models ==============
 
 class EmailRequest(BaseModel):
@@ -61,6 +108,7 @@ class CalendarEventRequest(BaseModel):
     title: str
     date: str
     time: str
+    duration_minutes: int = Field(default=DEFAULT_EVENT_MINUTES, gt=0)
     attendees: Optional[List[str]] = []
 
 class SlackMessageRequest(BaseModel):
@@ -79,21 +127,22 @@ class EmailAgent:
     """Agent responsible for extracting tasks from emails"""
     
     @staticmethod
-    def process(email_text: str) -> dict:
-        agent_states["email_agent"]["status"] = "processing"
-        agent_states["email_agent"]["last_run"] = datetime.now().isoformat()
-        
-        result = extract_task_info(email_text)
-        
-        # Add agent metadata
-        result["agent"] = "Email Agent"
-        result["agent_status"] = "completed"
-        result["timestamp"] = datetime.now().isoformat()
-        
-        agent_states["email_agent"]["status"] = "completed"
-        
-        # Log to audit
-        add_audit_log("Email Agent", "extract_task", f"Extracted task: {result.get('task', 'N/A')}")
+    async def process(email_text: str, analysis: Optional[dict] = None) -> dict:
+        with agent_tracker.run("email_agent"):
+            # Reuse an extraction computed elsewhere (e.g. by a batch worker)
+            if analysis is not None:
+                result = dict(analysis)
+            else:
+                result = await run_in_threadpool(extract_task_info, email_text)
+            
+            # Add agent metadata
+            result["agent"] = "Email Agent"
+            result["agent_status"] = "completed"
+            result["timestamp"] = datetime.now().isoformat()
+            
+            # Log to audit
+            await run_in_threadpool(add_audit_log, "Email Agent", "extract_task", f"Extracted task: {result.get('task', 'N/A')}")
+            await run_in_threadpool(publish_email_processed, result)
         
         return result
 
@@ -102,29 +151,25 @@ class DecisionAgent:
     """Agent responsible for priority assignment and decision making"""
     
     @staticmethod
-    def process(task_data: dict, email_text: str) -> dict:
-        agent_states["decision_agent"]["status"] = "processing"
-        agent_states["decision_agent"]["last_run"] = datetime.now().isoformat()
-        
-        # Apply smart priority rules
-        priority = apply_priority_rules(task_data, email_text, task_data.get("priority", "Medium"))
-        
-        # Determine if approval needed
-        needs_approval = priority != "High"
-        
-        result = {
-            **task_data,
-            "priority": priority,
-            "needs_approval": needs_approval,
-            "agent": "Decision Agent",
-            "agent_status": "completed",
-            "timestamp": datetime.now().isoformat()
-        }
-        
-        agent_states["decision_agent"]["status"] = "completed"
-        
-        # Log to audit
-        add_audit_log("Decision Agent", "assign_priority", f"Assigned priority: {priority}, needs_approval: {needs_approval}")
+    async def process(task_data: dict, email_text: str) -> dict:
+        with agent_tracker.run("decision_agent"):
+            # Apply smart priority rules
+            priority = apply_priority_rules(task_data, email_text, task_data.get("priority", "Medium"))
+            
+            # Determine if approval needed
+            needs_approval = priority != "High"
+            
+            result = {
+                **task_data,
+                "priority": priority,
+                "needs_approval": needs_approval,
+                "agent": "Decision Agent",
+                "agent_status": "completed",
+                "timestamp": datetime.now().isoformat()
+            }
+            
+            # Log to audit
+            await run_in_threadpool(add_audit_log, "Decision Agent", "assign_priority", f"Assigned priority: {priority}, needs_approval: {needs_approval}")
         
         return result
 
@@ -133,47 +178,45 @@ class CalendarAgent:
     """Agent responsible for scheduling meetings"""
     
     @staticmethod
-    def process(task_data: dict, create_event: bool = False) -> dict:
-        agent_states["calendar_agent"]["status"] = "processing"
-        agent_states["calendar_agent"]["last_run"] = datetime.now().isoformat()
-        
-        result = {
-            "calendar_suggestion": None,
-            "calendar_event_id": None,
-            "agent": "Calendar Agent",
-            "agent_status": "completed",
-            "timestamp": datetime.now().isoformat()
-        }
-        
-        if create_event and task_data.get("deadline") != "Not specified":
-            # Create calendar event
-            event = {
-                "id": str(uuid.uuid4()),
-                "title": task_data.get("task", "Task Meeting"),
-                "date": task_data.get("deadline"),
-                "time": "09:00 AM",
-                "attendees": [],
-                "created_at": datetime.now().isoformat(),
-                "status": "scheduled"
+    async def process(task_data: dict, create_event: bool = False) -> dict:
+        with agent_tracker.run("calendar_agent"):
+            result = {
+                "calendar_suggestion": None,
+                "calendar_event_id": None,
+                "agent": "Calendar Agent",
+                "agent_status": "completed",
+                "timestamp": datetime.now().isoformat()
             }
-            calendar_events.append(event)
-            result["calendar_event_id"] = event["id"]
-            result["calendar_suggestion"] = f"Meeting scheduled for {task_data.get('deadline')} at 09:00 AM"
-            
-            add_audit_log("Calendar Agent", "create_event", f"Created calendar event: {event['id']}")
-        else:
-            # Suggest meeting time
-            days_until = task_data.get("days_until", 1)
-            suggested_time = "09:00 AM"
-            if days_until == 0:
-                suggested_time = "02:00 PM"
-            elif days_until == 1:
-                suggested_time = "09:00 AM (tomorrow)"
             
-            result["calendar_suggestion"] = f"Recommend meeting on {task_data.get('deadline', 'TBD')} at {suggested_time}"
-            add_audit_log("Calendar Agent", "suggest_time", f"Suggested time: {suggested_time}")
-        
-        agent_states["calendar_agent"]["status"] = "completed"
+            if create_event and task_data.get("deadline") != "Not specified":
+                # Create calendar event
+                event = {
+                    "id": str(uuid.uuid4()),
+                    "title": task_data.get("task", "Task Meeting"),
+                    "date": task_data.get("deadline"),
+                    "time": "09:00 AM",
+                    "duration_minutes": DEFAULT_EVENT_MINUTES,
+                    "attendees": [],
+                    "created_at": datetime.now().isoformat(),
+                    "status": "scheduled"
+                }
+                await run_in_threadpool(storage.add_event, event)
+                event_bus.publish("calendar.created", event)
+                result["calendar_event_id"] = event["id"]
+                result["calendar_suggestion"] = f"Meeting scheduled for {task_data.get('deadline')} at 09:00 AM"
+                
+                await run_in_threadpool(add_audit_log, "Calendar Agent", "create_event", f"Created calendar event: {event['id']}")
+            else:
+                # Suggest meeting time
+                days_until = task_data.get("days_until", 1)
+                suggested_time = "09:00 AM"
+                if days_until == 0:
+                    suggested_time = "02:00 PM"
+                elif days_until == 1:
+                    suggested_time = "09:00 AM (tomorrow)"
+                
+                result["calendar_suggestion"] = f"Recommend meeting on {task_data.get('deadline', 'TBD')} at {suggested_time}"
+                await run_in_threadpool(add_audit_log, "Calendar Agent", "suggest_time", f"Suggested time: {suggested_time}")
         
         return result
 
@@ -182,80 +225,157 @@ class TaskAgent:
     """Agent responsible for task management and dashboard updates"""
     
     @staticmethod
-    def process(task_data: dict, action: str = "create") -> dict:
-        global task_id_counter
-        
-        agent_states["task_agent"]["status"] = "processing"
-        agent_states["task_agent"]["last_run"] = datetime.now().isoformat()
-        
-        result = {
-            "task_id": None,
-            "action": action,
-            "agent": "Task Agent",
-            "agent_status": "completed",
-            "timestamp": datetime.now().isoformat()
-        }
-        
-        if action == "create":
-            task_id_counter += 1
-            task_record = {
-                "id": task_id_counter,
-                "task": task_data.get("task"),
-                "deadline": task_data.get("deadline"),
-                "priority": task_data.get("priority"),
-                "status": "Pending",
-                "reminder": task_data.get("reminder"),
-                "created_at": datetime.now().isoformat(),
-                "autonomous": task_data.get("autonomous", False),
-                "calendar_event_id": task_data.get("calendar_event_id"),
-                "email_text": task_data.get("email_text", ""),
-                "approved_at": datetime.now().isoformat(),
-                "approved_by": "system" if task_data.get("autonomous") else "user"
+    async def process(task_data: dict, action: str = "create") -> dict:
+        with agent_tracker.run("task_agent"):
+            result = {
+                "task_id": None,
+                "action": action,
+                "agent": "Task Agent",
+                "agent_status": "completed",
+                "timestamp": datetime.now().isoformat()
             }
-            tasks.append(task_record)
-            result["task_id"] = task_id_counter
-            result["message"] = f"Task {task_id_counter} created successfully"
             
-            add_audit_log("Task Agent", "create_task", f"Created task: {task_id_counter}")
-        
-        agent_states["task_agent"]["status"] = "completed"
+            if action == "create":
+                task_record = await run_in_threadpool(create_task, task_data)
+                result["task_id"] = task_record["id"]
+                result["message"] = f"Task {task_record['id']} created successfully"
         
         return result
 
 
+def create_task(task_data: dict, task_id: Optional[int] = None) -> dict:
+    """The Task Agent's create action: store the task and log it (safe to retry with the same task_id)"""
+    task_record = create_task_record(task_data, task_id)
+    effect_ledger.once(task_record["id"], "audit.create_task",
+                       add_audit_log, "Task Agent", "create_task", f"Created task: {task_record['id']}")
+    return task_record
+
+
+def create_task_record(task_data: dict, task_id: Optional[int] = None) -> dict:
+    """Store a new task; the id comes from the storage backend's atomic allocator unless given"""
+    task_record = {
+        "id": task_id if task_id is not None else storage.next_task_id(),
+        "task": task_data.get("task"),
+        "deadline": task_data.get("deadline"),
+        "priority": task_data.get("priority"),
+        "status": "Pending",
+        "reminder": task_data.get("reminder"),
+        "created_at": datetime.now().isoformat(),
+        "autonomous": task_data.get("autonomous", False),
+        "calendar_event_id": task_data.get("calendar_event_id"),
+        "email_text": task_data.get("email_text", ""),
+        "approved_at": datetime.now().isoformat(),
+        "approved_by": "system" if task_data.get("autonomous") else "user"
+    }
+    return store_task(task_record)
+
+
+def store_task(task_record: dict) -> dict:
+    """Store a new task, then evict the tenant's oldest completed tasks beyond TENANT_MAX_TASKS.
+
+    Safe to retry with the same id: a task already stored is kept as is, and
+    task.created is published once per id.
+    """
+    stored = storage.get_task(task_record["id"])
+    if stored is None:
+        storage.add_task(task_record)
+    else:
+        task_record = stored
+    effect_ledger.once(task_record["id"], "task.created", event_bus.publish, "task.created", task_record)
+    if TENANT_MAX_TASKS:
+        evicted = storage.evict_completed_tasks(TENANT_MAX_TASKS)
+        if evicted:
+            event_bus.publish("task.evicted", {"ids": evicted})
+    return task_record
+
+
 # ============== Helper Functions ==============
 
+@telemetry.timed("audit_append")
 def add_audit_log(agent: str, action: str, details: str):
     """Add entry to audit log"""
-    log_entry = {
-        "id": len(audit_logs) + 1,
-        "timestamp": datetime.now().isoformat(),
-        "agent": agent,
-        "action": action,
-        "details": details
-    }
-    audit_logs.append(log_entry)
+    event_bus.publish("audit.appended", storage.append_audit(agent, action, details))
+
+
+def publish_email_processed(analysis: dict):
+    """Announce an analyzed email (counted by the automation metrics)"""
+    event_bus.publish("email.processed", {"task": analysis.get("task"), "priority": analysis.get("priority")})
+
+
+def clamp_limit(limit: Optional[int]) -> Optional[int]:
+    """Keep a requested page size within 1..PAGE_MAX (None means unpaged)"""
+    return None if limit is None else max(1, min(limit, PAGE_MAX))
+
+
+def project(items: List[dict], fields: Optional[str]) -> List[dict]:
+    """Keep only the comma-separated `fields` of each item"""
+    if not fields:
+        return items
+    keys = [f.strip() for f in fields.split(",") if f.strip()]
+    return [{k: item[k] for k in keys if k in item} for item in items]
+
+
+def make_etag(request: Request, *versions) -> str:
+    """Strong ETag for this URL's response, given the versions its content depends on"""
+    key = "|".join(map(str, (current_tenant(), request.url.path, request.url.query, *versions)))
+    return '"' + hashlib.blake2b(key.encode(), digest_size=12).hexdigest() + '"'
 
 
-def check_conflicts(date: str, time: str) -> dict:
+def cache_headers(etag: str) -> dict:
+    # no-cache: clients keep the body but revalidate it on every use
+    return {"ETag": etag, "Cache-Control": "no-cache"}
+
+
+def not_modified(request: Request, etag: str) -> Optional[Response]:
+    """A 304 when the request's If-None-Match already names etag"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return None
+    tags = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    if etag in tags or "*" in tags:
+        return Response(status_code=304, headers=cache_headers(etag))
+    return None
+
+
+def format_duration(minutes: int) -> str:
+    """Human readable duration, e.g. '1 hour', '1 hour 30 minutes'"""
+    hours, mins = divmod(minutes, 60)
+    parts = []
+    if hours:
+        parts.append(f"{hours} hour{'s' if hours != 1 else ''}")
+    if mins or not hours:
+        parts.append(f"{mins} minute{'s' if mins != 1 else ''}")
+    return " ".join(parts)
+
+
+def find_free_slots(date: str, duration: int, count: int = 3) -> List[str]:
+    """First free slots of the given length within working hours"""
+    slots = storage.free_slots(date, duration, count, WORK_DAY_START, WORK_DAY_END, SLOT_STEP_MINUTES)
+    return [format_minutes(s) for s in slots]
+
+
+def check_conflicts(date: str, time: str, duration: int = DEFAULT_EVENT_MINUTES) -> dict:
     """Check for calendar conflicts - Human-in-the-Loop Safety"""
     conflicts = []
-    for event in calendar_events:
-        if event.get("date") == date:
-            conflicts.append({
-                "event": event.get("title"),
-                "date": event.get("date"),
-                "time": event.get("time")
-            })
+    for event in storage.event_conflicts(date, time, duration):
+        conflicts.append({
+            "event": event.get("title"),
+            "date": event.get("date"),
+            "time": event.get("time")
+        })
     
     # Suggest alternate times
     suggestions = []
     if conflicts:
-        suggestions = [
-            {"time": "11:00 AM", "reason": "Morning slot available"},
-            {"time": "02:00 PM", "reason": "Afternoon slot available"},
-            {"time": "04:00 PM", "reason": "End of day slot available"}
-        ]
+        for slot in find_free_slots(date, duration):
+            minutes = parse_time_minutes(slot)
+            if minutes < 12 * 60:
+                reason = "Morning slot available"
+            elif minutes < 16 * 60:
+                reason = "Afternoon slot available"
+            else:
+                reason = "End of day slot available"
+            suggestions.append({"time": slot, "reason": reason})
     
     return {
         "has_conflicts": len(conflicts) > 0,
@@ -266,103 +386,36 @@ def check_conflicts(date: str, time: str) -> dict:
 
 def interpret_deadline(deadline_str: str) -> tuple:
     """Convert relative dates to actual dates. Returns (formatted_date, days_until)"""
-    now = datetime.now()
-    deadline_lower = deadline_str.lower()
-    
-    # Check for relative dates
-    if "tomorrow" in deadline_lower:
-        target = now + timedelta(days=1)
-        return (target.strftime("%A, %B %d"), 1)
-    
-    if "today" in deadline_lower:
-        return (now.strftime("%A, %B %d"), 0)
-    
-    if "next monday" in deadline_lower or "monday" in deadline_lower:
-        days_ahead = 0 - now.weekday()  # Monday is 0
-        if days_ahead <= 0:
-            days_ahead += 7
-        target = now + timedelta(days=days_ahead)
-        return (target.strftime("%A, %B %d"), days_ahead)
-    
-    # Pattern for "by Friday", "by end of week"
-    days_map = {
-        "monday": 0, "tuesday": 1, "wednesday": 2, "thursday": 3,
-        "friday": 4, "saturday": 5, "sunday": 6
-    }
-    
-    for day_name, day_num in days_map.items():
-        if day_name in deadline_lower:
-            days_ahead = day_num - now.weekday()
-            if days_ahead <= 0:
-                days_ahead += 7
-            target = now + timedelta(days=days_ahead)
-            return (target.strftime("%A, %B %d"), days_ahead)
-    
-    # Pattern for "end of week"
-    if "end of week" in deadline_lower or "eow" in deadline_lower:
-        days_ahead = 4 - now.weekday()  # Friday
-        if days_ahead <= 0:
-            days_ahead += 7
-        target = now + timedelta(days=days_ahead)
-        return (target.strftime("%A, %B %d"), days_ahead)
-    
-    # Default: return as-is with high priority
-    return (deadline_str, 1)
+    deadline = parse_deadline(deadline_str)
+    return (deadline.formatted, deadline.days_until)
 
 
-def apply_priority_rules(task: dict, email_text: str, priority_base: str) -> str:
-    """Apply smart rule-based priority override"""
-    email_lower = email_text.lower()
+@telemetry.timed("apply_priority_rules")
+def apply_priority_rules(task: dict, email_text: str, priority_base: str, rules: Optional[RuleSet] = None) -> str:
+    """Apply smart rule-based priority override (see PriorityOverrides for the rule order)"""
     days_until = 999
     
     # Parse deadline to get days_until
     if task.get("deadline") and task["deadline"] != "Not specified":
         _, days_until = interpret_deadline(task["deadline"])
     
-    # Rule 1: Urgent keywords override to HIGH
-    urgent_keywords = ["urgent", "asap", "immediately", "critical", "emergency", "now"]
-    for keyword in urgent_keywords:
-        if keyword in email_lower:
-            return "High"
-    
-    # Rule 2: Deadline within 24 hours = HIGH
-    if days_until == 0 or (days_until == 1 and "today" in email_lower):
-        return "High"
-    
-    # Rule 3: FYI or informational = LOW
-    if email_lower.startswith("fyi") or "fyi" in email_lower[:20]:
-        return "Low"
-    if "for your information" in email_lower:
-        return "Low"
-    if "just letting you know" in email_lower or "heads up" in email_lower:
-        return "Low"
-    
-    # Rule 4: Deadline > 7 days with no urgency = LOW
-    if days_until > 7 and priority_base != "High":
-        return "Low"
-    
-    return priority_base
+    return (rules or current_rules()).overrides.decide(email_text.lower(), days_until, priority_base)
 
 
+@get_cache("extract_task_info").cached()
+@telemetry.timed("extract_task_info")
 def extract_task_info(email_text: str) -> dict:
     """Extract task information from email using pattern matching"""
     
-    email_lower = email_text.lower()
+    # The tenant's precompiled rules: one substring/regex search per verb, deadline and keyword rule
+    rules = current_rules()
+    task, deadline, priority = rules.extraction.extract(email_text)
     
     # Task extraction
-    action_verbs = [
-        "review", "check", "approve", "update", "create", "fix", "submit", "send",
-        "confirm", "verify", "complete", "finish", "provide", "prepare", "arrange",
-        "schedule", "organize", "delegate", "analyze", "evaluate", "assess"
-    ]
-    
-    task = "Review email and take action"
-    for verb in action_verbs:
-        pattern = rf"{verb}[^.!?]*[.!?]"
-        match = re.search(pattern, email_lower)
-        if match:
-            task = match.group(0).strip()
-            break
+    if task:
+        task = task.strip()
+    else:
+        task = "Review email and take action"
     
     if task == "Review email and take action":
         sentences = email_text.split('.')
@@ -370,40 +423,11 @@ def extract_task_info(email_text: str) -> dict:
             task = sentences[0].strip()[:100]
     
     # Deadline extraction
-    deadline = "Not specified"
-    deadline_patterns = [
-        r"by\s+(?:end\s+of\s+)?(\w+\s+\d{1,2}|\d{1,2}/\d{1,2})",
-        r"(?:deadline|due)\s*(?:is|:)?\s*(?:on\s+)?(\w+\s+\d{1,2}|\d{1,2}/\d{1,2})",
-        r"before\s+(?:end\s+of\s+)?(\w+)",
-        r"by\s+(monday|tuesday|wednesday|thursday|friday|saturday|sunday)",
-        r"by\s+(?:this\s+)?(evening|tomorrow|next\s+week|end\s+of\s+week)",
-    ]
-    
-    for pattern in deadline_patterns:
-        match = re.search(pattern, email_lower)
-        if match:
-            deadline = match.group(1) if match.groups() else match.group(0)
-            deadline = deadline.title()
-            break
-    
-    # Base priority (before rules)
-    priority = "Medium"
-    high_priority_keywords = ["urgent", "asap", "immediately", "critical", "emergency", "today", "now", "rush"]
-    low_priority_keywords = ["when possible", "at your leisure", "whenever", "optional", "no rush"]
-    
-    for keyword in high_priority_keywords:
-        if keyword in email_lower:
-            priority = "High"
-            break
-    
-    for keyword in low_priority_keywords:
-        if keyword in email_lower:
-            priority = "Low"
-            break
+    deadline = deadline.title() if deadline is not None else "Not specified"
     
     # Convert deadline and apply priority rules
     actual_deadline, days_until = interpret_deadline(deadline) if deadline != "Not specified" else (deadline, 999)
-    priority = apply_priority_rules({"deadline": actual_deadline}, email_text, priority)
+    priority = apply_priority_rules({"deadline": actual_deadline}, email_text, priority, rules)
     
     # Draft reply
     draft_reply = f"""Thank you for your email. 
@@ -435,6 +459,13 @@ Best regards"""
     }
 
 
+def extract_task_info_as(job: tuple) -> dict:
+    """extract_task_info for a (tenant, email_text) job (picklable entry point for batch workers)"""
+    tenant, email_text = job
+    with tenant_scope(tenant):
+        return extract_task_info(email_text)
+
+
 @app.post("/analyze")
 def analyze_email(request: EmailRequest):
     try:
@@ -447,6 +478,7 @@ def analyze_email(request: EmailRequest):
             }
         
         result = extract_task_info(request.emailText)
+        publish_email_processed(result)
         return result
     
     except Exception as e:
@@ -458,16 +490,59 @@ def analyze_email(request: EmailRequest):
         }
 
 
+@app.post("/analyze/batch")
+def analyze_email_batch(requests: List[EmailRequest]):
+    """Analyze many emails in one call, fanned out across worker processes"""
+    results = [None] * len(requests)
+    pending = []
+    for index, request in enumerate(requests):
+        if not request.emailText.strip():
+            results[index] = {"index": index, "success": False, "error": "Please provide an email to analyze"}
+        else:
+            pending.append(index)
+    
+    tenant = current_tenant()
+    outcomes = run_batch(extract_task_info_as, [(tenant, requests[i].emailText) for i in pending])
+    for index, (ok, value) in zip(pending, outcomes):
+        if ok:
+            results[index] = {"index": index, "success": True, "data": value}
+            publish_email_processed(value)
+        else:
+            results[index] = {"index": index, "success": False, "error": value}
+    
+    return {
+        "results": results,
+        "total": len(results),
+        "failed": sum(1 for r in results if not r["success"])
+    }
+
+
+@app.on_event("shutdown")
+def stop_batch_pool():
+    """Release batch worker processes, finish queued jobs and flush storage.
+
+    Storage stays open if a job outlived the shutdown timeout, so its writes
+    never hit a closed connection.
+    """
+    shutdown_pool()
+    if job_queue.shutdown():
+        storage.close()
+    else:
+        print("Jobs still running at shutdown; storage left open", file=sys.stderr, flush=True)
+
+
 @app.post("/approve-task")
 def approve_task(request: ApprovalRequest):
-    """Approve and store task"""
-    global task_id_counter
+    """Approve and store task.
     
+    In autonomous mode the task is stored by a background job: the response
+    carries the task's id and a `job_id` to follow on `/jobs/{job_id}`.
+    """
     try:
-        task_id_counter += 1
+        task_id = storage.next_task_id()
         
         task_record = {
-            "id": task_id_counter,
+            "id": task_id,
             "task": request.task.get("task"),
             "deadline": request.task.get("deadline"),
             "priority": request.task.get("priority"),
@@ -477,59 +552,89 @@ def approve_task(request: ApprovalRequest):
             "autonomous": request.autonomous
         }
         
-        tasks.append(task_record)
+        job = None
+        if request.autonomous:
+            try:
+                job = job_queue.submit("approve_task", store_task, task_record,
+                                       priority=task_record["priority"] or "Medium")
+            except JobQueueFull:
+                pass  # stored inline below
+        if job is not None:
+            return {
+                "success": True,
+                "message": "Task approved and queued! (Auto-approved in autonomous mode)",
+                "task_id": task_id,
+                "job_id": job.id,
+                "status": job.status
+            }
+        
+        store_task(task_record)
         
         return {
             "success": True,
             "message": f"Task approved and stored! {'(Auto-approved in autonomous mode)' if request.autonomous else ''}",
-            "task_id": task_id_counter,
-            "total_tasks": len(tasks)
+            "task_id": task_id,
+            "total_tasks": storage.count_tasks()
         }
     except Exception as e:
         return {"success": False, "error": str(e)}
 
 
 @app.get("/tasks")
-def get_tasks():
-    """Get all stored tasks"""
-    return {
-        "tasks": tasks,
-        "total": len(tasks),
-        "pending": len([t for t in tasks if t["status"] == "Pending"]),
-        "completed": len([t for t in tasks if t["status"] == "Completed"])
-    }
+def get_tasks(request: Request, limit: Optional[int] = None, after: Optional[int] = None, status: Optional[str] = None,
+              priority: Optional[str] = None, deadline: Optional[str] = None, fields: Optional[str] = None):
+    """Get stored tasks in id order.
+    
+    Without `limit` every matching task is returned. Filters use the task
+    indexes; pass `after=<next_cursor>` for the next page and
+    `fields=id,task,status` to return only those keys. Answers 304 when
+    If-None-Match carries the current ETag.
+    """
+    etag = make_etag(request, storage.version_token("tasks"))
+    cached = not_modified(request, etag)
+    if cached is not None:
+        return cached
+    filters = {k: v for k, v in (("status", status), ("priority", priority), ("deadline", deadline)) if v is not None}
+    page = storage.page_tasks(after=after, limit=clamp_limit(limit), **filters)
+    return InstrumentedJSONResponse({
+        "tasks": project(page.items, fields),
+        "total": storage.count_tasks(),
+        "pending": storage.count_tasks("status", "Pending"),
+        "completed": storage.count_tasks("status", "Completed"),
+        "next_cursor": page.next_cursor,
+        "has_more": page.has_more
+    }, headers=cache_headers(etag))
 
 
 @app.post("/task/{task_id}/complete")
 def complete_task(task_id: int):
     """Mark task as completed"""
-    for task in tasks:
-        if task["id"] == task_id:
-            task["status"] = "Completed"
-            task["completed_at"] = datetime.now().isoformat()
-            add_audit_log("Task Agent", "complete_task", f"Completed task: {task_id}")
-            return {"success": True, "message": f"Task marked as completed!"}
+    task = storage.update_task(task_id, status="Completed", completed_at=datetime.now().isoformat())
+    if task is None:
+        return {"success": False, "error": "Task not found"}
     
-    return {"success": False, "error": "Task not found"}
+    event_bus.publish("task.updated", task)
+    add_audit_log("Task Agent", "complete_task", f"Completed task: {task_id}")
+    return {"success": True, "message": f"Task marked as completed!"}
 
 
 # ============== Multi-Agent Orchestration Endpoints ==============
 
 @app.post("/agent/email")
-def run_email_agent(request: EmailRequest):
+async def run_email_agent(request: EmailRequest):
     """Run Email Agent to extract task from email"""
     try:
-        result = EmailAgent.process(request.emailText)
+        result = await EmailAgent.process(request.emailText)
         return {"success": True, "data": result}
     except Exception as e:
         return {"success": False, "error": str(e)}
 
 
 @app.post("/agent/decision")
-def run_decision_agent(request: AgentRequest):
+async def run_decision_agent(request: AgentRequest):
     """Run Decision Agent to assign priority"""
     try:
-        result = DecisionAgent.process(
+        result = await DecisionAgent.process(
             request.payload.get("task_data", {}),
             request.payload.get("email_text", "")
         )
@@ -539,10 +644,10 @@ def run_decision_agent(request: AgentRequest):
 
 
 @app.post("/agent/calendar")
-def run_calendar_agent(request: AgentRequest):
+async def run_calendar_agent(request: AgentRequest):
     """Run Calendar Agent to suggest or create meeting"""
     try:
-        result = CalendarAgent.process(
+        result = await CalendarAgent.process(
             request.payload.get("task_data", {}),
             request.payload.get("create_event", False)
         )
@@ -552,10 +657,10 @@ def run_calendar_agent(request: AgentRequest):
 
 
 @app.post("/agent/task")
-def run_task_agent(request: AgentRequest):
+async def run_task_agent(request: AgentRequest):
     """Run Task Agent to create/update tasks"""
     try:
-        result = TaskAgent.process(
+        result = await TaskAgent.process(
             request.payload.get("task_data", {}),
             request.payload.get("action", "create")
         )
@@ -564,35 +669,38 @@ def run_task_agent(request: AgentRequest):
         return {"success": False, "error": str(e)}
 
 
-@app.post("/agent/orchestrate")
-def orchestrate_agents(request: EmailRequest):
-    """Orchestrate all agents for complete workflow"""
-    try:
+async def run_workflow(email_text: str, analysis: Optional[dict] = None) -> dict:
+    """Run the agent chain for one email as its own tracked workflow.
+    
+    The Email Agent runs first; priority scoring and the calendar
+    suggestion only depend on its output, so they run concurrently.
+    """
+    with agent_tracker.workflow() as workflow:
         workflow_result = {
-            "workflow_id": str(uuid.uuid4()),
+            "workflow_id": workflow.id,
             "timestamp": datetime.now().isoformat(),
             "agents": [],
             "final_result": {}
         }
         
         # Step 1: Email Agent extracts task
-        email_result = EmailAgent.process(request.emailText)
+        email_result = await EmailAgent.process(email_text, analysis)
         workflow_result["agents"].append({
             "name": "Email Agent",
             "status": "completed",
             "output": email_result.get("task")
         })
         
-        # Step 2: Decision Agent assigns priority
-        decision_result = DecisionAgent.process(email_result, request.emailText)
+        # Step 2: Decision Agent assigns priority while the Calendar Agent suggests a meeting
+        decision_result, calendar_result = await asyncio.gather(
+            DecisionAgent.process(email_result, email_text),
+            CalendarAgent.process(email_result, False)
+        )
         workflow_result["agents"].append({
             "name": "Decision Agent",
             "status": "completed",
             "output": f"Priority: {decision_result.get('priority')}"
         })
-        
-        # Step 3: Calendar Agent suggests meeting
-        calendar_result = CalendarAgent.process(decision_result, False)
         workflow_result["agents"].append({
             "name": "Calendar Agent",
             "status": "completed",
@@ -606,38 +714,170 @@ def orchestrate_agents(request: EmailRequest):
             "calendar_suggestion": calendar_result.get("calendar_suggestion")
         }
         
-        add_audit_log("Orchestrator", "workflow_complete", f"Workflow {workflow_result['workflow_id']} completed")
-        
+        await run_in_threadpool(add_audit_log, "Orchestrator", "workflow_complete", f"Workflow {workflow.id} completed")
+    
+    return workflow_result
+
+
+@app.post("/agent/orchestrate")
+async def orchestrate_agents(request: EmailRequest):
+    """Orchestrate all agents for complete workflow"""
+    try:
+        workflow_result = await run_workflow(request.emailText)
         return {"success": True, "data": workflow_result}
     except Exception as e:
         return {"success": False, "error": str(e)}
 
 
-@app.get("/agent/status")
-def get_agent_status():
-    """Get status of all agents"""
+@app.post("/agent/orchestrate/batch")
+async def orchestrate_agents_batch(requests: List[EmailRequest]):
+    """Orchestrate all agents for many emails.
+
+    Extraction fans out across the worker pool; the agent workflows then
+    run concurrently here (up to WORKFLOW_CONCURRENCY at a time) so audit
+    logs stay in this process. Results keep input order.
+    """
+    texts = [r.emailText for r in requests]
+    tenant = current_tenant()
+    analyses = await run_in_threadpool(run_batch, extract_task_info_as, [(tenant, text) for text in texts])
+    limiter = asyncio.Semaphore(WORKFLOW_CONCURRENCY)
+    
+    async def run_one(index: int, text: str, ok: bool, analysis) -> dict:
+        if not ok:
+            return {"index": index, "success": False, "error": analysis}
+        try:
+            async with limiter:
+                return {"index": index, "success": True, "data": await run_workflow(text, analysis)}
+        except Exception as e:
+            return {"index": index, "success": False, "error": str(e)}
+    
+    results = await asyncio.gather(*(
+        run_one(index, text, ok, analysis)
+        for index, (text, (ok, analysis)) in enumerate(zip(texts, analyses))
+    ))
+    
     return {
-        "agents": agent_states,
-        "timestamp": datetime.now().isoformat()
+        "results": results,
+        "total": len(results),
+        "failed": sum(1 for r in results if not r["success"])
     }
 
 
+@app.post("/ingest/stream")
+async def ingest_stream(request: Request, format: str = "auto"):
+    """Stream an NDJSON or mbox export through the agent pipeline.
+    
+    Results come back as NDJSON, one line per record, followed by a
+    summary line with throughput.
+    """
+    if format not in ("auto", "ndjson", "mbox"):
+        raise HTTPException(status_code=400, detail=f"Unknown format: {format}")
+    
+    def handler(email_text: str) -> dict:
+        # Runs on a threadpool worker; hop back onto the event loop for the async agents
+        return anyio.from_thread.run(orchestrate_agents, EmailRequest(emailText=email_text))
+    
+    return RequestBodyStreamingResponse(
+        aingest(request.stream(), handler, format, run_in_threadpool),
+        media_type="application/x-ndjson"
+    )
+
+
+@app.get("/agent/status")
+def get_agent_status(request: Request):
+    """Get status of all agents, derived from the workflows in flight.
+    
+    `timestamp` is when the status last changed, so unchanged status keeps
+    its ETag and is answered with 304.
+    """
+    changed_at = agent_tracker.changed_at
+    etag = make_etag(request, agent_tracker.version, changed_at)
+    cached = not_modified(request, etag)
+    if cached is not None:
+        return cached
+    return InstrumentedJSONResponse({
+        "agents": agent_tracker.agent_status(),
+        "workflows": agent_tracker.workflow_summary(),
+        "timestamp": changed_at
+    }, headers=cache_headers(etag))
+
+
+@app.get("/agent/workflows/{workflow_id}")
+def get_workflow(workflow_id: str):
+    """Get the state of one in-flight or recently finished workflow"""
+    workflow = agent_tracker.get(workflow_id)
+    if workflow is None:
+        raise HTTPException(status_code=404, detail="Workflow not found")
+    return workflow
+
+
+@app.get("/jobs/{job_id}")
+def get_job(job_id: str):
+    """Status of a background job (queued, running, retrying, completed or failed)"""
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+# ============== Change Feed ==============
+
+@app.get("/events/stream")
+async def stream_events(request: Request, since: Optional[int] = None, topics: Optional[str] = None):
+    """Server-Sent Events feed of task, audit, calendar, Slack and metrics changes.
+    
+    Reconnecting clients resume after `Last-Event-ID` (or `since`); a `reset`
+    event means the missed range is gone and full state must be reloaded.
+    `topics=task,audit` limits the feed to those topic prefixes.
+    """
+    last_event_id = request.headers.get("last-event-id")
+    if last_event_id and last_event_id.isdigit():
+        since = int(last_event_id)
+    topic_set = {t.strip() for t in topics.split(",") if t.strip()} if topics else None
+    return StreamingResponse(
+        sse_stream(event_bus, since, topic_set),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 # ============== Audit Log Endpoints ==============
 
 @app.get("/audit")
-def get_audit_logs():
-    """Get all audit logs"""
-    return {
-        "logs": audit_logs,
-        "total": len(audit_logs)
-    }
+def get_audit_logs(request: Request, limit: int = 100, after: Optional[int] = None, before: Optional[int] = None,
+                   agent: Optional[str] = None, fields: Optional[str] = None):
+    """Page through audit logs.
+    
+    By default returns the newest `limit` entries. Pass `after=<next_cursor>`
+    to read forward, or `before=<prev_cursor>` to page back through history.
+    `has_more` tells whether more entries exist in that direction.
+    Without `fields` the entries' cached JSON encodings are spliced into the
+    response as-is. Answers 304 when If-None-Match carries the current ETag.
+    """
+    etag = make_etag(request, storage.version_token("audit"))
+    cached = not_modified(request, etag)
+    if cached is not None:
+        return cached
+    if fields:
+        page = storage.page_audit(after=after, before=before, limit=clamp_limit(limit), agent=agent)
+        logs, first_id = project(page.items, fields), page.items[0]["id"] if page.items else before
+    else:
+        page = storage.page_audit_json(after=after, before=before, limit=clamp_limit(limit), agent=agent)
+        logs, first_id = FragmentList(item for _, item in page.items), page.items[0][0] if page.items else before
+    return InstrumentedJSONResponse({
+        "logs": logs,
+        "total": storage.count_audit(),
+        "next_cursor": page.next_cursor if page.items else after,
+        "prev_cursor": first_id,
+        "has_more": page.has_more
+    }, headers=cache_headers(etag))
 
 
 @app.post("/audit/clear")
 def clear_audit_logs():
     """Clear audit logs"""
-    global audit_logs
-    audit_logs = []
+    storage.clear_audit()
+    event_bus.publish("audit.cleared", {})
     return {"success": True, "message": "Audit logs cleared"}
 
 
@@ -647,20 +887,22 @@ def clear_audit_logs():
 def create_calendar_event(request: CalendarEventRequest):
     """Create a calendar event"""
     # Check for conflicts first
-    conflict_check = check_conflicts(request.date, request.time)
+    conflict_check = check_conflicts(request.date, request.time, request.duration_minutes)
     
     event = {
         "id": str(uuid.uuid4()),
         "title": request.title,
         "date": request.date,
         "time": request.time,
+        "duration_minutes": request.duration_minutes,
         "attendees": request.attendees or [],
         "created_at": datetime.now().isoformat(),
         "status": "scheduled",
         "conflict_check": conflict_check
     }
     
-    calendar_events.append(event)
+    storage.add_event(event)
+    event_bus.publish("calendar.created", event)
     add_audit_log("Calendar Agent", "create_event", f"Created event: {event['id']}")
     
     return {
@@ -671,12 +913,24 @@ def create_calendar_event(request: CalendarEventRequest):
 
 
 @app.get("/calendar/events")
-def get_calendar_events():
-    """Get all calendar events"""
-    return {
-        "events": calendar_events,
-        "total": len(calendar_events)
-    }
+def get_calendar_events(request: Request, limit: Optional[int] = None, after: Optional[int] = None, start_date: Optional[str] = None,
+                        end_date: Optional[str] = None, fields: Optional[str] = None):
+    """Get calendar events in creation order, optionally within a date range"""
+    start = parse_date(start_date) if start_date else None
+    end = parse_date(end_date) if end_date else None
+    if (start_date and start is None) or (end_date and end is None):
+        raise HTTPException(status_code=400, detail="Dates must look like YYYY-MM-DD")
+    etag = make_etag(request, storage.version_token("calendar"))
+    cached = not_modified(request, etag)
+    if cached is not None:
+        return cached
+    page = storage.page_events(after=after, limit=clamp_limit(limit), start=start, end=end)
+    return InstrumentedJSONResponse({
+        "events": project(page.items, fields),
+        "total": storage.count_events(),
+        "next_cursor": page.next_cursor,
+        "has_more": page.has_more
+    }, headers=cache_headers(etag))
 
 
 @app.get("/calendar/check-conflicts")
@@ -699,7 +953,8 @@ def send_slack_message(request: SlackMessageRequest):
         "status": "sent"
     }
     
-    slack_messages.append(message)
+    storage.add_slack_message(message)
+    event_bus.publish("slack.sent", message)
     add_audit_log("Slack Agent", "send_message", f"Sent to {request.channel}: {request.message[:50]}...")
     
     return {
@@ -710,16 +965,24 @@ def send_slack_message(request: SlackMessageRequest):
 
 
 @app.get("/slack/messages")
-def get_slack_messages():
-    """Get all Slack messages"""
-    return {
-        "messages": slack_messages,
-        "total": len(slack_messages)
-    }
+def get_slack_messages(request: Request, limit: Optional[int] = None, after: Optional[int] = None, channel: Optional[str] = None,
+                       fields: Optional[str] = None):
+    """Get Slack messages in send order, optionally for one channel"""
+    etag = make_etag(request, storage.version_token("slack"))
+    cached = not_modified(request, etag)
+    if cached is not None:
+        return cached
+    page = storage.page_slack_messages(after=after, limit=clamp_limit(limit), channel=channel)
+    return InstrumentedJSONResponse({
+        "messages": project(page.items, fields),
+        "total": storage.count_slack_messages(),
+        "next_cursor": page.next_cursor,
+        "has_more": page.has_more
+    }, headers=cache_headers(etag))
 
 
 @app.post("/slack/command")
-def slack_command(request: SlackMessageRequest):
+async def slack_command(request: SlackMessageRequest):
     """Process Slack command like /schedule meeting"""
     # Parse Slack command
     command_response = {
@@ -741,9 +1004,7 @@ def slack_command(request: SlackMessageRequest):
             "priority": "Medium",
             "source": "slack"
         }
-        TaskAgent.process(task_data, "create")
-        
-        add_audit_log("Slack Agent", "command", f"Processed schedule command: {request.message}")
+        command_response["job_id"] = await queue_slack_task(task_data, f"Processed schedule command: {request.message}")
     
     elif "urgent" in request.message.lower() or "asap" in request.message.lower():
         command_response["text"] = f"⚠️ Understood! I'll mark this as HIGH priority and notify the team."
@@ -754,9 +1015,7 @@ def slack_command(request: SlackMessageRequest):
             "priority": "High",
             "source": "slack"
         }
-        TaskAgent.process(task_data, "create")
-        
-        add_audit_log("Slack Agent", "command", f"Processed urgent command: {request.message}")
+        command_response["job_id"] = await queue_slack_task(task_data, f"Processed urgent command: {request.message}")
     
     else:
         command_response["text"] = f"✅ Received: '{request.message}' - I'll analyze and create a task if needed."
@@ -764,11 +1023,39 @@ def slack_command(request: SlackMessageRequest):
     return command_response
 
 
+async def queue_slack_task(task_data: dict, summary: str) -> Optional[str]:
+    """Hand a Slack command's task to the job queue; a full queue runs it inline instead"""
+    task_id = await run_in_threadpool(storage.next_task_id)
+    try:
+        return job_queue.submit("slack_command", run_slack_task, task_data, task_id, summary,
+                                priority=task_data["priority"]).id
+    except JobQueueFull:
+        await run_in_threadpool(run_slack_task, task_data, task_id, summary)
+        return None
+
+
+def run_slack_task(task_data: dict, task_id: int, summary: str) -> dict:
+    """A Slack command's task creation (retries re-store the same task id)"""
+    with agent_tracker.run("task_agent"):
+        create_task(task_data, task_id)
+    add_audit_log("Slack Agent", "command", summary)
+    return {"task_id": task_id}
+
+
 # ============== Context-Aware Reply Enhancement ==============
 
 @app.post("/reply/smart")
 def generate_smart_reply(request: EmailRequest):
     """Generate context-aware suggested reply"""
+    result = build_smart_reply(request)
+    if result["success"]:
+        publish_email_processed(result["context"])
+    return result
+
+
+@get_cache("smart_reply").cached(text_of=lambda request: request.emailText, cacheable=lambda r: r.get("success", False))
+def build_smart_reply(request: EmailRequest) -> dict:
+    """Smart reply for an email (cached; the endpoint records the metrics)"""
     try:
         # First analyze the email
         analysis = extract_task_info(request.emailText)
@@ -839,7 +1126,7 @@ Best regards"""
 @app.get("/safety/check")
 def safety_check(task_id: int):
     """Human-in-the-loop safety panel - check for risks"""
-    task = next((t for t in tasks if t["id"] == task_id), None)
+    task = storage.get_task(task_id)
     
     if not task:
         return {"success": False, "error": "Task not found"}
@@ -858,11 +1145,11 @@ def safety_check(task_id: int):
             })
     
     # Check for overloaded day (more than 3 tasks)
-    deadline_tasks = [t for t in tasks if t.get("deadline") == task.get("deadline")]
-    if len(deadline_tasks) > 3:
+    deadline_task_count = storage.count_tasks("deadline", task.get("deadline"))
+    if deadline_task_count > 3:
         warnings.append({
             "type": "overload",
-            "message": f"High workload: {len(deadline_tasks)} tasks due on {task.get('deadline')}",
+            "message": f"High workload: {deadline_task_count} tasks due on {task.get('deadline')}",
             "suggestions": ["Consider spreading tasks across days", "Delegate to team members"]
         })
     
@@ -885,134 +1172,67 @@ def safety_check(task_id: int):
 # ============== Priority Scoring System ==============
 
 @app.post("/priority/score")
+@get_cache("priority_score").cached(text_of=lambda request: request.emailText, cacheable=lambda r: r.get("success", False))
 def score_priority(request: EmailRequest):
     """Calculate priority score with AI decision-making transparency"""
     try:
-        email_text = request.emailText
-        email_lower = email_text.lower()
-        
-        # Initialize scoring components
-        scores = {
-            "urgency_score": 0,
-            "importance_score": 0,
-            "deadline_score": 0,
-            "sender_score": 0,
-            "keyword_score": 0
-        }
-        
-        reasons = []
-        
-        # Urgency scoring (0-100)
-        urgent_keywords = {
-            "urgent": 30, "asap": 30, "immediately": 35, "critical": 40,
-            "emergency": 40, "now": 25, "rush": 25, "deadline": 15,
-            "time-sensitive": 20, "quick": 15
-        }
-        for keyword, score in urgent_keywords.items():
-            if keyword in email_lower:
-                scores["urgency_score"] = max(scores["urgency_score"], score)
-                reasons.append(f"Found urgency keyword: '{keyword}' (+{score})")
-        
-        # Importance scoring based on content
-        important_keywords = {
-            "important": 20, "priority": 25, "key": 15, "critical": 30,
-            "essential": 20, "required": 15, "mandatory": 25, "must": 15
-        }
-        for keyword, score in important_keywords.items():
-            if keyword in email_lower:
-                scores["importance_score"] = max(scores["importance_score"], score)
-                reasons.append(f"Found importance keyword: '{keyword}' (+{score})")
-        
-        # Deadline scoring
-        deadline_match = re.search(r"(by|due|deadline)\s+(.+?)(?:\.|$)", email_lower)
-        if deadline_match:
-            deadline_text = deadline_match.group(2).strip()
-            if "today" in deadline_text:
-                scores["deadline_score"] = 50
-                reasons.append("Deadline: Today (+50)")
-            elif "tomorrow" in deadline_text:
-                scores["deadline_score"] = 45
-                reasons.append("Deadline: Tomorrow (+45)")
-            elif any(day in deadline_text for day in ["monday", "tuesday", "wednesday", "thursday", "friday"]):
-                scores["deadline_score"] = 30
-                reasons.append("Deadline: This week (+30)")
-            elif "next week" in deadline_text:
-                scores["deadline_score"] = 15
-                reasons.append("Deadline: Next week (+15)")
-        
-        # Sender scoring (VIP detection)
-        vip_patterns = ["ceo", "cto", "cfo", "director", "vp ", "president", "founder", "boss"]
-        for pattern in vip_patterns:
-            if pattern in email_lower[:200]:
-                scores["sender_score"] = 20
-                reasons.append(f"VIP sender detected: '{pattern}' (+20)")
-                break
-        
-        # FYI/Low priority detection (negative scoring)
-        low_priority = ["fyi", "for your information", "just letting you know", 
-                       "heads up", "when possible", "at your leisure"]
-        is_low_priority = any(term in email_lower for term in low_priority)
-        
-        if is_low_priority:
-            scores["urgency_score"] = max(0, scores["urgency_score"] - 30)
-            scores["importance_score"] = max(0, scores["importance_score"] - 20)
-            reasons.append("Low priority indicators found (FYI/Info)")
-        
-        # Calculate total score
-        total_score = sum(scores.values())
-        
-        # Determine priority level
-        if total_score >= 70:
-            priority_level = "High"
-        elif total_score >= 40:
-            priority_level = "Medium"
-        else:
-            priority_level = "Low"
-        
-        # AI Decision explanation
-        decision_explanation = f"AI calculated priority score: {total_score}/100 → {priority_level} priority"
-        
-        return {
-            "success": True,
-            "priority_level": priority_level,
-            "total_score": total_score,
-            "scores": scores,
-            "reasons": reasons,
-            "decision_explanation": decision_explanation,
-            "is_low_priority": is_low_priority
-        }
+        return {"success": True, **current_rules().scoring.score_email(request.emailText)}
     except Exception as e:
         return {"success": False, "error": str(e)}
 
 
+@app.post("/priority/score/batch")
+def score_priority_batch(requests: List[EmailRequest]):
+    """Score many emails at once; each result matches /priority/score for that email.
+    
+    Emails are scored in vectorized chunks, fanned out across worker processes.
+    """
+    texts = [r.emailText for r in requests]
+    chunks = [texts[i:i + SCORE_CHUNK] for i in range(0, len(texts), SCORE_CHUNK)]
+    tenant = current_tenant()
+    
+    results = []
+    jobs = [(tenant, chunk) for chunk in chunks]
+    for chunk, (ok, value) in zip(chunks, run_batch(score_batch_chunk, jobs, chunk_size=1)):
+        for result in (value if ok else [None] * len(chunk)):
+            index = len(results)
+            if ok:
+                results.append({"index": index, "success": True, "data": result})
+            else:
+                results.append({"index": index, "success": False, "error": value})
+    
+    return {
+        "results": results,
+        "total": len(results),
+        "failed": sum(1 for r in results if not r["success"])
+    }
+
+
 # ============== Conflict Detection System ==============
 
 @app.get("/conflict/detect")
-def detect_conflicts(date: str, time: str = "09:00 AM"):
+def detect_conflicts(date: str, time: str = "09:00 AM", duration_minutes: int = Query(DEFAULT_EVENT_MINUTES, gt=0)):
     """Detect meeting conflicts with smart suggestions"""
     try:
         conflicts = []
         
-        # Check existing calendar events
-        for event in calendar_events:
-            if event.get("date") == date:
-                conflicts.append({
-                    "id": event.get("id"),
-                    "title": event.get("title"),
-                    "time": event.get("time"),
-                    "duration": "1 hour",
-                    "type": "calendar_conflict"
-                })
+        # Check existing calendar events that overlap the requested interval
+        for event in storage.event_conflicts(date, time, duration_minutes):
+            conflicts.append({
+                "id": event.get("id"),
+                "title": event.get("title"),
+                "time": event.get("time"),
+                "duration": format_duration(event_duration(event)),
+                "type": "calendar_conflict"
+            })
         
         # Generate smart suggestions
         suggestions = []
         if conflicts:
-            # Suggest alternative times
-            occupied_times = [c["time"] for c in conflicts]
-            all_times = ["09:00 AM", "10:00 AM", "11:00 AM", "02:00 PM", "03:00 PM", "04:00 PM"]
-            available_times = [t for t in all_times if t not in occupied_times]
+            # Suggest the first free slots of the same length
+            available_times = find_free_slots(date, duration_minutes)
             
-            for available_time in available_times[:3]:
+            for available_time in available_times:
                 suggestions.append({
                     "time": available_time,
                     "reason": "Available slot" if len(conflicts) < 3 else "Best alternative",
@@ -1045,27 +1265,18 @@ def detect_conflicts(date: str, time: str = "09:00 AM"):
 def check_conflicts_range(start_date: str, end_date: str):
     """Check conflicts for a date range"""
     try:
-        from datetime import datetime as dt
-        
-        start = dt.strptime(start_date, "%Y-%m-%d")
-        end = dt.strptime(end_date, "%Y-%m-%d")
+        start = datetime.strptime(start_date, "%Y-%m-%d").date()
+        end = datetime.strptime(end_date, "%Y-%m-%d").date()
         
+        # Only days that actually have events in the range are visited
         conflicts_summary = []
-        
-        current = start
-        while current <= end:
-            date_str = current.strftime("%Y-%m-%d")
-            day_conflicts = [e for e in calendar_events if e.get("date") == date_str]
-            
-            if day_conflicts:
-                conflicts_summary.append({
-                    "date": date_str,
-                    "day": current.strftime("%A"),
-                    "count": len(day_conflicts),
-                    "events": [e.get("title") for e in day_conflicts]
-                })
-            
-            current += timedelta(days=1)
+        for day, day_conflicts in storage.events_in_range(start, end):
+            conflicts_summary.append({
+                "date": day.strftime("%Y-%m-%d"),
+                "day": day.strftime("%A"),
+                "count": len(day_conflicts),
+                "events": [e.get("title") for e in day_conflicts]
+            })
         
         return {
             "success": True,
@@ -1080,70 +1291,123 @@ def check_conflicts_range(start_date: str, end_date: str):
 
 # ============== Automation Metrics Panel ==============
 
-# In-memory metrics storage
-automation_metrics = {
-    "total_emails_processed": 0,
-    "total_tasks_created": 0,
-    "total_tasks_completed": 0,
-    "total_meetings_scheduled": 0,
-    "total_slack_messages": 0,
-    "autonomous_approvals": 0,
-    "human_approvals": 0,
-    "start_time": datetime.now().isoformat(),
-    "time_saved_minutes": 0,
-    "efficiency_score": 0
+# Metrics live in `storage` (see storage.METRIC_NAMES) and are derived from
+# the events the agents and endpoints publish; the /metrics/record-*
+# endpoints remain for older clients that still report actions themselves.
+
+def incr_metrics(**deltas) -> dict:
+    """Bump metric counters and publish the new totals to the change feed"""
+    metrics = storage.incr_metrics(**deltas)
+    event_bus.publish("metrics.updated", metrics)
+    return metrics
+
+
+def task_created_metrics(task: dict) -> dict:
+    # Estimate time saved: ~5 min per task automation
+    approval = "autonomous_approvals" if task.get("autonomous") else "human_approvals"
+    return {"total_tasks_created": 1, "time_saved_minutes": 5, approval: 1}
+
+
+def task_updated_metrics(task: dict) -> dict:
+    return {"total_tasks_completed": 1} if task.get("status") == "Completed" else {}
+
+
+# Event topic -> metric deltas for its payload (estimates: ~3 min saved per email, ~10 per meeting)
+METRIC_EVENTS = {
+    "email.processed": lambda data: {"total_emails_processed": 1, "time_saved_minutes": 3},
+    "task.created": task_created_metrics,
+    "task.updated": task_updated_metrics,
+    "calendar.created": lambda data: {"total_meetings_scheduled": 1, "time_saved_minutes": 10},
+    "slack.sent": lambda data: {"total_slack_messages": 1},
 }
 
 
+def record_event_metrics(event: dict):
+    """Event bus listener that turns published events into metric updates"""
+    derive = METRIC_EVENTS.get(event["topic"])
+    if derive is None:
+        return
+    deltas = derive(event["data"])
+    if deltas:
+        with tenant_scope(event["tenant"]):
+            incr_metrics(**deltas)
+
+
+event_bus.add_listener(record_event_metrics)
+
+
 @app.post("/metrics/record-email")
 def record_email_processed():
-    """Record an email being processed"""
-    automation_metrics["total_emails_processed"] += 1
+    """Record an email being processed (legacy: now recorded from the matching event)"""
     # Estimate time saved: ~3 min per email automation
-    automation_metrics["time_saved_minutes"] += 3
-    return {"success": True, "emails_processed": automation_metrics["total_emails_processed"]}
+    metrics = incr_metrics(total_emails_processed=1, time_saved_minutes=3)
+    return {"success": True, "emails_processed": metrics["total_emails_processed"]}
 
 
 @app.post("/metrics/record-task")
 def record_task_created(autonomous: bool = False):
-    """Record a task being created"""
-    automation_metrics["total_tasks_created"] += 1
-    if autonomous:
-        automation_metrics["autonomous_approvals"] += 1
-    else:
-        automation_metrics["human_approvals"] += 1
+    """Record a task being created (legacy: now recorded from the matching event)"""
+    approval = "autonomous_approvals" if autonomous else "human_approvals"
     # Estimate time saved: ~5 min per task automation
-    automation_metrics["time_saved_minutes"] += 5
-    return {"success": True, "tasks_created": automation_metrics["total_tasks_created"]}
+    metrics = incr_metrics(total_tasks_created=1, time_saved_minutes=5, **{approval: 1})
+    return {"success": True, "tasks_created": metrics["total_tasks_created"]}
 
 
 @app.post("/metrics/record-completion")
 def record_task_completed():
-    """Record a task completion"""
-    automation_metrics["total_tasks_completed"] += 1
-    return {"success": True, "tasks_completed": automation_metrics["total_tasks_completed"]}
+    """Record a task completion (legacy: now recorded from the matching event)"""
+    metrics = incr_metrics(total_tasks_completed=1)
+    return {"success": True, "tasks_completed": metrics["total_tasks_completed"]}
 
 
 @app.post("/metrics/record-meeting")
 def record_meeting_scheduled():
-    """Record a meeting being scheduled"""
-    automation_metrics["total_meetings_scheduled"] += 1
+    """Record a meeting being scheduled (legacy: now recorded from the matching event)"""
     # Estimate time saved: ~10 min per meeting scheduling
-    automation_metrics["time_saved_minutes"] += 10
-    return {"success": True, "meetings_scheduled": automation_metrics["total_meetings_scheduled"]}
+    metrics = incr_metrics(total_meetings_scheduled=1, time_saved_minutes=10)
+    return {"success": True, "meetings_scheduled": metrics["total_meetings_scheduled"]}
 
 
 @app.post("/metrics/record-slack")
 def record_slack_message():
-    """Record a Slack message processed"""
-    automation_metrics["total_slack_messages"] += 1
-    return {"success": True, "slack_messages": automation_metrics["total_slack_messages"]}
+    """Record a Slack message processed (legacy: now recorded from the matching event)"""
+    metrics = incr_metrics(total_slack_messages=1)
+    return {"success": True, "slack_messages": metrics["total_slack_messages"]}
+
+
+def window_totals(series: List[dict]) -> dict:
+    """Sum of each metric over the slots of a series"""
+    return {name: sum(slot[name] for slot in series) for name in METRIC_NAMES}
+
+
+def window_trend(last_hour: int, last_day: int) -> str:
+    """Compare the last hour with the hourly average of the last day"""
+    hourly = last_day / 24
+    if last_hour > hourly * 1.2:
+        return "up"
+    if last_hour < hourly * 0.8:
+        return "down"
+    return "steady"
 
 
 @app.get("/metrics/dashboard")
-def get_metrics_dashboard():
-    """Get comprehensive metrics dashboard"""
+def get_metrics_dashboard(request: Request):
+    """Get comprehensive metrics dashboard.
+    
+    Time-dependent figures (uptime, rates, windows) are computed as of the
+    start of the current minute, so the ETag only has to cover the metrics
+    version and that minute.
+    """
+    as_of = time.time() // 60 * 60
+    etag = make_etag(request, storage.version_token("metrics"), as_of)
+    cached = not_modified(request, etag)
+    if cached is not None:
+        return cached
     try:
+        automation_metrics = storage.get_metrics()
+        last_hour = window_totals(storage.metric_series("minute"))
+        last_day = window_totals(storage.metric_series("hour"))
+        
         # Calculate efficiency score
         total_actions = (
             automation_metrics["total_emails_processed"] +
@@ -1151,6 +1415,7 @@ def get_metrics_dashboard():
             automation_metrics["total_meetings_scheduled"]
         )
         
+        automation_metrics["efficiency_score"] = 0
         if total_actions > 0:
             automation_metrics["efficiency_score"] = min(100, int(
                 (automation_metrics["autonomous_approvals"] / total_actions) * 100
@@ -1161,9 +1426,9 @@ def get_metrics_dashboard():
         
         # Calculate uptime
         start = datetime.fromisoformat(automation_metrics["start_time"])
-        uptime_hours = (datetime.now() - start).total_seconds() / 3600
+        uptime_hours = max(0.0, (datetime.fromtimestamp(as_of) - start).total_seconds() / 3600)
         
-        return {
+        return InstrumentedJSONResponse({
             "success": True,
             "metrics": {
                 "total_emails_processed": automation_metrics["total_emails_processed"],
@@ -1183,26 +1448,92 @@ def get_metrics_dashboard():
                 "automation_rate": f"{automation_metrics['efficiency_score']}%",
                 "tasks_per_day": round(automation_metrics["total_tasks_created"] / max(1, uptime_hours * 24), 2),
                 "email_processing_rate": round(automation_metrics["total_emails_processed"] / max(1, uptime_hours * 24), 2)
+            },
+            "windows": {
+                "last_hour": last_hour,
+                "last_24h": last_day,
+                "emails_per_minute": round(last_hour["total_emails_processed"] / 60, 2),
+                "tasks_per_hour": last_hour["total_tasks_created"],
+                "trend": window_trend(last_hour["total_tasks_created"], last_day["total_tasks_created"])
             }
-        }
+        }, headers=cache_headers(etag))
     except Exception as e:
         return {"success": False, "error": str(e)}
 
 
+@app.get("/metrics/timeseries")
+def get_metrics_timeseries(window: str = "minute"):
+    """Per-minute counts for the last hour (window=minute) or per-hour counts for the last day (window=hour)"""
+    if window not in ("minute", "hour"):
+        return {"success": False, "error": "window must be 'minute' or 'hour'"}
+    return {"success": True, "window": window, "series": storage.metric_series(window)}
+
+
 @app.post("/metrics/reset")
 def reset_metrics():
     """Reset all metrics"""
-    global automation_metrics
-    automation_metrics = {
-        "total_emails_processed": 0,
-        "total_tasks_created": 0,
-        "total_tasks_completed": 0,
-        "total_meetings_scheduled": 0,
-        "total_slack_messages": 0,
-        "autonomous_approvals": 0,
-        "human_approvals": 0,
-        "start_time": datetime.now().isoformat(),
-        "time_saved_minutes": 0,
-        "efficiency_score": 0
-    }
+    storage.reset_metrics()
+    event_bus.publish("metrics.reset", storage.get_metrics())
     return {"success": True, "message": "Metrics reset successfully"}
+
+
+@app.get("/metrics/cache")
+def get_cache_metrics():
+    """Hit rates and sizes of the email analysis result caches"""
+    return {
+        "caches": cache_stats(),
+        "deadline_parser": deadline_cache_stats(),
+        "timestamp": datetime.now().isoformat()
+    }
+
+
+@app.get("/metrics/prometheus")
+def get_prometheus_metrics():
+    """Request, agent and stage latency histograms plus store sizes, in Prometheus text format"""
+    sizes = {"tasks": [], "audit_logs": [], "calendar_events": [], "slack_messages": []}
+    for tenant in storage.tenants():
+        with tenant_scope(tenant):
+            sizes["tasks"].append(({"tenant": tenant}, storage.count_tasks()))
+            sizes["audit_logs"].append(({"tenant": tenant}, storage.count_audit()))
+            sizes["calendar_events"].append(({"tenant": tenant}, storage.count_events()))
+            sizes["slack_messages"].append(({"tenant": tenant}, storage.count_slack_messages()))
+    gauges = [(f"{store}_stored", f"Entries in the {store} store", samples) for store, samples in sizes.items()]
+    gauges.append(("event_subscribers", "Open change feed connections",
+                   [({}, event_bus.subscriber_count())]))
+    gauges.append(("jobs", "Background jobs by status (finished ones within JOB_HISTORY)",
+                   [({"status": status}, count) for status, count in job_queue.stats().items()]))
+    return Response(telemetry.render(gauges), media_type=PROMETHEUS_CONTENT_TYPE)
+
+
+# ============== Rule Configuration ==============
+
+@app.get("/rules")
+def get_rules_status():
+    """Source, version and last reload error of the keyword rule configuration"""
+    rule_registry.current()
+    return rule_registry.status()
+
+
+@app.post("/rules/reload")
+def reload_rules():
+    """Recompile the rules file now instead of waiting for the next change check"""
+    swapped = rule_registry.reload(force=True)
+    status = rule_registry.status()
+    if status["last_error"]:
+        return {"success": False, "error": status["last_error"], "rules": status}
+    return {"success": True, "reloaded": swapped, "rules": status}
+
+
+# ============== Tenancy ==============
+
+@app.get("/tenant")
+def get_tenant():
+    """The tenant this request resolved to and the size of its shard"""
+    return {
+        "tenant": current_tenant(),
+        "tasks": storage.count_tasks(),
+        "max_tasks": TENANT_MAX_TASKS or None,
+        "audit_entries": storage.count_audit(),
+        "calendar_events": storage.count_events(),
+        "slack_messages": storage.count_slack_messages()
+    }
@@ -0,0 +1,168 @@
+"""Automation metrics engine: striped counters and ring-buffer time series.
+
+Recording never takes a lock. Every thread writes to its own stripe, a
+flat list holding the metric totals followed by the ring buffers of each
+time-series window (per-minute slots for the last hour, per-hour slots
+for the last day). Each ring row starts with the slot number it belongs
+to; a write that lands on a row from an older slot zeroes it first, so
+memory stays fixed and recording is O(1). Reads merge every stripe; an
+exited thread's stripe is folded into a base stripe (see stripes.py).
+
+SeriesRings only describes the layout, so SharedCounters reuses it to keep
+the same series in shared memory for multi-worker deployments.
+"""
+
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from stripes import ThreadStripes
+
+
+class MetricWindow(NamedTuple):
+    name: str
+    slot_seconds: int
+    slots: int
+
+
+# Per-minute slots covering the last hour, per-hour slots covering the last day
+METRIC_WINDOWS = (MetricWindow("minute", 60, 60), MetricWindow("hour", 3600, 24))
+
+
+class SeriesRings:
+    """Layout of one ring buffer per window inside a flat int buffer.
+
+    Each window holds ``slots`` rows of (slot number, count per metric),
+    starting at ``offset``; ``size`` is the number of ints used.
+    """
+
+    def __init__(self, metrics: int, windows: Sequence[MetricWindow] = METRIC_WINDOWS, offset: int = 0):
+        self.metrics = metrics
+        self.windows = {w.name: w for w in windows}
+        self.row_size = 1 + metrics
+        self._bases: Dict[str, int] = {}
+        base = offset
+        for window in windows:
+            self._bases[window.name] = base
+            base += window.slots * self.row_size
+        self.size = base - offset
+
+    def add(self, buf, deltas: Sequence[Tuple[int, int]], now: float):
+        """Add (metric index, delta) pairs to the current slot of every window"""
+        row_size = self.row_size
+        for name, window in self.windows.items():
+            slot = int(now // window.slot_seconds)
+            row = self._bases[name] + (slot % window.slots) * row_size
+            if buf[row] != slot:
+                # Row still holds an expired slot: recycle it (element-wise, bufs may be memoryviews)
+                for i in range(row + 1, row + row_size):
+                    buf[i] = 0
+                buf[row] = slot
+            for index, delta in deltas:
+                buf[row + 1 + index] += delta
+
+    def read(self, bufs: Iterable, window: str, now: float) -> List[Tuple[int, List[int]]]:
+        """(slot start epoch, counts) for every slot in the window, oldest first, merged over bufs"""
+        w = self.windows[window]
+        current = int(now // w.slot_seconds)
+        first = current - w.slots + 1
+        rows = {slot: [0] * self.metrics for slot in range(first, current + 1)}
+        base = self._bases[window]
+        for buf in bufs:
+            for k in range(w.slots):
+                row = base + k * self.row_size
+                counts = rows.get(buf[row])
+                if counts is not None:
+                    for i, value in enumerate(buf[row + 1:row + self.row_size]):
+                        counts[i] += value
+        return [(slot * w.slot_seconds, rows[slot]) for slot in range(first, current + 1)]
+
+    def fold(self, dst, src):
+        """Merge src's rings into dst: same slot adds up, the newer slot wins a row"""
+        row_size = self.row_size
+        for name, window in self.windows.items():
+            base = self._bases[name]
+            for row in range(base, base + window.slots * row_size, row_size):
+                if src[row] > dst[row]:
+                    dst[row:row + row_size] = src[row:row + row_size]
+                elif src[row] == dst[row]:
+                    for i in range(row + 1, row + row_size):
+                        dst[i] += src[i]
+
+    def clear(self, buf):
+        for name, window in self.windows.items():
+            base = self._bases[name]
+            for i in range(base, base + window.slots * self.row_size):
+                buf[i] = 0
+
+
+def format_series(names: Sequence[str], rows: List[Tuple[int, List[int]]]) -> List[dict]:
+    """JSON shape of a series: one {"start": iso, metric: count, ...} per slot"""
+    return [
+        {"start": datetime.fromtimestamp(start).isoformat(), **dict(zip(names, counts))}
+        for start, counts in rows
+    ]
+
+
+class StripedMetrics:
+    """Per-thread metric stripes, merged on read"""
+
+    def __init__(self, names: Sequence[str], windows: Sequence[MetricWindow] = METRIC_WINDOWS):
+        self.names = tuple(names)
+        self._index = {name: i for i, name in enumerate(self.names)}
+        self.rings = SeriesRings(len(self.names), windows, offset=len(self.names))
+        self._size = len(self.names) + self.rings.size
+        self._stripes = ThreadStripes(self._size, self._fold)
+        self._lock = threading.Lock()  # only taken to reset
+        self._baseline = [0] * len(self.names)
+        self._series_baseline: Dict[str, Dict[int, List[int]]] = {}
+        self.start_time = datetime.now().isoformat()
+
+    def _fold(self, base: list, stripe: list):
+        for i in range(len(self.names)):
+            base[i] += stripe[i]
+        self.rings.fold(base, stripe)
+
+    def record(self, deltas: Dict[str, int], now: Optional[float] = None):
+        stripe = self._stripes.get()
+        indexed = [(self._index[name], int(delta)) for name, delta in deltas.items()]
+        for index, delta in indexed:
+            stripe[index] += delta
+        self.rings.add(stripe, indexed, time.time() if now is None else now)
+
+    def _sums(self) -> List[int]:
+        sums = [0] * len(self.names)
+        for stripe in self._stripes.snapshot():
+            for i in range(len(sums)):
+                sums[i] += stripe[i]
+        return sums
+
+    def totals(self) -> Dict[str, int]:
+        return {name: total - base for name, total, base in zip(self.names, self._sums(), self._baseline)}
+
+    def series(self, window: str, now: Optional[float] = None) -> List[Tuple[int, List[int]]]:
+        rows = self.rings.read(self._stripes.snapshot(), window, time.time() if now is None else now)
+        baseline = self._series_baseline.get(window)
+        if baseline:
+            slot_seconds = self.rings.windows[window].slot_seconds
+            for start, counts in rows:
+                before = baseline.get(start // slot_seconds)
+                if before:
+                    counts[:] = [c - b for c, b in zip(counts, before)]
+        return rows
+
+    def reset(self):
+        """Zero totals and series by recording the current values as a baseline.
+
+        Stripes belong to their threads, so they are never written here; a
+        record() racing with reset() is simply counted after it.
+        """
+        with self._lock:
+            self._baseline = self._sums()
+            now = time.time()
+            self._series_baseline = {}
+            for window, spec in self.rings.windows.items():
+                rows = self.rings.read(self._stripes.snapshot(), window, now)
+                self._series_baseline[window] = {start // spec.slot_seconds: counts for start, counts in rows}
+            self.start_time = datetime.now().isoformat()
@@ -0,0 +1,180 @@
+"""Per-workflow state and aggregate agent status for the agent layer.
+
+Each orchestration runs inside ``agent_tracker.workflow()``, which gives it
+its own Workflow record; agents mark their runs with ``agent_tracker.run()``.
+Agent status is derived from the runs currently in flight, so concurrent
+requests no longer overwrite one shared status field. Workflows belong to
+the tenant that started them and are only listed to that tenant; the
+per-agent counters are process-wide. Every change bumps ``version`` (and
+``changed_at``), which the status endpoint's ETag is built from.
+"""
+
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Dict, Optional
+
+from telemetry import telemetry
+from tenancy import current_tenant
+
+AGENT_KEYS = ("email_agent", "decision_agent", "calendar_agent", "task_agent")
+
+_current_workflow: ContextVar[Optional["Workflow"]] = ContextVar("current_workflow", default=None)
+
+
+class Workflow:
+    """State of one orchestration: overall status plus each agent step"""
+
+    __slots__ = ("id", "tenant", "started_at", "finished_at", "status", "steps", "error")
+
+    def __init__(self, tenant: str):
+        self.id = str(uuid.uuid4())
+        self.tenant = tenant
+        self.started_at = datetime.now().isoformat()
+        self.finished_at: Optional[str] = None
+        self.status = "running"
+        self.steps: Dict[str, str] = {}
+        self.error: Optional[str] = None
+
+    def to_dict(self) -> dict:
+        return {
+            "workflow_id": self.id,
+            "status": self.status,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "steps": dict(self.steps),
+            "error": self.error
+        }
+
+
+class _AgentStats:
+    __slots__ = ("in_flight", "runs", "failures", "last_run", "last_status")
+
+    def __init__(self):
+        self.in_flight = 0
+        self.runs = 0
+        self.failures = 0
+        self.last_run: Optional[str] = None
+        self.last_status = "idle"
+
+
+class AgentTracker:
+    """Thread-safe registry of in-flight workflows and agent runs"""
+
+    def __init__(self, agents=AGENT_KEYS, history: int = 50):
+        self._lock = threading.Lock()
+        self._agents = {key: _AgentStats() for key in agents}
+        self._history = history
+        self._active: Dict[str, Workflow] = {}
+        self._finished: Dict[str, deque] = {}
+        self._completed: Dict[str, int] = {}
+        self._failed: Dict[str, int] = {}
+        self.version = 0
+        self.changed_at = datetime.now().isoformat()
+
+    def _changed(self):
+        """Record a state change (caller holds the lock)"""
+        self.version += 1
+        self.changed_at = datetime.now().isoformat()
+
+    @contextmanager
+    def workflow(self):
+        """Register a workflow for the duration of the block"""
+        workflow = Workflow(current_tenant())
+        with self._lock:
+            self._active[workflow.id] = workflow
+            self._changed()
+        token = _current_workflow.set(workflow)
+        try:
+            yield workflow
+        except Exception as e:
+            self._finish(workflow, "failed", str(e))
+            raise
+        else:
+            self._finish(workflow, "completed")
+        finally:
+            _current_workflow.reset(token)
+
+    def _finish(self, workflow: Workflow, status: str, error: Optional[str] = None):
+        with self._lock:
+            workflow.status = status
+            workflow.error = error
+            workflow.finished_at = datetime.now().isoformat()
+            self._active.pop(workflow.id, None)
+            finished = self._finished.get(workflow.tenant)
+            if finished is None:
+                finished = self._finished[workflow.tenant] = deque(maxlen=self._history)
+            finished.append(workflow)
+            counts = self._completed if status == "completed" else self._failed
+            counts[workflow.tenant] = counts.get(workflow.tenant, 0) + 1
+            self._changed()
+
+    @contextmanager
+    def run(self, agent: str):
+        """Mark one agent run, attributed to the current workflow if there is one"""
+        workflow = _current_workflow.get()
+        stats = self._agents[agent]
+        with self._lock:
+            stats.in_flight += 1
+            stats.runs += 1
+            stats.last_run = datetime.now().isoformat()
+            if workflow is not None:
+                workflow.steps[agent] = "processing"
+            self._changed()
+        status = "error"
+        start = time.perf_counter()
+        try:
+            yield
+            status = "completed"
+        finally:
+            telemetry.agent_seconds.labels(agent, status).observe(time.perf_counter() - start)
+            with self._lock:
+                stats.in_flight -= 1
+                stats.last_status = status
+                if status == "error":
+                    stats.failures += 1
+                if workflow is not None:
+                    workflow.steps[agent] = status
+                self._changed()
+
+    def get(self, workflow_id: str) -> Optional[dict]:
+        """A workflow of the current tenant, in flight or recently finished"""
+        tenant = current_tenant()
+        with self._lock:
+            workflow = self._active.get(workflow_id)
+            if workflow is None:
+                workflow = next((w for w in self._finished.get(tenant, ()) if w.id == workflow_id), None)
+            return workflow.to_dict() if workflow and workflow.tenant == tenant else None
+
+    def agent_status(self) -> Dict[str, dict]:
+        """Per-agent status: processing while any run is in flight, else the last outcome"""
+        with self._lock:
+            return {
+                key: {
+                    "status": "processing" if stats.in_flight else stats.last_status,
+                    "last_run": stats.last_run,
+                    "in_flight": stats.in_flight,
+                    "runs": stats.runs,
+                    "failures": stats.failures
+                }
+                for key, stats in self._agents.items()
+            }
+
+    def workflow_summary(self) -> dict:
+        """The current tenant's workflows"""
+        tenant = current_tenant()
+        with self._lock:
+            return {
+                "in_flight": [w.to_dict() for w in self._active.values() if w.tenant == tenant],
+                "completed": self._completed.get(tenant, 0),
+                "failed": self._failed.get(tenant, 0),
+                "recent": [w.to_dict() for w in reversed(self._finished.get(tenant, ()))]
+            }
+
+
+# Shared tracker for the app process
+agent_tracker = AgentTracker()
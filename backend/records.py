@@ -0,0 +1,261 @@
+"""Compact record types for the in-memory stores.
+
+Tasks, calendar events, Slack messages and audit entries are kept as
+``__slots__`` objects instead of dicts. Each field has a kind:
+
+- ``time``: ISO timestamps are held as integer microseconds since the
+  epoch (wall clock, as ``datetime.now()`` reports it).
+- ``symbol``: short repeated strings (status, priority, agent, channel...)
+  are interned, so every record shares one object per distinct value.
+- ``blob``: long texts (email bodies) go through a content-addressed
+  BlobTable, so identical bodies are stored once.
+- ``plain``: kept as-is.
+
+Records serialize back to exactly the dict they were built from (same keys,
+same order, same values), so callers only ever see the existing JSON shapes.
+"""
+
+import hashlib
+import sys
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
+
+from fastjson import dumps
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+class _Missing:
+    """Marks a field the source dict did not have (distinct from None)"""
+
+    __slots__ = ()
+
+    def __repr__(self) -> str:
+        return "MISSING"
+
+
+MISSING = _Missing()
+
+
+def to_micros(value):
+    """Integer microseconds for an ISO timestamp that round-trips exactly; anything else unchanged"""
+    if type(value) is not str:
+        return value
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        return value
+    if parsed.tzinfo is not None:
+        return value
+    micros = (parsed - _EPOCH) // _MICROSECOND
+    # Date-only or differently formatted strings would not come back identical
+    return micros if from_micros(micros) == value else value
+
+
+def from_micros(value):
+    if type(value) is not int:
+        return value
+    return (_EPOCH + value * _MICROSECOND).isoformat()
+
+
+def intern_symbol(value):
+    return sys.intern(value) if type(value) is str else value
+
+
+class BlobTable:
+    """Content-addressed text storage: each distinct text is kept once, reference counted"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._blobs: Dict[bytes, list] = {}  # digest -> [text, references]
+
+    @staticmethod
+    def digest(text: str) -> bytes:
+        return hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+
+    def put(self, text):
+        """The stored copy of text (added with one reference, or shared with a new one)"""
+        if type(text) is not str or not text:
+            return text
+        key = self.digest(text)
+        with self._lock:
+            entry = self._blobs.get(key)
+            if entry is None:
+                entry = self._blobs[key] = [text, 0]
+            entry[1] += 1
+            return entry[0]
+
+    def release(self, text):
+        if type(text) is not str or not text:
+            return
+        key = self.digest(text)
+        with self._lock:
+            entry = self._blobs.get(key)
+            if entry is not None:
+                entry[1] -= 1
+                if entry[1] <= 0:
+                    del self._blobs[key]
+
+    def clear(self):
+        with self._lock:
+            self._blobs.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "blobs": len(self._blobs),
+                "references": sum(refs for _, refs in self._blobs.values()),
+                "chars": sum(len(text) for text, _ in self._blobs.values()),
+            }
+
+    def __len__(self) -> int:
+        return len(self._blobs)
+
+
+_ENCODE = {"plain": None, "time": to_micros, "symbol": intern_symbol}
+_DECODE = {"plain": None, "time": from_micros, "symbol": None, "blob": None}
+
+
+class Record:
+    """Base for slotted records; subclasses declare FIELDS and matching __slots__.
+
+    Keys outside FIELDS are kept in ``extra`` (None when there are none).
+    """
+
+    __slots__ = ("extra",)
+    FIELDS: Tuple[Tuple[str, str], ...] = ()
+    _KINDS: Dict[str, str] = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._KINDS = dict(cls.FIELDS)
+
+    @classmethod
+    def from_dict(cls, data: dict, blobs: Optional[BlobTable] = None) -> "Record":
+        record = cls.__new__(cls)
+        for name, kind in cls.FIELDS:
+            value = data.get(name, MISSING)
+            if value is not MISSING:
+                value = record._encode(kind, value, blobs)
+            setattr(record, name, value)
+        extra = {key: value for key, value in data.items() if key not in cls._KINDS}
+        record.extra = extra or None
+        return record
+
+    @staticmethod
+    def _encode(kind: str, value, blobs: Optional[BlobTable]):
+        if kind == "blob":
+            return blobs.put(value) if blobs is not None else value
+        encode = _ENCODE[kind]
+        return value if encode is None else encode(value)
+
+    def to_dict(self) -> dict:
+        result = {}
+        for name, kind in self.FIELDS:
+            value = getattr(self, name)
+            if value is not MISSING:
+                decode = _DECODE[kind]
+                result[name] = value if decode is None else decode(value)
+        if self.extra:
+            result.update(self.extra)
+        return result
+
+    def get(self, name: str, default=None):
+        kind = self._KINDS.get(name)
+        if kind is None:
+            return self.extra.get(name, default) if self.extra else default
+        value = getattr(self, name)
+        if value is MISSING:
+            return default
+        decode = _DECODE[kind]
+        return value if decode is None else decode(value)
+
+    def __getitem__(self, name: str):
+        value = self.get(name, MISSING)
+        if value is MISSING:
+            raise KeyError(name)
+        return value
+
+    def set(self, name: str, value, blobs: Optional[BlobTable] = None):
+        """Set one field (or extra key), releasing a replaced blob"""
+        kind = self._KINDS.get(name)
+        if kind is None:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[name] = value
+            return
+        if kind == "blob" and blobs is not None:
+            blobs.release(getattr(self, name))
+        setattr(self, name, self._encode(kind, value, blobs))
+
+    def release(self, blobs: Optional[BlobTable]):
+        """Drop this record's references into the blob table"""
+        if blobs is None:
+            return
+        for name, kind in self.FIELDS:
+            if kind == "blob":
+                blobs.release(getattr(self, name))
+
+
+class TaskRecord(Record):
+    __slots__ = ("id", "task", "deadline", "priority", "status", "reminder", "created_at", "autonomous",
+                 "calendar_event_id", "email_text", "approved_at", "approved_by", "completed_at")
+    FIELDS = (
+        ("id", "plain"), ("task", "plain"), ("deadline", "symbol"), ("priority", "symbol"),
+        ("status", "symbol"), ("reminder", "plain"), ("created_at", "time"), ("autonomous", "plain"),
+        ("calendar_event_id", "plain"), ("email_text", "blob"), ("approved_at", "time"),
+        ("approved_by", "symbol"), ("completed_at", "time"),
+    )
+
+
+class EventRecord(Record):
+    __slots__ = ("id", "title", "date", "time", "duration_minutes", "attendees", "created_at", "status",
+                 "conflict_check")
+    FIELDS = (
+        ("id", "plain"), ("title", "plain"), ("date", "symbol"), ("time", "symbol"),
+        ("duration_minutes", "plain"), ("attendees", "plain"), ("created_at", "time"), ("status", "symbol"),
+        ("conflict_check", "plain"),
+    )
+
+
+class MessageRecord(Record):
+    __slots__ = ("id", "channel", "message", "action", "created_at", "status")
+    FIELDS = (
+        ("id", "plain"), ("channel", "symbol"), ("message", "plain"), ("action", "symbol"),
+        ("created_at", "time"), ("status", "symbol"),
+    )
+
+
+class AuditEntry(Record):
+    """Immutable once appended, so its JSON encoding is computed once and kept"""
+
+    __slots__ = ("id", "timestamp", "agent", "action", "details", "encoded")
+    FIELDS = (
+        ("id", "plain"), ("timestamp", "time"), ("agent", "symbol"), ("action", "symbol"), ("details", "plain"),
+    )
+
+    @classmethod
+    def create(cls, entry_id: int, agent: str, action: str, details: str) -> "AuditEntry":
+        """A new entry stamped now, without formatting and re-parsing the timestamp"""
+        entry = cls.__new__(cls)
+        entry.id = entry_id
+        entry.timestamp = (datetime.now() - _EPOCH) // _MICROSECOND
+        entry.agent = intern_symbol(agent)
+        entry.action = intern_symbol(action)
+        entry.details = details
+        entry.extra = None
+        entry.encoded = None
+        return entry
+
+    @classmethod
+    def from_dict(cls, data: dict, blobs: Optional[BlobTable] = None) -> "AuditEntry":
+        entry = super().from_dict(data, blobs)
+        entry.encoded = None
+        return entry
+
+    def json(self) -> bytes:
+        if self.encoded is None:
+            self.encoded = dumps(self.to_dict())
+        return self.encoded
@@ -0,0 +1,220 @@
+"""Keyword rules loaded from a YAML/JSON file and hot-swapped on change.
+
+The file overrides any subset of the built-in defaults, section by section::
+
+    extraction:   # ExtractionEngine: action_verbs, deadline_patterns, high_keywords, low_keywords
+    overrides:    # PriorityOverrides: urgent_keywords, informational_terms, far_deadline_days, ...
+    scoring:      # ScoringRules: urgency_keywords, importance_keywords, thresholds, ...
+    tenants:
+      acme:
+        scoring:
+          thresholds: {High: 60, Medium: 30}
+
+Tenant sections apply to requests resolved to that tenant (see tenancy.py).
+Everything is compiled when the file is loaded; requests only pick up the
+current RuleSet and run its matchers. The file's mtime is polled at most
+every RULES_RELOAD_SECONDS, and a changed file is compiled off to the side
+and swapped in with a single reference assignment, so in-flight requests
+finish on the rules they started with. A file that fails to load or
+compile leaves the previous rules in place and is reported by /rules.
+"""
+
+import inspect
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+from extraction import ExtractionEngine, PriorityOverrides
+from scoring import ScoringRules
+from tenancy import current_tenant
+
+try:
+    import yaml
+except ImportError:  # pragma: no cover - JSON rule files still work without PyYAML
+    yaml = None
+
+RULES_FILE = os.getenv("RULES_FILE", "")
+RULES_RELOAD_SECONDS = float(os.getenv("RULES_RELOAD_SECONDS", "2"))
+
+# Section name -> compiled rule class; a section's keys are the class's constructor arguments
+SECTIONS = {
+    "extraction": ExtractionEngine,
+    "overrides": PriorityOverrides,
+    "scoring": ScoringRules,
+}
+
+
+def check_section(cls, options) -> dict:
+    """Reject unknown keys and values whose shape differs from the default's"""
+    if not isinstance(options, dict):
+        raise ValueError("expected a mapping of rule options")
+    params = inspect.signature(cls).parameters
+    for key, value in options.items():
+        if key not in params:
+            raise ValueError(f"unknown option '{key}'")
+        default = params[key].default
+        if isinstance(default, (list, tuple)):
+            ok = isinstance(value, list)
+        elif isinstance(default, dict):
+            ok = isinstance(value, dict)
+        elif isinstance(default, int):
+            ok = isinstance(value, int) and not isinstance(value, bool)
+        else:
+            ok = isinstance(value, type(default))
+        if not ok:
+            raise ValueError(f"option '{key}' should be a {type(default).__name__}, got {type(value).__name__}")
+    return options
+
+
+class RuleSet:
+    """One compiled configuration: extraction, priority overrides and scoring"""
+
+    __slots__ = ("extraction", "overrides", "scoring")
+
+    def __init__(self, config: Optional[dict] = None):
+        config = config or {}
+        for section, cls in SECTIONS.items():
+            try:
+                setattr(self, section, cls(**check_section(cls, config.get(section) or {})))
+            except (TypeError, ValueError, KeyError) as e:
+                raise ValueError(f"invalid '{section}' rules: {e}") from e
+
+
+class CompiledRules:
+    """Default RuleSet plus one RuleSet per configured tenant"""
+
+    def __init__(self, config: Optional[dict] = None, version: int = 0, source: Optional[str] = None):
+        config = config or {}
+        unknown = set(config) - set(SECTIONS) - {"tenants"}
+        if unknown:
+            raise ValueError(f"unknown rule sections: {sorted(unknown)}")
+        base = {section: dict(config.get(section) or {}) for section in SECTIONS}
+        self.default = RuleSet(base)
+        self.tenants: Dict[str, RuleSet] = {}
+        tenants = config.get("tenants") or {}
+        if not isinstance(tenants, dict):
+            raise ValueError("'tenants' must map tenant names to rule sections")
+        for tenant, overrides in tenants.items():
+            overrides = overrides or {}
+            if not isinstance(overrides, dict):
+                raise ValueError(f"rules for tenant '{tenant}' must be a mapping of sections")
+            unknown = set(overrides) - set(SECTIONS)
+            if unknown:
+                raise ValueError(f"unknown rule sections for tenant '{tenant}': {sorted(unknown)}")
+            merged = {section: {**base[section], **(overrides.get(section) or {})} for section in SECTIONS}
+            self.tenants[str(tenant)] = RuleSet(merged)
+        self.version = version
+        self.source = source
+        self.loaded_at = datetime.now().isoformat()
+
+    def get(self, tenant: Optional[str] = None) -> RuleSet:
+        if tenant is None:
+            return self.default
+        return self.tenants.get(tenant, self.default)
+
+
+def load_rules_file(path: str) -> dict:
+    """Parse a rules file: .yaml/.yml with PyYAML, anything else as JSON"""
+    with open(path, "r", encoding="utf-8") as f:
+        text = f.read()
+    if path.endswith((".yaml", ".yml")):
+        if yaml is None:
+            raise ValueError("PyYAML is required for YAML rule files")
+        config = yaml.safe_load(text)
+    else:
+        config = json.loads(text)
+    if config is None:
+        return {}
+    if not isinstance(config, dict):
+        raise ValueError("rules file must contain a mapping of sections")
+    return config
+
+
+class RuleRegistry:
+    """Holds the current CompiledRules and swaps in a new one when the file changes"""
+
+    def __init__(self, path: str = "", reload_interval: float = 2.0):
+        self.path = path
+        self.reload_interval = reload_interval
+        self.last_error: Optional[str] = None
+        self._lock = threading.Lock()
+        self._listeners: List[Callable[[CompiledRules], None]] = []
+        self._stamp = None
+        self._checked_at = time.monotonic()
+        self._rules = CompiledRules()
+        if path:
+            # A broken file at startup is a deployment error, so let it raise
+            self._stamp = self._file_stamp()
+            self._rules = CompiledRules(load_rules_file(path), version=1, source=path)
+
+    def _file_stamp(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def on_reload(self, listener: Callable[[CompiledRules], None]):
+        """Call listener with the new rules after every swap"""
+        self._listeners.append(listener)
+
+    def current(self, tenant: Optional[str] = None) -> RuleSet:
+        """RuleSet for tenant (or the defaults), reloading first if the file changed"""
+        if self.path and time.monotonic() - self._checked_at >= self.reload_interval:
+            self.reload()
+        return self._rules.get(tenant)
+
+    def reload(self, force: bool = False) -> bool:
+        """Recompile from the file if it changed (or always, with force). Returns True on swap"""
+        if not self.path:
+            return False
+        # Only one thread checks at a time; the others keep using the current rules
+        if not self._lock.acquire(blocking=force):
+            return False
+        try:
+            self._checked_at = time.monotonic()
+            stamp = self._file_stamp()
+            if not force and stamp == self._stamp:
+                return False
+            self._stamp = stamp
+            try:
+                rules = CompiledRules(load_rules_file(self.path), version=self._rules.version + 1, source=self.path)
+            except Exception as e:
+                self.last_error = f"{type(e).__name__}: {e}"
+                return False
+            self.last_error = None
+            self._rules = rules
+        finally:
+            self._lock.release()
+        for listener in self._listeners:
+            listener(rules)
+        return True
+
+    def status(self) -> dict:
+        rules = self._rules
+        return {
+            "source": rules.source or "defaults",
+            "version": rules.version,
+            "loaded_at": rules.loaded_at,
+            "tenants": sorted(rules.tenants),
+            "reload_interval_seconds": self.reload_interval,
+            "last_error": self.last_error
+        }
+
+
+# Shared registry for the app process (and each batch worker process)
+rule_registry = RuleRegistry(RULES_FILE, RULES_RELOAD_SECONDS)
+
+
+def current_rules(tenant: Optional[str] = None) -> RuleSet:
+    """RuleSet for tenant, by default the current request's tenant"""
+    return rule_registry.current(tenant or current_tenant())
+
+
+def score_batch_chunk(job: Tuple[str, List[str]]) -> List[dict]:
+    """Batch-score a (tenant, texts) chunk (picklable entry point for worker processes)"""
+    tenant, texts = job
+    return current_rules(tenant).scoring.batch.score(texts)
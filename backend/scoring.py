@@ -0,0 +1,375 @@
+"""Priority scoring for single emails and vectorized scoring for large batches.
+
+``ScoringRules.score_email`` is the rule set behind /priority/score; the
+module constants are its defaults, and the rules module compiles tuned
+copies from configuration. ``score_batch`` produces the same scores and
+reasons for many emails at once: it builds a
+keyword-presence matrix for the whole batch, computes the component scores
+with NumPy array operations, and builds each distinct result only once.
+NumPy is optional; without it batches are scored email by email.
+"""
+
+import re
+from functools import cached_property
+from typing import Dict, List, Optional, Sequence
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised only without numpy installed
+    np = None
+
+URGENCY_KEYWORDS = {
+    "urgent": 30, "asap": 30, "immediately": 35, "critical": 40,
+    "emergency": 40, "now": 25, "rush": 25, "deadline": 15,
+    "time-sensitive": 20, "quick": 15
+}
+
+IMPORTANCE_KEYWORDS = {
+    "important": 20, "priority": 25, "key": 15, "critical": 30,
+    "essential": 20, "required": 15, "mandatory": 25, "must": 15
+}
+
+# Only the first VIP_WINDOW characters (the greeting/signature area) are checked
+VIP_PATTERNS = ["ceo", "cto", "cfo", "director", "vp ", "president", "founder", "boss"]
+VIP_WINDOW = 200
+VIP_SCORE = 20
+
+LOW_PRIORITY_TERMS = ["fyi", "for your information", "just letting you know",
+                      "heads up", "when possible", "at your leisure"]
+
+LOW_PRIORITY_PENALTY = {"urgency_score": 30, "importance_score": 20}
+
+DEADLINE_PATTERN = r"(by|due|deadline)\s+(.+?)(?:\.|$)"
+WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday"]
+
+# Deadline buckets in rule order: the first whose terms appear in the deadline phrase wins
+DEADLINE_RULES = [
+    {"terms": ["today"], "score": 50, "label": "Today"},
+    {"terms": ["tomorrow"], "score": 45, "label": "Tomorrow"},
+    {"terms": WEEKDAYS, "score": 30, "label": "This week"},
+    {"terms": ["next week"], "score": 15, "label": "Next week"},
+]
+
+# Lowest total score for each level, checked from the highest; anything below is Low
+PRIORITY_THRESHOLDS = {"High": 70, "Medium": 40}
+
+LOW_PRIORITY_REASON = "Low priority indicators found (FYI/Info)"
+SCORE_COMPONENTS = ("urgency_score", "importance_score", "deadline_score", "sender_score", "keyword_score")
+
+
+def _trigram_code(text: str) -> int:
+    return (ord(text[0]) << 14) | (ord(text[1]) << 7) | ord(text[2])
+
+
+class ScoringRules:
+    """Scoring keyword sets, weights and thresholds compiled into lookup tables.
+
+    Reason strings and the deadline/threshold decision tables are built once
+    here, so scoring an email only runs the keyword matches.
+    """
+
+    def __init__(
+        self,
+        urgency_keywords: Dict[str, int] = URGENCY_KEYWORDS,
+        importance_keywords: Dict[str, int] = IMPORTANCE_KEYWORDS,
+        vip_patterns: Sequence[str] = VIP_PATTERNS,
+        vip_window: int = VIP_WINDOW,
+        vip_score: int = VIP_SCORE,
+        low_priority_terms: Sequence[str] = LOW_PRIORITY_TERMS,
+        low_priority_penalty: Dict[str, int] = LOW_PRIORITY_PENALTY,
+        deadline_pattern: str = DEADLINE_PATTERN,
+        deadline_rules: Sequence[dict] = DEADLINE_RULES,
+        thresholds: Dict[str, int] = PRIORITY_THRESHOLDS,
+    ):
+        unknown = set(low_priority_penalty) - {"urgency_score", "importance_score"}
+        if unknown:
+            raise ValueError(f"low_priority_penalty only applies to urgency_score/importance_score, got {sorted(unknown)}")
+
+        self.urgency = tuple(
+            (k, int(s), f"Found urgency keyword: '{k}' (+{s})") for k, s in urgency_keywords.items()
+        )
+        self.importance = tuple(
+            (k, int(s), f"Found importance keyword: '{k}' (+{s})") for k, s in importance_keywords.items()
+        )
+        self.vip_patterns = tuple(vip_patterns)
+        self.vip_window = int(vip_window)
+        self.vip_score = int(vip_score)
+        self.vip_reasons = tuple(f"VIP sender detected: '{p}' (+{self.vip_score})" for p in self.vip_patterns)
+        self.low_priority_terms = tuple(low_priority_terms)
+        self.urgency_penalty = int(low_priority_penalty.get("urgency_score", 0))
+        self.importance_penalty = int(low_priority_penalty.get("importance_score", 0))
+        self.deadline_re = re.compile(deadline_pattern)
+        if self.deadline_re.groups < 2:
+            raise ValueError("deadline_pattern needs a second group capturing the deadline phrase")
+        self.deadline_rules = tuple(
+            (tuple(rule["terms"]), int(rule["score"]), f"Deadline: {rule['label']} (+{rule['score']})")
+            for rule in deadline_rules
+        )
+        self.thresholds = tuple(sorted(((int(s), level) for level, s in thresholds.items()), reverse=True))
+
+    def deadline_bucket(self, email_lower: str) -> int:
+        """Index into deadline_rules for the first deadline phrase, or -1"""
+        match = self.deadline_re.search(email_lower)
+        if not match:
+            return -1
+        deadline_text = match.group(2).strip()
+        for bucket, (terms, _, _) in enumerate(self.deadline_rules):
+            if any(term in deadline_text for term in terms):
+                return bucket
+        return -1
+
+    def priority_level(self, total_score: int) -> str:
+        for threshold, level in self.thresholds:
+            if total_score >= threshold:
+                return level
+        return "Low"
+
+    def build_result(self, scores: Dict[str, int], reasons: List[str], is_low_priority: bool) -> dict:
+        total_score = sum(scores.values())
+        level = self.priority_level(total_score)
+        return {
+            "priority_level": level,
+            "total_score": total_score,
+            "scores": scores,
+            "reasons": reasons,
+            "decision_explanation": f"AI calculated priority score: {total_score}/100 → {level} priority",
+            "is_low_priority": is_low_priority
+        }
+
+    def score_email(self, email_text: str) -> dict:
+        """Score one email"""
+        email_lower = email_text.lower()
+        scores = dict.fromkeys(SCORE_COMPONENTS, 0)
+        reasons = []
+
+        # Urgency scoring (0-100)
+        for keyword, score, reason in self.urgency:
+            if keyword in email_lower:
+                scores["urgency_score"] = max(scores["urgency_score"], score)
+                reasons.append(reason)
+
+        # Importance scoring based on content
+        for keyword, score, reason in self.importance:
+            if keyword in email_lower:
+                scores["importance_score"] = max(scores["importance_score"], score)
+                reasons.append(reason)
+
+        # Deadline scoring
+        bucket = self.deadline_bucket(email_lower)
+        if bucket >= 0:
+            _, scores["deadline_score"], reason = self.deadline_rules[bucket]
+            reasons.append(reason)
+
+        # Sender scoring (VIP detection)
+        head = email_lower[:self.vip_window]
+        for pattern, reason in zip(self.vip_patterns, self.vip_reasons):
+            if pattern in head:
+                scores["sender_score"] = self.vip_score
+                reasons.append(reason)
+                break
+
+        # FYI/Low priority detection (negative scoring)
+        is_low_priority = any(term in email_lower for term in self.low_priority_terms)
+        if is_low_priority:
+            scores["urgency_score"] = max(0, scores["urgency_score"] - self.urgency_penalty)
+            scores["importance_score"] = max(0, scores["importance_score"] - self.importance_penalty)
+            reasons.append(LOW_PRIORITY_REASON)
+
+        return self.build_result(scores, reasons, is_low_priority)
+
+    @cached_property
+    def batch(self) -> "BatchScorer":
+        """Vectorized scorer for these rules, built on first batch request"""
+        return BatchScorer(self)
+
+
+# Emails scanned per presence-matrix chunk (bounds the size of the byte arrays)
+SCORE_CHUNK = 10000
+
+
+class BatchScorer:
+    """Scores many emails with a one-pass keyword matcher and NumPy arithmetic.
+
+    The matcher plays the role of an Aho-Corasick automaton without a
+    Python-level state machine (which is slower than the per-email loops it
+    replaces): the whole batch is concatenated into one ASCII byte array,
+    every position's 3-character code is looked up in a table of vocabulary
+    prefixes in a single vectorized pass, and only those candidate positions
+    are verified against the rest of each term.
+    """
+
+    def __init__(self, rules: ScoringRules):
+        self.rules = rules
+        # Column layout of the presence matrix: urgency, importance, VIP, low-priority terms
+        self.terms = (
+            [k for k, _, _ in rules.urgency] + [k for k, _, _ in rules.importance]
+            + list(rules.vip_patterns) + list(rules.low_priority_terms)
+        )
+        self.vocabulary = list(dict.fromkeys(self.terms))
+
+        u, i, v = len(rules.urgency), len(rules.importance), len(rules.vip_patterns)
+        self.urgency_cols = slice(0, u)
+        self.importance_cols = slice(u, u + i)
+        self.vip_cols = slice(u + i, u + i + v)
+        self.low_cols = slice(u + i + v, len(self.terms))
+        self.column_reasons = [reason for _, _, reason in rules.urgency + rules.importance]
+
+        # Feature code layout: keyword hits, deadline bucket + 1, first VIP + 1, low flag
+        self.bucket_bits = (len(rules.deadline_rules) + 1).bit_length()
+        self.vip_bits = (v + 1).bit_length()
+        self.packable = self.importance_cols.stop + self.bucket_bits + self.vip_bits + 1 <= 63
+
+        # Terms grouped by their first three characters; the table maps a 21-bit
+        # trigram code (three 7-bit ASCII chars) to its group number. Terms that
+        # cannot be encoded that way fall back to per-email substring tests.
+        self.fallback_terms = [t for t in self.vocabulary if len(t) < 3 or not t.isascii()]
+        self.max_term_length = max(map(len, self.vocabulary), default=0)
+        self.groups: List[List[str]] = []
+        if np is not None:
+            self.urgency_weights = np.array([s for _, s, _ in rules.urgency], dtype=np.int32)
+            self.importance_weights = np.array([s for _, s, _ in rules.importance], dtype=np.int32)
+            self.deadline_scores = np.array([s for _, s, _ in rules.deadline_rules] + [0], dtype=np.int32)
+            by_prefix: Dict[str, List[str]] = {}
+            for term in self.vocabulary:
+                if len(term) >= 3 and term.isascii():
+                    by_prefix.setdefault(term[:3], []).append(term)
+            self.trigram_table = np.zeros(1 << 21, dtype=np.int8 if len(by_prefix) < 128 else np.int16)
+            for prefix, terms in by_prefix.items():
+                self.groups.append(terms)
+                self.trigram_table[_trigram_code(prefix)] = len(self.groups)
+
+    def find_terms(self, lowers: Sequence[str]) -> Dict[str, tuple]:
+        """Map each vocabulary term to (rows, offsets) of its occurrences"""
+        starts = np.zeros(len(lowers), dtype=np.int64)
+        if len(lowers) > 1:
+            starts[1:] = np.cumsum([len(text) + 1 for text in lowers[:-1]])
+        # 'replace' turns each non-ASCII char into one '?', so byte offsets equal char offsets
+        data = np.frombuffer("\0".join(lowers).encode("ascii", "replace"), dtype=np.uint8)
+
+        # Zero padding gives every position a full trigram and lets verification
+        # read past the end without bounds checks (no term contains NUL)
+        n = len(data)
+        wide = np.zeros(n + max(self.max_term_length, 2), dtype=np.int32)
+        wide[:n] = data
+        codes = wide[:n] << 14
+        codes |= wide[1:n + 1] << 7
+        codes |= wide[2:n + 2]
+        group_ids = self.trigram_table[codes]
+        candidates = np.flatnonzero(group_ids)
+        candidate_groups = group_ids[candidates]
+
+        found: Dict[str, tuple] = {}
+        for group, terms in enumerate(self.groups, start=1):
+            positions = candidates[candidate_groups == group]
+            for term in terms:
+                matched = positions
+                for k in range(3, len(term)):
+                    matched = matched[wide[matched + k] == ord(term[k])]
+                found[term] = self._locate(starts, matched)
+        for term in self.fallback_terms:
+            rows = np.flatnonzero(np.fromiter((term in text for text in lowers), dtype=bool, count=len(lowers)))
+            offsets = np.fromiter((lowers[r].find(term) for r in rows), dtype=np.int64, count=len(rows))
+            found[term] = (rows, offsets)
+        return found
+
+    @staticmethod
+    def _locate(starts, positions) -> tuple:
+        rows = np.searchsorted(starts, positions, side="right") - 1
+        return rows, positions - starts[rows]
+
+    def presence(self, lowers: Sequence[str], found: Dict[str, tuple]):
+        """Boolean (emails x terms) matrix; VIP columns only count hits inside the VIP window"""
+        matrix = np.zeros((len(lowers), len(self.terms)), dtype=bool)
+        for column, term in enumerate(self.terms):
+            rows, offsets = found[term]
+            if self.vip_cols.start <= column < self.vip_cols.stop:
+                rows = rows[offsets + len(term) <= self.rules.vip_window]
+            matrix[rows, column] = True
+        return matrix
+
+    def score(self, texts: Sequence[str]) -> List[dict]:
+        if np is None:
+            return [self.rules.score_email(text) for text in texts]
+        results = []
+        for start in range(0, len(texts), SCORE_CHUNK):
+            results.extend(self.score_chunk(texts[start:start + SCORE_CHUNK]))
+        return results
+
+    def score_chunk(self, texts: Sequence[str]) -> List[dict]:
+        if not texts:
+            return []
+
+        rules = self.rules
+        lowers = [text.lower() for text in texts]
+        matrix = self.presence(lowers, self.find_terms(lowers))
+        keyword_hits = matrix[:, :self.importance_cols.stop]
+        vip_hits = matrix[:, self.vip_cols]
+        low = matrix[:, self.low_cols].any(axis=1)
+        buckets = np.fromiter((rules.deadline_bucket(text) for text in lowers), dtype=np.int64, count=len(lowers))
+        has_vip = vip_hits.any(axis=1)
+        first_vip = np.where(has_vip, vip_hits.argmax(axis=1), -1)
+
+        # Every output field is a function of these features, so emails are
+        # grouped by a packed feature code and each distinct code is built once
+        width = keyword_hits.shape[1]
+        if self.packable:
+            codes = keyword_hits.astype(np.int64) @ (np.int64(1) << np.arange(width, dtype=np.int64))
+            codes |= (buckets + 1) << width
+            codes |= (first_vip + 1) << (width + self.bucket_bits)
+            codes |= low.astype(np.int64) << (width + self.bucket_bits + self.vip_bits)
+            _, first_rows, inverse = np.unique(codes, return_index=True, return_inverse=True)
+        else:
+            # Too many keyword columns for one int64: group on the feature rows instead
+            features = np.column_stack([keyword_hits, buckets + 1, first_vip + 1, low]).astype(np.int32)
+            _, first_rows, inverse = np.unique(features, axis=0, return_index=True, return_inverse=True)
+
+        # Component scores for one representative email per distinct code
+        hits = matrix[first_rows]
+        low = low[first_rows]
+        urgency = (hits[:, self.urgency_cols] * self.urgency_weights).max(axis=1, initial=0)
+        importance = (hits[:, self.importance_cols] * self.importance_weights).max(axis=1, initial=0)
+        urgency = np.where(low, np.maximum(urgency - rules.urgency_penalty, 0), urgency)
+        importance = np.where(low, np.maximum(importance - rules.importance_penalty, 0), importance)
+        buckets = buckets[first_rows]
+        deadline = self.deadline_scores[buckets]  # bucket -1 picks the trailing 0
+        first_vip = first_vip[first_rows]
+
+        templates = []
+        for row_hits, bucket, vip, is_low, urgency_score, importance_score, deadline_score in zip(
+            keyword_hits[first_rows].tolist(), buckets.tolist(), first_vip.tolist(), low.tolist(),
+            urgency.tolist(), importance.tolist(), deadline.tolist()
+        ):
+            reasons = [reason for reason, hit in zip(self.column_reasons, row_hits) if hit]
+            if bucket >= 0:
+                reasons.append(rules.deadline_rules[bucket][2])
+            if vip >= 0:
+                reasons.append(rules.vip_reasons[vip])
+            if is_low:
+                reasons.append(LOW_PRIORITY_REASON)
+            scores = {
+                "urgency_score": urgency_score,
+                "importance_score": importance_score,
+                "deadline_score": deadline_score,
+                "sender_score": rules.vip_score if vip >= 0 else 0,
+                "keyword_score": 0
+            }
+            templates.append(rules.build_result(scores, reasons, is_low))
+
+        return [
+            {**template, "scores": dict(template["scores"]), "reasons": list(template["reasons"])}
+            for template in map(templates.__getitem__, inverse.ravel().tolist())
+        ]
+
+
+# Rules compiled from the defaults above; the rules module swaps in configured ones
+default_scoring_rules = ScoringRules()
+
+
+def score_email(email_text: str, rules: Optional[ScoringRules] = None) -> dict:
+    """Score one email with the given rules (the defaults if omitted)"""
+    return (rules or default_scoring_rules).score_email(email_text)
+
+
+def score_batch(texts: Sequence[str], rules: Optional[ScoringRules] = None) -> List[dict]:
+    """Score many emails; same output as score_email for each"""
+    return (rules or default_scoring_rules).batch.score(texts)
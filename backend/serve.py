@@ -0,0 +1,73 @@
+"""Production launcher for the API.
+
+    python serve.py [--workers N] [--host 0.0.0.0] [--port 10000]
+
+Runs gunicorn with uvicorn workers when gunicorn is installed, otherwise
+uvicorn's own process manager. The worker count defaults to WEB_CONCURRENCY
+(1 if unset), the port to PORT.
+
+With more than one worker, per-process state would diverge, so the
+launcher switches the app into multi-worker mode before forking:
+
+- SHARED_STATE_PATH points every worker at the same memory-mapped counter
+  files (task ids and automation metrics), created fresh for this run.
+- STORAGE_BACKEND defaults to ``sqlite`` so tasks, audit entries, calendar
+  events and Slack messages are shared too. ``memory`` is refused: each
+  worker would only see its own lists, and all of them would spill audit
+  segments into the same AUDIT_DIR files.
+"""
+
+import argparse
+import glob
+import os
+import shutil
+import sys
+import tempfile
+
+
+def default_shared_state_path(port: int) -> str:
+    directory = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    return os.path.join(directory, f"flowpilot-{port}")
+
+
+def prepare_multi_worker(port: int):
+    """Configure the environment the workers inherit for a shared-state run"""
+    backend = os.environ.setdefault("STORAGE_BACKEND", "sqlite")
+    if backend.lower() == "memory":
+        sys.exit("STORAGE_BACKEND=memory supports a single worker; use sqlite or --workers 1")
+    path = os.environ.setdefault("SHARED_STATE_PATH", default_shared_state_path(port))
+    # Counter files from an earlier run would carry stale values; workers reseed from storage
+    for stale in glob.glob(path) + glob.glob(path + ".*"):
+        os.remove(stale)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=int(os.getenv("WEB_CONCURRENCY", "1")))
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "10000")))
+    args = parser.parse_args()
+
+    workers = max(1, args.workers)
+    if workers > 1:
+        prepare_multi_worker(args.port)
+    print(f"Starting {workers} worker(s) on {args.host}:{args.port} "
+          f"(storage: {os.getenv('STORAGE_BACKEND', 'memory')}, "
+          f"shared counters: {os.getenv('SHARED_STATE_PATH') or 'off'})", flush=True)
+
+    if workers > 1 and shutil.which("gunicorn"):
+        # exec so gunicorn's arbiter owns the process and receives the platform's signals
+        os.execvp("gunicorn", [
+            "gunicorn", "main:app",
+            "--worker-class", "uvicorn.workers.UvicornWorker",
+            "--workers", str(workers),
+            "--bind", f"{args.host}:{args.port}",
+            "--graceful-timeout", "30",
+        ])
+
+    import uvicorn
+    uvicorn.run("main:app", host=args.host, port=args.port, workers=workers)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,133 @@
+"""Counters shared by every worker process through a memory-mapped file.
+
+In multi-worker mode (see serve.py) each tenant shard keeps its task-id
+allocator and automation metrics in a small file of int64 slots, normally
+on /dev/shm, mapped by every worker. Updates take a thread lock plus an
+flock on the file for the few nanoseconds of the read-modify-write, so
+ids stay unique and monotonic and metrics stay exact across processes
+without a database round trip. Reads are lock-free (aligned int64 slots).
+
+Counters listed in ``series_names`` also get the ring-buffer time series
+from metrics.py, updated inside the same critical section as the totals.
+"""
+
+import mmap
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from metrics import METRIC_WINDOWS, MetricWindow, SeriesRings
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX: only safe with a single process
+    fcntl = None
+
+SHARED_STATE_PATH = os.getenv("SHARED_STATE_PATH", "")
+
+_MAGIC = 0x464C4F5750494C54  # "FLOWPILT"
+_HEADER = ("magic", "initialized", "start_time_us")
+
+
+class SharedCounters:
+    """Named int64 counters in a file mapped by every worker"""
+
+    def __init__(self, path: str, names: Sequence[str], series_names: Sequence[str] = (),
+                 windows: Sequence[MetricWindow] = METRIC_WINDOWS):
+        self.path = path
+        self.names = tuple(names)
+        self._index = {name: i for i, name in enumerate(_HEADER + self.names)}
+        self.series_names = tuple(series_names)
+        self._series_index = {name: i for i, name in enumerate(self.series_names)}
+        self.rings = SeriesRings(len(self.series_names), windows, offset=len(self._index))
+        size = max(mmap.PAGESIZE, 8 * (len(self._index) + self.rings.size))
+        self._thread_lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        with self._locked():
+            if os.fstat(self._fd).st_size < size:
+                os.ftruncate(self._fd, size)
+            self._mm = mmap.mmap(self._fd, size)
+            self._slots = memoryview(self._mm).cast("q")
+            if self._slots[0] != _MAGIC:
+                for i in range(len(self._slots)):
+                    self._slots[i] = 0
+                self._slots[0] = _MAGIC
+
+    @contextmanager
+    def _locked(self):
+        # flock does not exclude threads sharing this descriptor, hence the thread lock
+        with self._thread_lock:
+            if fcntl is not None:
+                fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def seed(self, load: Callable[[], Dict[str, int]]):
+        """Initialize the counters from load() unless another worker already did"""
+        with self._locked():
+            if self._slots[self._index["initialized"]]:
+                return
+            values = load()
+            for name, value in values.items():
+                self._slots[self._index[name]] = int(value)
+            if not values.get("start_time_us"):
+                self._slots[self._index["start_time_us"]] = time.time_ns() // 1000
+            self._slots[self._index["initialized"]] = 1
+
+    def incr(self, name: str, delta: int = 1) -> int:
+        i = self._index[name]
+        with self._locked():
+            self._slots[i] += delta
+            return self._slots[i]
+
+    def incr_many(self, deltas: Dict[str, int], now: Optional[float] = None):
+        slots = [(self._index[name], int(delta)) for name, delta in deltas.items()]
+        series = [(self._series_index[name], int(delta)) for name, delta in deltas.items()
+                  if name in self._series_index]
+        with self._locked():
+            for i, delta in slots:
+                self._slots[i] += delta
+            if series:
+                self.rings.add(self._slots, series, time.time() if now is None else now)
+
+    def raise_to(self, name: str, value: int):
+        """Set a counter to max(current, value)"""
+        i = self._index[name]
+        with self._locked():
+            if self._slots[i] < value:
+                self._slots[i] = value
+
+    def reset(self, names: Sequence[str]):
+        """Zero the given counters and the time series, and restart the start time"""
+        with self._locked():
+            for name in names:
+                self._slots[self._index[name]] = 0
+            self.rings.clear(self._slots)
+            self._slots[self._index["start_time_us"]] = time.time_ns() // 1000
+
+    def get(self, name: str) -> int:
+        return self._slots[self._index[name]]
+
+    def snapshot(self, names: Optional[Sequence[str]] = None) -> Dict[str, int]:
+        return {name: self._slots[self._index[name]] for name in (names or self.names)}
+
+    def series(self, window: str, now: Optional[float] = None) -> List[Tuple[int, List[int]]]:
+        return self.rings.read([self._slots], window, time.time() if now is None else now)
+
+    def start_time(self) -> str:
+        return datetime.fromtimestamp(self.get("start_time_us") / 1e6).isoformat()
+
+    def close(self):
+        self._slots.release()
+        self._mm.close()
+        os.close(self._fd)
@@ -0,0 +1,919 @@
+"""Pluggable state storage: in-memory (default) or SQLite in WAL mode.
+
+Select the backend with STORAGE_BACKEND=memory|sqlite. The SQLite backend
+keeps state in SQLITE_PATH so it survives restarts and can be shared by
+several workers; every write commits on its own (cheap in WAL mode with
+synchronous=NORMAL), so the database write lock is only held for the
+duration of one statement or one short read-modify-write transaction.
+
+Either backend is sharded by tenant: every tenant gets its own backend
+instance (its own stores and locks, or its own database file), and
+ShardedStorage routes each call to the current tenant's shard.
+
+With SHARED_STATE_PATH set (multi-worker mode, see serve.py), each shard's
+task-id allocator and metrics live in SharedCounters mapped by every
+worker instead of in one process (memory) or in a database write
+(SQLite, which persists them in the background).
+
+Metrics are recorded through the engine in metrics.py: lock-free striped
+counters in a single process, and per-minute / per-hour time series next
+to the totals in either mode.
+
+Every shard keeps per-store versions (versions.py) that its writes bump;
+``version_token()`` feeds the read endpoints' ETags.
+"""
+
+import bisect
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+import json
+import os
+import sqlite3
+import threading
+from datetime import date, datetime
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from audit import AuditLog
+from fastjson import dumps
+from metrics import StripedMetrics, format_series
+from records import MessageRecord
+from shared_state import SHARED_STATE_PATH, SharedCounters
+from stores import (
+    DEFAULT_EVENT_MINUTES, CalendarIndex, Page, TaskStore, event_duration, free_slots_between,
+    make_page, merge_busy, normalize_date, parse_date, parse_time_minutes,
+)
+from tenancy import DEFAULT_TENANT, current_tenant
+from versions import VERSION_COUNTER_NAMES, StoreVersions
+
+METRIC_NAMES = (
+    "total_emails_processed",
+    "total_tasks_created",
+    "total_tasks_completed",
+    "total_meetings_scheduled",
+    "total_slack_messages",
+    "autonomous_approvals",
+    "human_approvals",
+    "time_saved_minutes",
+)
+
+TASK_INDEX_FIELDS = TaskStore.INDEXED_FIELDS
+
+# Counters kept in shared memory in multi-worker mode
+SHARED_COUNTER_NAMES = ("task_id",) + METRIC_NAMES
+
+
+def shared_metrics(counters: SharedCounters) -> dict:
+    """Automation metrics read from shared counters"""
+    metrics = counters.snapshot(METRIC_NAMES)
+    metrics["start_time"] = counters.start_time()
+    return metrics
+
+
+class Storage(ABC):
+    """Interface shared by all storage backends (a backend missing a method cannot be instantiated)"""
+
+    # Tasks
+    @abstractmethod
+    def next_task_id(self) -> int:
+        ...
+    @abstractmethod
+    def add_task(self, record: dict) -> dict:
+        ...
+    @abstractmethod
+    def get_task(self, task_id: int) -> Optional[dict]:
+        ...
+    @abstractmethod
+    def update_task(self, task_id: int, **fields) -> Optional[dict]:
+        ...
+    @abstractmethod
+    def page_tasks(self, after: Optional[int] = None, limit: Optional[int] = None, **filters) -> Page:
+        ...
+    @abstractmethod
+    def count_tasks(self, field: Optional[str] = None, value=None) -> int:
+        ...
+    @abstractmethod
+    def evict_completed_tasks(self, max_tasks: int) -> List[int]:
+        ...
+
+    # Audit log
+    @abstractmethod
+    def append_audit(self, agent: str, action: str, details: str) -> dict:
+        ...
+    @abstractmethod
+    def page_audit(self, after: Optional[int] = None, before: Optional[int] = None, limit: int = 100,
+                   agent: Optional[str] = None) -> Page:
+        ...
+    @abstractmethod
+    def count_audit(self) -> int:
+        ...
+    @abstractmethod
+    def clear_audit(self):
+        ...
+
+    def page_audit_json(self, after: Optional[int] = None, before: Optional[int] = None, limit: int = 100,
+                        agent: Optional[str] = None) -> Page:
+        """page_audit() with (id, JSON bytes) items, for responses that splice them in"""
+        page = self.page_audit(after, before, limit, agent)
+        return page._replace(items=[(entry["id"], dumps(entry)) for entry in page.items])
+
+    # Calendar
+    @abstractmethod
+    def add_event(self, event: dict) -> dict:
+        ...
+    @abstractmethod
+    def page_events(self, after: Optional[int] = None, limit: Optional[int] = None,
+                    start: Optional[date] = None, end: Optional[date] = None) -> Page:
+        ...
+    @abstractmethod
+    def count_events(self) -> int:
+        ...
+    @abstractmethod
+    def event_conflicts(self, day: str, time: str, duration: int = DEFAULT_EVENT_MINUTES) -> List[dict]:
+        ...
+    @abstractmethod
+    def free_slots(self, day: str, duration: int, count: int, window_start: int, window_end: int, step: int) -> List[int]:
+        ...
+    @abstractmethod
+    def events_in_range(self, start: date, end: date) -> Iterator[Tuple[date, List[dict]]]:
+        ...
+
+    # Slack
+    @abstractmethod
+    def add_slack_message(self, message: dict) -> dict:
+        ...
+    @abstractmethod
+    def page_slack_messages(self, after: Optional[int] = None, limit: Optional[int] = None,
+                            channel: Optional[str] = None) -> Page:
+        ...
+    @abstractmethod
+    def count_slack_messages(self) -> int:
+        ...
+
+    # Metrics
+    @abstractmethod
+    def incr_metrics(self, **deltas) -> dict:
+        ...
+    @abstractmethod
+    def get_metrics(self) -> dict:
+        ...
+    @abstractmethod
+    def reset_metrics(self):
+        ...
+    @abstractmethod
+    def metric_series(self, window: str) -> List[dict]:
+        ...
+
+    # Versions
+    @abstractmethod
+    def version_token(self, *stores: str) -> str:
+        ...
+
+    def close(self):
+        pass
+
+
+class MemoryStorage(Storage):
+    """Process-local state (the original behavior), backed by the indexed stores"""
+
+    def __init__(self, audit_log: Optional[AuditLog] = None, counters: Optional[SharedCounters] = None):
+        self.tasks = TaskStore()
+        self.calendar = CalendarIndex()
+        self.audit_log = audit_log or AuditLog()
+        self.slack_messages: List[MessageRecord] = []
+        self._slack_by_channel: Dict[str, List[int]] = {}
+        self.metrics = StripedMetrics(METRIC_NAMES)
+        self.counters = counters
+        # Process-local even in multi-worker mode: so is the data they describe
+        self.versions = StoreVersions()
+        self._lock = threading.Lock()
+        if counters is not None:
+            counters.seed(dict)
+
+    def next_task_id(self) -> int:
+        if self.counters is not None:
+            return self.counters.incr("task_id")
+        return self.tasks.next_id()
+
+    def add_task(self, record: dict) -> dict:
+        record = self.tasks.add(record)
+        self.versions.bump("tasks")
+        return record
+
+    def get_task(self, task_id: int) -> Optional[dict]:
+        return self.tasks.get(task_id)
+
+    def update_task(self, task_id: int, **fields) -> Optional[dict]:
+        record = self.tasks.update(task_id, **fields)
+        if record is not None:
+            self.versions.bump("tasks")
+        return record
+
+    def page_tasks(self, after: Optional[int] = None, limit: Optional[int] = None, **filters) -> Page:
+        return self.tasks.page(after, limit, **filters)
+
+    def count_tasks(self, field: Optional[str] = None, value=None) -> int:
+        return len(self.tasks) if field is None else self.tasks.count(field, value)
+
+    def evict_completed_tasks(self, max_tasks: int) -> List[int]:
+        evicted = self.tasks.evict(max_tasks)
+        if evicted:
+            self.versions.bump("tasks")
+        return evicted
+
+    def append_audit(self, agent: str, action: str, details: str) -> dict:
+        entry = self.audit_log.append(agent, action, details)
+        self.versions.bump("audit")
+        return entry
+
+    def page_audit(self, after: Optional[int] = None, before: Optional[int] = None, limit: int = 100,
+                   agent: Optional[str] = None) -> Page:
+        return self.audit_log.page(after, before, limit, agent)
+
+    def page_audit_json(self, after: Optional[int] = None, before: Optional[int] = None, limit: int = 100,
+                        agent: Optional[str] = None) -> Page:
+        return self.audit_log.page(after, before, limit, agent, raw=True)
+
+    def count_audit(self) -> int:
+        return self.audit_log.count()
+
+    def clear_audit(self):
+        self.audit_log.clear()
+        self.versions.bump("audit")
+
+    def add_event(self, event: dict) -> dict:
+        event = self.calendar.add(event)
+        self.versions.bump("calendar")
+        return event
+
+    def page_events(self, after: Optional[int] = None, limit: Optional[int] = None,
+                    start: Optional[date] = None, end: Optional[date] = None) -> Page:
+        return self.calendar.page(after, limit, start, end)
+
+    def count_events(self) -> int:
+        return len(self.calendar)
+
+    def event_conflicts(self, day: str, time: str, duration: int = DEFAULT_EVENT_MINUTES) -> List[dict]:
+        return self.calendar.conflicts(day, time, duration)
+
+    def free_slots(self, day: str, duration: int, count: int, window_start: int, window_end: int, step: int) -> List[int]:
+        return self.calendar.free_slots(day, duration, count, window_start, window_end, step)
+
+    def events_in_range(self, start: date, end: date) -> Iterator[Tuple[date, List[dict]]]:
+        return self.calendar.in_range(start, end)
+
+    def add_slack_message(self, message: dict) -> dict:
+        with self._lock:
+            self.slack_messages.append(MessageRecord.from_dict(message))
+            self._slack_by_channel.setdefault(message.get("channel"), []).append(len(self.slack_messages))
+        self.versions.bump("slack")
+        return message
+
+    def page_slack_messages(self, after: Optional[int] = None, limit: Optional[int] = None,
+                            channel: Optional[str] = None) -> Page:
+        # Cursors are 1-based positions in the message list
+        after = after or 0
+        if channel is None:
+            stop = len(self.slack_messages) if limit is None else after + limit + 1
+            rows = [(after + i + 1, m.to_dict()) for i, m in enumerate(self.slack_messages[after:stop])]
+        else:
+            seqs = self._slack_by_channel.get(channel, [])
+            i = bisect.bisect_right(seqs, after)
+            rows = [(seq, self.slack_messages[seq - 1].to_dict())
+                    for seq in (seqs[i:] if limit is None else seqs[i:i + limit + 1])]
+        return make_page(rows, limit, after)
+
+    def count_slack_messages(self) -> int:
+        return len(self.slack_messages)
+
+    def incr_metrics(self, **deltas) -> dict:
+        if self.counters is not None:
+            self.counters.incr_many(deltas)
+        else:
+            self.metrics.record(deltas)
+        self.versions.bump("metrics")
+        return self.get_metrics()
+
+    def get_metrics(self) -> dict:
+        if self.counters is not None:
+            return shared_metrics(self.counters)
+        metrics = self.metrics.totals()
+        metrics["start_time"] = self.metrics.start_time
+        return metrics
+
+    def reset_metrics(self):
+        if self.counters is not None:
+            self.counters.reset(METRIC_NAMES)
+        else:
+            self.metrics.reset()
+        self.versions.bump("metrics")
+
+    def metric_series(self, window: str) -> List[dict]:
+        source = self.counters if self.counters is not None else self.metrics
+        return format_series(METRIC_NAMES, source.series(window))
+
+    def version_token(self, *stores: str) -> str:
+        return self.versions.token(*stores)
+
+    def close(self):
+        self.audit_log.close()
+        if self.counters is not None:
+            self.counters.close()
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY,
+    status TEXT,
+    deadline TEXT,
+    priority TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks(status);
+CREATE INDEX IF NOT EXISTS idx_tasks_deadline ON tasks(deadline);
+CREATE INDEX IF NOT EXISTS idx_tasks_priority ON tasks(priority);
+CREATE TABLE IF NOT EXISTS audit_logs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp TEXT NOT NULL,
+    agent TEXT,
+    action TEXT,
+    details TEXT
+);
+CREATE TABLE IF NOT EXISTS calendar_events (
+    id TEXT PRIMARY KEY,
+    date_key TEXT,
+    day TEXT,
+    start_minute INTEGER,
+    end_minute INTEGER,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_events_date_start ON calendar_events(date_key, start_minute);
+CREATE INDEX IF NOT EXISTS idx_events_day ON calendar_events(day);
+CREATE INDEX IF NOT EXISTS idx_audit_agent ON audit_logs(agent, id);
+CREATE TABLE IF NOT EXISTS slack_messages (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    id TEXT,
+    channel TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_slack_channel ON slack_messages(channel, seq);
+CREATE TABLE IF NOT EXISTS metrics (name TEXT PRIMARY KEY, value REAL NOT NULL);
+"""
+
+
+class SQLiteStorage(Storage):
+    """Shared, durable state in a SQLite database in WAL mode.
+
+    All statements are fixed SQL strings, so the sqlite3 statement cache
+    keeps them prepared. Writes go through one connection and commit
+    immediately (multi-statement writes in a short IMMEDIATE transaction),
+    so another worker never waits for more than one write; with
+    synchronous=NORMAL, WAL commits do not fsync, so durability costs are
+    paid at checkpoints only. Reads use a second connection with its own
+    lock: WAL readers never wait for the write lock, so reads are not held
+    up by a write waiting out busy_timeout.
+    """
+
+    def __init__(self, path: str, persist_interval_ms: int = 50, counters: Optional[SharedCounters] = None):
+        self.path = path
+        self.persist_interval = persist_interval_ms / 1000
+        self.counters = counters
+        # Shared with the other workers when they share the database
+        self.versions = StoreVersions(counters=counters)
+        # Time series live here unless the shared counters hold them
+        self._series = StripedMetrics(METRIC_NAMES)
+        self._persisted: Optional[Dict[str, int]] = None
+        self._lock = threading.RLock()  # the write connection
+        self._read_lock = threading.Lock()
+        self._closed = threading.Event()
+
+        self._conn = self._connect(path)
+        self._conn.executescript(_SCHEMA)
+        self._conn.execute("INSERT OR IGNORE INTO counters (name, value) VALUES ('task_id', 0)")
+        for name in METRIC_NAMES:
+            self._conn.execute("INSERT OR IGNORE INTO metrics (name, value) VALUES (?, 0)", (name,))
+        self._conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('metrics_start_time', ?)",
+                           (datetime.now().isoformat(),))
+        if counters is not None:
+            counters.seed(self._load_counters)
+            # Ids handed out by a worker that died before persisting are never reused
+            counters.raise_to("task_id", self._conn.execute("SELECT COALESCE(MAX(id), 0) FROM tasks").fetchone()[0])
+
+        self._reader = self._connect(path)
+
+        self._flusher = threading.Thread(target=self._flush_loop, name="sqlite-flusher", daemon=True)
+        self._flusher.start()
+
+    # ---- transaction handling ----
+
+    @staticmethod
+    def _connect(path: str) -> sqlite3.Connection:
+        conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, cached_statements=256)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=5000")
+        return conn
+
+    def _write(self, sql: str, params=()) -> sqlite3.Cursor:
+        """Execute a write, committed on its own unless inside _transaction() (caller holds the lock)"""
+        return self._conn.execute(sql, params)
+
+    @contextmanager
+    def _transaction(self):
+        """Group a read-modify-write into one IMMEDIATE transaction (caller holds the lock)"""
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield self._conn
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._conn.execute("COMMIT")
+
+    def _after_write(self, store: str):
+        self.versions.bump(store)
+
+    def _flush_loop(self):
+        while not self._closed.wait(self.persist_interval):
+            with self._lock:
+                self._persist_counters()
+
+    def flush(self):
+        with self._lock:
+            self._persist_counters()
+
+    def close(self):
+        self._closed.set()
+        with self._lock:
+            self._persist_counters()
+            self._conn.close()
+        with self._read_lock:
+            self._reader.close()
+        if self.counters is not None:
+            self.counters.close()
+
+    # ---- shared counters ----
+
+    def _load_counters(self) -> Dict[str, int]:
+        """Initial shared counter values: the persisted ones"""
+        values = {name: int(value) for name, value in self._conn.execute("SELECT name, value FROM metrics")}
+        values["task_id"] = self._conn.execute(
+            "SELECT MAX((SELECT value FROM counters WHERE name = 'task_id'), (SELECT COALESCE(MAX(id), 0) FROM tasks))"
+        ).fetchone()[0]
+        start = self._conn.execute("SELECT value FROM meta WHERE key = 'metrics_start_time'").fetchone()[0]
+        values["start_time_us"] = int(datetime.fromisoformat(start).timestamp() * 1e6)
+        return values
+
+    def _persist_counters(self):
+        """Write changed shared counter values to the database (caller holds the lock)"""
+        if self.counters is None:
+            return
+        values = self.counters.snapshot(SHARED_COUNTER_NAMES + ("start_time_us",))
+        if values == self._persisted:
+            return
+        with self._transaction():
+            self._write("UPDATE counters SET value = MAX(value, ?) WHERE name = 'task_id'", (values["task_id"],))
+            for name in METRIC_NAMES:
+                self._write("UPDATE metrics SET value = ? WHERE name = ?", (values[name], name))
+            self._write("UPDATE meta SET value = ? WHERE key = 'metrics_start_time'",
+                        (datetime.fromtimestamp(values["start_time_us"] / 1e6).isoformat(),))
+        self._persisted = values
+
+    def _query(self, sql: str, params=()) -> List[tuple]:
+        with self._read_lock:
+            return self._reader.execute(sql, params).fetchall()
+
+    # ---- tasks ----
+
+    def next_task_id(self) -> int:
+        if self.counters is not None:
+            return self.counters.incr("task_id")
+        # Atomic across workers: the transaction holds the database write lock
+        with self._lock, self._transaction() as conn:
+            conn.execute("UPDATE counters SET value = value + 1 WHERE name = 'task_id'")
+            return conn.execute("SELECT value FROM counters WHERE name = 'task_id'").fetchone()[0]
+
+    def add_task(self, record: dict) -> dict:
+        with self._lock:
+            self._write(
+                "INSERT OR REPLACE INTO tasks (id, status, deadline, priority, data) VALUES (?, ?, ?, ?, ?)",
+                (record["id"], record.get("status"), record.get("deadline"), record.get("priority"),
+                 json.dumps(record)),
+            )
+            self._after_write("tasks")
+        return record
+
+    def get_task(self, task_id: int) -> Optional[dict]:
+        rows = self._query("SELECT data FROM tasks WHERE id = ?", (task_id,))
+        return json.loads(rows[0][0]) if rows else None
+
+    def update_task(self, task_id: int, **fields) -> Optional[dict]:
+        with self._lock:
+            with self._transaction() as conn:
+                rows = conn.execute("SELECT data FROM tasks WHERE id = ?", (task_id,)).fetchall()
+                if not rows:
+                    return None
+                record = json.loads(rows[0][0])
+                record.update(fields)
+                self._write(
+                    "UPDATE tasks SET status = ?, deadline = ?, priority = ?, data = ? WHERE id = ?",
+                    (record.get("status"), record.get("deadline"), record.get("priority"), json.dumps(record), task_id),
+                )
+            self._after_write("tasks")
+            return record
+
+    def page_tasks(self, after: Optional[int] = None, limit: Optional[int] = None, **filters) -> Page:
+        unknown = set(filters) - set(TASK_INDEX_FIELDS)
+        if unknown:
+            raise ValueError(f"Unindexed task field: {unknown.pop()}")
+        where = "".join(f" AND {field} IS ?" for field in TASK_INDEX_FIELDS if field in filters)
+        params = [filters[field] for field in TASK_INDEX_FIELDS if field in filters]
+        rows = self._query(
+            f"SELECT id, data FROM tasks WHERE id > ?{where} ORDER BY id LIMIT ?",
+            (after or 0, *params, _fetch_limit(limit)),
+        )
+        return make_page([(r[0], json.loads(r[1])) for r in rows], limit, after)
+
+    def count_tasks(self, field: Optional[str] = None, value=None) -> int:
+        if field is None:
+            return self._query("SELECT COUNT(*) FROM tasks")[0][0]
+        if field not in TASK_INDEX_FIELDS:
+            raise ValueError(f"Unindexed task field: {field}")
+        return self._query(f"SELECT COUNT(*) FROM tasks WHERE {field} IS ?", (value,))[0][0]
+
+    def evict_completed_tasks(self, max_tasks: int) -> List[int]:
+        if self._query("SELECT COUNT(*) FROM tasks")[0][0] <= max_tasks:
+            return []
+        with self._lock:
+            with self._transaction() as conn:
+                excess = conn.execute("SELECT COUNT(*) FROM tasks").fetchone()[0] - max_tasks
+                if excess <= 0:
+                    return []
+                ids = [r[0] for r in conn.execute(
+                    "SELECT id FROM tasks WHERE status = 'Completed' ORDER BY id LIMIT ?", (excess,)
+                )]
+                if ids:
+                    self._write(
+                        "DELETE FROM tasks WHERE id IN (SELECT id FROM tasks WHERE status = 'Completed' ORDER BY id LIMIT ?)",
+                        (len(ids),),
+                    )
+            if ids:
+                self._after_write("tasks")
+            return ids
+
+    # ---- audit log ----
+
+    def append_audit(self, agent: str, action: str, details: str) -> dict:
+        timestamp = datetime.now().isoformat()
+        with self._lock:
+            cursor = self._write(
+                "INSERT INTO audit_logs (timestamp, agent, action, details) VALUES (?, ?, ?, ?)",
+                (timestamp, agent, action, details),
+            )
+            self._after_write("audit")
+        return {"id": cursor.lastrowid, "timestamp": timestamp, "agent": agent, "action": action, "details": details}
+
+    def page_audit(self, after: Optional[int] = None, before: Optional[int] = None, limit: int = 100,
+                   agent: Optional[str] = None) -> Page:
+        where = "" if agent is None else " AND agent = ?"
+        params = () if agent is None else (agent,)
+        if after is not None:
+            rows = self._query(
+                f"SELECT id, timestamp, agent, action, details FROM audit_logs WHERE id > ?{where} ORDER BY id LIMIT ?",
+                (after, *params, limit + 1),
+            )
+        else:
+            rows = self._query(
+                f"SELECT id, timestamp, agent, action, details FROM audit_logs WHERE id < ?{where} ORDER BY id DESC LIMIT ?",
+                (before if before is not None else 2 ** 63 - 1, *params, limit + 1),
+            )
+        page = make_page([
+            (r[0], {"id": r[0], "timestamp": r[1], "agent": r[2], "action": r[3], "details": r[4]})
+            for r in rows
+        ], limit, after if after is not None else before)
+        if after is None:
+            page.items.reverse()
+            page = page._replace(next_cursor=page.items[-1]["id"] if page.items else before)
+        return page
+
+    def count_audit(self) -> int:
+        return self._query("SELECT COUNT(*) FROM audit_logs")[0][0]
+
+    def clear_audit(self):
+        with self._lock:
+            self._write("DELETE FROM audit_logs")
+            self._after_write("audit")
+
+    # ---- calendar ----
+
+    def add_event(self, event: dict) -> dict:
+        key = normalize_date(event.get("date"))
+        day = parse_date(key)
+        start = parse_time_minutes(event.get("time"))
+        end = start + event_duration(event) if start is not None else None
+        with self._lock:
+            self._write(
+                "INSERT OR REPLACE INTO calendar_events (id, date_key, day, start_minute, end_minute, data) VALUES (?, ?, ?, ?, ?, ?)",
+                (event["id"], key, day.isoformat() if day else None, start, end, json.dumps(event)),
+            )
+            self._after_write("calendar")
+        return event
+
+    def page_events(self, after: Optional[int] = None, limit: Optional[int] = None,
+                    start: Optional[date] = None, end: Optional[date] = None) -> Page:
+        if start is None and end is None:
+            rows = self._query(
+                "SELECT rowid, data FROM calendar_events WHERE rowid > ? ORDER BY rowid LIMIT ?",
+                (after or 0, _fetch_limit(limit)),
+            )
+        else:
+            rows = self._query(
+                "SELECT rowid, data FROM calendar_events WHERE rowid > ? AND day BETWEEN ? AND ? ORDER BY rowid LIMIT ?",
+                (after or 0, (start or date.min).isoformat(), (end or date.max).isoformat(), _fetch_limit(limit)),
+            )
+        return make_page([(r[0], json.loads(r[1])) for r in rows], limit, after)
+
+    def count_events(self) -> int:
+        return self._query("SELECT COUNT(*) FROM calendar_events")[0][0]
+
+    def event_conflicts(self, day: str, time: str, duration: int = DEFAULT_EVENT_MINUTES) -> List[dict]:
+        key = normalize_date(day)
+        start = parse_time_minutes(time)
+        if start is None:
+            rows = self._query(
+                "SELECT data FROM calendar_events WHERE date_key = ? ORDER BY start_minute IS NULL, start_minute, rowid", (key,)
+            )
+        else:
+            # Untimed events block the whole day, timed ones must overlap [start, end)
+            rows = self._query(
+                "SELECT data FROM calendar_events WHERE date_key = ? "
+                "AND (start_minute IS NULL OR (start_minute < ? AND end_minute > ?)) ORDER BY start_minute IS NULL, start_minute, rowid",
+                (key, start + duration, start),
+            )
+        return [json.loads(r[0]) for r in rows]
+
+    def free_slots(self, day: str, duration: int, count: int, window_start: int, window_end: int, step: int) -> List[int]:
+        rows = self._query(
+            "SELECT start_minute, end_minute FROM calendar_events WHERE date_key = ? "
+            "AND (start_minute IS NULL OR start_minute < ?) ORDER BY start_minute IS NOT NULL, start_minute",
+            (normalize_date(day), window_end),
+        )
+        if rows and rows[0][0] is None:
+            busy = [(window_start, window_end)]
+        else:
+            busy = merge_busy(rows, window_start, window_end)
+        return free_slots_between(busy, duration, count, window_start, window_end, step)
+
+    def events_in_range(self, start: date, end: date) -> Iterator[Tuple[date, List[dict]]]:
+        rows = self._query(
+            "SELECT day, data FROM calendar_events WHERE day BETWEEN ? AND ? "
+            "ORDER BY day, start_minute IS NULL, start_minute, rowid",
+            (start.isoformat(), end.isoformat()),
+        )
+        current_day, events = None, []
+        for day, data in rows:
+            if day != current_day:
+                if events:
+                    yield date.fromisoformat(current_day), events
+                current_day, events = day, []
+            events.append(json.loads(data))
+        if events:
+            yield date.fromisoformat(current_day), events
+
+    # ---- slack ----
+
+    def add_slack_message(self, message: dict) -> dict:
+        with self._lock:
+            self._write(
+                "INSERT INTO slack_messages (id, channel, data) VALUES (?, ?, ?)",
+                (message.get("id"), message.get("channel"), json.dumps(message)),
+            )
+            self._after_write("slack")
+        return message
+
+    def page_slack_messages(self, after: Optional[int] = None, limit: Optional[int] = None,
+                            channel: Optional[str] = None) -> Page:
+        if channel is None:
+            rows = self._query(
+                "SELECT seq, data FROM slack_messages WHERE seq > ? ORDER BY seq LIMIT ?",
+                (after or 0, _fetch_limit(limit)),
+            )
+        else:
+            rows = self._query(
+                "SELECT seq, data FROM slack_messages WHERE channel = ? AND seq > ? ORDER BY seq LIMIT ?",
+                (channel, after or 0, _fetch_limit(limit)),
+            )
+        return make_page([(r[0], json.loads(r[1])) for r in rows], limit, after)
+
+    def count_slack_messages(self) -> int:
+        return self._query("SELECT COUNT(*) FROM slack_messages")[0][0]
+
+    # ---- metrics ----
+
+    def incr_metrics(self, **deltas) -> dict:
+        if self.counters is not None:
+            self.counters.incr_many(deltas)
+            self.versions.bump("metrics")
+            return shared_metrics(self.counters)
+        self._series.record(deltas)
+        with self._lock:
+            with self._transaction():
+                for name, delta in deltas.items():
+                    self._write("UPDATE metrics SET value = value + ? WHERE name = ?", (delta, name))
+            self._after_write("metrics")
+        return self.get_metrics()
+
+    def get_metrics(self) -> dict:
+        if self.counters is not None:
+            return shared_metrics(self.counters)
+        metrics = {name: int(value) for name, value in self._query("SELECT name, value FROM metrics")}
+        metrics["start_time"] = self._query("SELECT value FROM meta WHERE key = 'metrics_start_time'")[0][0]
+        return metrics
+
+    def reset_metrics(self):
+        if self.counters is not None:
+            self.counters.reset(METRIC_NAMES)
+            self.versions.bump("metrics")
+            return
+        with self._lock:
+            with self._transaction():
+                self._write("UPDATE metrics SET value = 0")
+                self._write("UPDATE meta SET value = ? WHERE key = 'metrics_start_time'", (datetime.now().isoformat(),))
+            self._after_write("metrics")
+        self._series.reset()
+
+    def metric_series(self, window: str) -> List[dict]:
+        source = self.counters if self.counters is not None else self._series
+        return format_series(METRIC_NAMES, source.series(window))
+
+    def version_token(self, *stores: str) -> str:
+        return self.versions.token(*stores)
+
+
+def _fetch_limit(limit: Optional[int]) -> int:
+    """SQL LIMIT that fetches one extra row to detect a further page (-1: no limit)"""
+    return -1 if limit is None else limit + 1
+
+
+class ShardedStorage(Storage):
+    """Per-tenant backend instances behind the Storage interface.
+
+    Every call goes to the current tenant's shard, created by ``factory`` on
+    the tenant's first request. Shards share nothing (stores, locks, audit
+    segments, database files), so tenants neither contend nor scan each
+    other's data; the registry lock is only taken to create a shard.
+    """
+
+    def __init__(self, factory: Callable[[str], Storage]):
+        self._factory = factory
+        self._shards: Dict[str, Storage] = {}
+        self._lock = threading.Lock()
+
+    def shard(self, tenant: Optional[str] = None) -> Storage:
+        tenant = tenant or current_tenant()
+        shard = self._shards.get(tenant)
+        if shard is None:
+            with self._lock:
+                shard = self._shards.get(tenant)
+                if shard is None:
+                    shard = self._shards[tenant] = self._factory(tenant)
+        return shard
+
+    def tenants(self) -> List[str]:
+        return sorted(self._shards)
+
+    def next_task_id(self) -> int:
+        return self.shard().next_task_id()
+
+    def add_task(self, record: dict) -> dict:
+        return self.shard().add_task(record)
+
+    def get_task(self, task_id: int) -> Optional[dict]:
+        return self.shard().get_task(task_id)
+
+    def update_task(self, task_id: int, **fields) -> Optional[dict]:
+        return self.shard().update_task(task_id, **fields)
+
+    def page_tasks(self, after: Optional[int] = None, limit: Optional[int] = None, **filters) -> Page:
+        return self.shard().page_tasks(after, limit, **filters)
+
+    def count_tasks(self, field: Optional[str] = None, value=None) -> int:
+        return self.shard().count_tasks(field, value)
+
+    def evict_completed_tasks(self, max_tasks: int) -> List[int]:
+        return self.shard().evict_completed_tasks(max_tasks)
+
+    def append_audit(self, agent: str, action: str, details: str) -> dict:
+        return self.shard().append_audit(agent, action, details)
+
+    def page_audit(self, after: Optional[int] = None, before: Optional[int] = None, limit: int = 100,
+                   agent: Optional[str] = None) -> Page:
+        return self.shard().page_audit(after, before, limit, agent)
+
+    def page_audit_json(self, after: Optional[int] = None, before: Optional[int] = None, limit: int = 100,
+                        agent: Optional[str] = None) -> Page:
+        return self.shard().page_audit_json(after, before, limit, agent)
+
+    def count_audit(self) -> int:
+        return self.shard().count_audit()
+
+    def clear_audit(self):
+        self.shard().clear_audit()
+
+    def add_event(self, event: dict) -> dict:
+        return self.shard().add_event(event)
+
+    def page_events(self, after: Optional[int] = None, limit: Optional[int] = None,
+                    start: Optional[date] = None, end: Optional[date] = None) -> Page:
+        return self.shard().page_events(after, limit, start, end)
+
+    def count_events(self) -> int:
+        return self.shard().count_events()
+
+    def event_conflicts(self, day: str, time: str, duration: int = DEFAULT_EVENT_MINUTES) -> List[dict]:
+        return self.shard().event_conflicts(day, time, duration)
+
+    def free_slots(self, day: str, duration: int, count: int, window_start: int, window_end: int, step: int) -> List[int]:
+        return self.shard().free_slots(day, duration, count, window_start, window_end, step)
+
+    def events_in_range(self, start: date, end: date) -> Iterator[Tuple[date, List[dict]]]:
+        return self.shard().events_in_range(start, end)
+
+    def add_slack_message(self, message: dict) -> dict:
+        return self.shard().add_slack_message(message)
+
+    def page_slack_messages(self, after: Optional[int] = None, limit: Optional[int] = None,
+                            channel: Optional[str] = None) -> Page:
+        return self.shard().page_slack_messages(after, limit, channel)
+
+    def count_slack_messages(self) -> int:
+        return self.shard().count_slack_messages()
+
+    def incr_metrics(self, **deltas) -> dict:
+        return self.shard().incr_metrics(**deltas)
+
+    def get_metrics(self) -> dict:
+        return self.shard().get_metrics()
+
+    def reset_metrics(self):
+        self.shard().reset_metrics()
+
+    def metric_series(self, window: str) -> List[dict]:
+        return self.shard().metric_series(window)
+
+    def version_token(self, *stores: str) -> str:
+        return self.shard().version_token(*stores)
+
+    def close(self):
+        with self._lock:
+            shards = list(self._shards.values())
+        for shard in shards:
+            shard.close()
+
+
+def tenant_path(path: str, tenant: str) -> str:
+    """Per-tenant variant of a file path: flowpilot.db -> flowpilot.acme.db (default tenant unchanged)"""
+    if tenant == DEFAULT_TENANT:
+        return path
+    root, ext = os.path.splitext(path)
+    return f"{root}.{tenant}{ext}"
+
+
+def shared_counters(tenant: str) -> Optional[SharedCounters]:
+    """The tenant's shared counters in multi-worker mode, else None"""
+    if not SHARED_STATE_PATH:
+        return None
+    return SharedCounters(tenant_path(SHARED_STATE_PATH, tenant), SHARED_COUNTER_NAMES + VERSION_COUNTER_NAMES,
+                          series_names=METRIC_NAMES)
+
+
+def create_storage() -> ShardedStorage:
+    """Build the tenant-sharded backend selected by STORAGE_BACKEND"""
+    backend = os.getenv("STORAGE_BACKEND", "memory").lower()
+    if backend == "memory":
+        audit_dir = os.getenv("AUDIT_DIR", "audit_segments") or None
+
+        def factory(tenant: str) -> Storage:
+            directory = audit_dir
+            if audit_dir and tenant != DEFAULT_TENANT:
+                directory = os.path.join(audit_dir, "tenants", tenant)
+            return MemoryStorage(AuditLog(
+                directory,
+                memory_entries=int(os.getenv("AUDIT_MEMORY_ENTRIES", "1000")),
+                segment_bytes=int(os.getenv("AUDIT_SEGMENT_BYTES", str(8 * 1024 * 1024))),
+                max_segments=int(os.getenv("AUDIT_MAX_SEGMENTS", "16")),
+            ), shared_counters(tenant))
+    elif backend == "sqlite":
+        sqlite_path = os.getenv("SQLITE_PATH", "flowpilot.db")
+
+        def factory(tenant: str) -> Storage:
+            return SQLiteStorage(
+                tenant_path(sqlite_path, tenant),
+                persist_interval_ms=int(os.getenv("SQLITE_PERSIST_INTERVAL_MS", "50")),
+                counters=shared_counters(tenant),
+            )
+    else:
+        raise ValueError(f"Unknown STORAGE_BACKEND: {backend}")
+    storage = ShardedStorage(factory)
+    storage.shard(DEFAULT_TENANT)  # open the default shard now so configuration errors surface at startup
+    return storage
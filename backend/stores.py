@@ -0,0 +1,419 @@
+"""Indexed in-memory stores.
+
+Stores keep compact records (see records.py) and hand out plain dicts, so
+callers see the same shapes the records were created from.
+"""
+
+import bisect
+import threading
+from functools import lru_cache
+from datetime import date, datetime
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from records import BlobTable, EventRecord, TaskRecord
+
+
+class Page(NamedTuple):
+    """One page of a cursor-paginated listing"""
+    items: List[dict]
+    next_cursor: Optional[int]
+    has_more: bool
+
+
+def make_page(rows: List[tuple], limit: Optional[int], after: Optional[int]) -> Page:
+    """Build a Page from up to limit + 1 (cursor, item) rows"""
+    has_more = limit is not None and len(rows) > limit
+    if has_more:
+        rows = rows[:limit]
+    return Page([item for _, item in rows], rows[-1][0] if rows else after, has_more)
+
+
+class TaskStore:
+    """Task records with a primary id index and secondary indexes.
+
+    Secondary indexes map a field value to a sorted list of task ids, so
+    lookups and counts by status, deadline or priority cost O(1)/O(k)
+    instead of a scan over every task, and cursor pages bisect straight to
+    their first id. Email bodies are shared through a content-addressed
+    blob table.
+    """
+
+    INDEXED_FIELDS = ("status", "deadline", "priority")
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._by_id: Dict[int, TaskRecord] = {}
+        self._ids: List[int] = []
+        self.blobs = BlobTable()
+        self._indexes: Dict[str, Dict[object, List[int]]] = {f: {} for f in self.INDEXED_FIELDS}
+        self._last_id = 0
+
+    def next_id(self) -> int:
+        """Allocate the next task id"""
+        with self._lock:
+            self._last_id += 1
+            return self._last_id
+
+    def add(self, record: dict) -> dict:
+        """Store a record that already carries an id from next_id()"""
+        with self._lock:
+            task_id = record["id"]
+            if task_id in self._by_id:
+                self.remove(task_id)
+            stored = self._by_id[task_id] = TaskRecord.from_dict(record, self.blobs)
+            bisect.insort(self._ids, task_id)
+            for field in self.INDEXED_FIELDS:
+                bisect.insort(self._indexes[field].setdefault(stored.get(field), []), task_id)
+            self._last_id = max(self._last_id, task_id)
+            return record
+
+    def get(self, task_id: int) -> Optional[dict]:
+        record = self._by_id.get(task_id)
+        return record.to_dict() if record is not None else None
+
+    def update(self, task_id: int, **fields) -> Optional[dict]:
+        """Update fields on a task, moving it between index buckets as needed"""
+        with self._lock:
+            record = self._by_id.get(task_id)
+            if record is None:
+                return None
+            for field, value in fields.items():
+                if field in self._indexes and record.get(field) != value:
+                    self._unindex(field, record.get(field), task_id)
+                    bisect.insort(self._indexes[field].setdefault(value, []), task_id)
+                record.set(field, value, self.blobs)
+            return record.to_dict()
+
+    def remove(self, task_id: int) -> Optional[dict]:
+        with self._lock:
+            record = self._by_id.pop(task_id, None)
+            if record is None:
+                return None
+            _remove_sorted(self._ids, task_id)
+            for field in self.INDEXED_FIELDS:
+                self._unindex(field, record.get(field), task_id)
+            record.release(self.blobs)
+            return record.to_dict()
+
+    def evict(self, max_tasks: int, status: str = "Completed") -> List[int]:
+        """Remove the oldest tasks with status until at most max_tasks remain; returns their ids"""
+        with self._lock:
+            excess = len(self._by_id) - max_tasks
+            if excess <= 0:
+                return []
+            victims = self._indexes["status"].get(status, [])[:excess]
+            for task_id in victims:
+                self.remove(task_id)
+            return victims
+
+    def clear(self):
+        with self._lock:
+            self._by_id.clear()
+            self._ids.clear()
+            self.blobs.clear()
+            for index in self._indexes.values():
+                index.clear()
+
+    def all(self) -> List[dict]:
+        """All tasks in id order"""
+        return [self._by_id[i].to_dict() for i in list(self._ids)]
+
+    def find(self, field: str, value) -> List[dict]:
+        """Tasks whose indexed field equals value, in id order"""
+        ids = self._indexes[field].get(value, [])
+        return [self._by_id[i].to_dict() for i in list(ids)]
+
+    def count(self, field: str, value) -> int:
+        """Number of tasks whose indexed field equals value"""
+        return len(self._indexes[field].get(value, ()))
+
+    def page(self, after: Optional[int] = None, limit: Optional[int] = None, **filters) -> Page:
+        """Tasks with id > after matching every indexed-field filter, in id order.
+
+        Candidates come from the smallest matching index bucket, so a filtered
+        page costs O(log n + k) rather than a scan of the whole store.
+        """
+        with self._lock:
+            ids = self._ids
+            if filters:
+                buckets = [self._indexes[field].get(value, []) for field, value in filters.items()]
+                ids = min(buckets, key=len)
+            start = bisect.bisect_right(ids, after) if after is not None else 0
+            rows = []
+            for i in range(start, len(ids)):
+                task_id = ids[i]
+                record = self._by_id[task_id]
+                if all(record.get(field) == value for field, value in filters.items()):
+                    rows.append((task_id, record.to_dict()))
+                    if limit is not None and len(rows) > limit:
+                        break
+            return make_page(rows, limit, after)
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def _unindex(self, field: str, value, task_id: int):
+        bucket = self._indexes[field].get(value)
+        if bucket is not None:
+            _remove_sorted(bucket, task_id)
+            if not bucket:
+                del self._indexes[field][value]
+
+
+def _remove_sorted(ids: List[int], value: int):
+    i = bisect.bisect_left(ids, value)
+    if i < len(ids) and ids[i] == value:
+        del ids[i]
+
+
+# Date formats accepted when normalizing calendar dates (ISO first)
+DATE_FORMATS = ("%Y-%m-%d", "%m/%d/%Y", "%Y/%m/%d", "%d %B %Y", "%B %d, %Y")
+TIME_FORMATS = ("%I:%M %p", "%I %p", "%H:%M", "%I:%M%p", "%I%p")
+
+
+@lru_cache(maxsize=4096)
+def parse_date(value) -> Optional[date]:
+    """Parse a calendar date string into a date, or None if it is free text"""
+    if not isinstance(value, str):
+        return None
+    text = value.strip()
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+def normalize_date(value):
+    """Canonical bucket key for a date: ISO string when parseable, else the trimmed text"""
+    parsed = parse_date(value)
+    if parsed is not None:
+        return parsed.isoformat()
+    return value.strip() if isinstance(value, str) else value
+
+
+@lru_cache(maxsize=1024)
+def parse_time_minutes(value) -> Optional[int]:
+    """Minutes after midnight for '09:00 AM', '9 AM' or '14:30'; None if unparseable"""
+    if not isinstance(value, str):
+        return None
+    text = value.strip().upper()
+    for fmt in TIME_FORMATS:
+        try:
+            parsed = datetime.strptime(text, fmt)
+            return parsed.hour * 60 + parsed.minute
+        except ValueError:
+            continue
+    return None
+
+
+DEFAULT_EVENT_MINUTES = 60
+DAY_MINUTES = 24 * 60
+
+
+def format_minutes(minutes: int) -> str:
+    """Render minutes after midnight as '09:00 AM'"""
+    hours, mins = divmod(minutes, 60)
+    return f"{(hours % 12) or 12:02d}:{mins:02d} {'AM' if hours < 12 else 'PM'}"
+
+
+def event_duration(event: dict) -> int:
+    duration = event.get("duration_minutes")
+    return duration if isinstance(duration, int) and duration > 0 else DEFAULT_EVENT_MINUTES
+
+
+class _DayBucket:
+    """One day's events (EventRecords): timed intervals sorted by start, plus untimed events"""
+
+    __slots__ = ("timed", "untimed", "max_duration")
+
+    def __init__(self):
+        # (start, seq, end, event); (start, seq) is unique so the event is never compared
+        self.timed: List[tuple] = []
+        self.untimed: List[EventRecord] = []
+        self.max_duration = 0
+
+    def __len__(self) -> int:
+        return len(self.timed) + len(self.untimed)
+
+    def events(self) -> List[EventRecord]:
+        return [e[3] for e in self.timed] + self.untimed
+
+    def overlapping(self, start: int, end: int) -> List[EventRecord]:
+        """Timed events intersecting [start, end), found in O(log n + k)"""
+        # Anything starting before start - max_duration has already ended
+        lo = bisect.bisect_left(self.timed, (start - self.max_duration + 1,))
+        hi = bisect.bisect_left(self.timed, (end,))
+        return [e[3] for e in self.timed[lo:hi] if e[2] > start]
+
+    def busy(self, window_start: int, window_end: int) -> List[Tuple[int, int]]:
+        """Merged busy intervals clipped to the window, in order"""
+        if self.untimed:
+            # Events without a usable time block the whole day
+            return [(window_start, window_end)]
+        lo = bisect.bisect_left(self.timed, (window_start - self.max_duration + 1,))
+        hi = bisect.bisect_left(self.timed, (window_end,))
+        return merge_busy(((e[0], e[2]) for e in self.timed[lo:hi]), window_start, window_end)
+
+
+def merge_busy(intervals: Iterable[Tuple[int, int]], window_start: int, window_end: int) -> List[Tuple[int, int]]:
+    """Merge (start, end) intervals sorted by start, clipped to the window"""
+    merged: List[List[int]] = []
+    for start, end in intervals:
+        if end <= window_start or start >= window_end:
+            continue
+        start, end = max(start, window_start), min(end, window_end)
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return [(s, e) for s, e in merged]
+
+
+def free_slots_between(busy: List[Tuple[int, int]], duration: int, count: int, window_start: int,
+                       window_end: int, step: int = 30) -> List[int]:
+    """First `count` slot starts (minutes) of `duration` that avoid the merged busy intervals.
+
+    Slot starts lie on the `step` grid counted from window_start, and
+    consecutive slots in a gap are at least the duration apart so
+    suggestions never overlap each other.
+    """
+    def on_grid(minute: int) -> int:
+        # Round up to the next grid point at or after minute
+        return window_start + -(-(minute - window_start) // step) * step
+
+    slots = []
+    cursor = window_start
+    for busy_start, busy_end in list(busy) + [(window_end, window_end)]:
+        slot = on_grid(cursor)
+        while slot + duration <= busy_start and len(slots) < count:
+            slots.append(slot)
+            slot = on_grid(slot + duration)
+        if len(slots) >= count:
+            break
+        cursor = max(cursor, busy_end)
+    return slots
+
+
+class CalendarIndex:
+    """Calendar events bucketed by normalized date.
+
+    Each bucket keeps its timed events as [start, end) intervals sorted by
+    start time, together with the longest duration on that day, so overlap
+    queries bisect to the handful of candidates that could intersect instead
+    of scanning the day. Parseable dates are also kept in a sorted list so
+    range queries only touch populated days in range.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._events: Dict[str, EventRecord] = {}
+        self._by_date: Dict[object, _DayBucket] = {}
+        self._sorted_dates: List[date] = []
+        self._log: List[Tuple[int, EventRecord]] = []
+        self._seqs: Dict[str, int] = {}
+        self._seq = 0
+
+    def add(self, event: dict) -> dict:
+        with self._lock:
+            key = normalize_date(event.get("date"))
+            bucket = self._by_date.get(key)
+            if bucket is None:
+                bucket = self._by_date[key] = _DayBucket()
+                day = parse_date(key)
+                if day is not None:
+                    bisect.insort(self._sorted_dates, day)
+
+            self._seq += 1
+            record = EventRecord.from_dict(event)
+            start = parse_time_minutes(event.get("time"))
+            if start is None:
+                bucket.untimed.append(record)
+            else:
+                duration = event_duration(event)
+                bisect.insort(bucket.timed, (start, self._seq, start + duration, record))
+                bucket.max_duration = max(bucket.max_duration, duration)
+            self._events[event["id"]] = record
+            self._log.append((self._seq, record))
+            self._seqs[event["id"]] = self._seq
+            return event
+
+    def get(self, event_id: str) -> Optional[dict]:
+        record = self._events.get(event_id)
+        return record.to_dict() if record is not None else None
+
+    def on_date(self, value) -> List[dict]:
+        """Events on a date, ordered by start time (untimed events last)"""
+        bucket = self._by_date.get(normalize_date(value))
+        return _dicts(bucket.events()) if bucket else []
+
+    def count_on(self, value) -> int:
+        bucket = self._by_date.get(normalize_date(value))
+        return len(bucket) if bucket else 0
+
+    def conflicts(self, value, time: str, duration: int = DEFAULT_EVENT_MINUTES) -> List[dict]:
+        """Events overlapping [time, time + duration) on a date.
+
+        An unparseable time cannot be placed, so every event that day counts;
+        untimed events on the day likewise conflict with everything.
+        """
+        bucket = self._by_date.get(normalize_date(value))
+        if bucket is None:
+            return []
+        start = parse_time_minutes(time)
+        if start is None:
+            return _dicts(bucket.events())
+        return _dicts(bucket.overlapping(start, start + duration) + bucket.untimed)
+
+    def free_slots(self, value, duration: int, count: int, window_start: int, window_end: int,
+                   step: int = 30) -> List[int]:
+        """First `count` free slot starts (minutes) of `duration` inside the window"""
+        bucket = self._by_date.get(normalize_date(value))
+        busy = bucket.busy(window_start, window_end) if bucket else []
+        return free_slots_between(busy, duration, count, window_start, window_end, step)
+
+    def in_range(self, start: date, end: date) -> Iterator[Tuple[date, List[dict]]]:
+        """(day, events) for every populated day between start and end inclusive"""
+        lo = bisect.bisect_left(self._sorted_dates, start)
+        hi = bisect.bisect_right(self._sorted_dates, end)
+        for day in self._sorted_dates[lo:hi]:
+            yield day, _dicts(self._by_date[day.isoformat()].events())
+
+    def all(self) -> List[dict]:
+        """All events in creation order"""
+        return _dicts(self._events.values())
+
+    def page(self, after: Optional[int] = None, limit: Optional[int] = None,
+             start: Optional[date] = None, end: Optional[date] = None) -> Page:
+        """Events in creation order after the ``after`` cursor, optionally within [start, end]"""
+        with self._lock:
+            after = after or 0
+            if start is None and end is None:
+                # Sequence numbers in the log are contiguous
+                i = max(0, after + 1 - self._log[0][0]) if self._log else 0
+                rows = self._log[i:] if limit is None else self._log[i:i + limit + 1]
+            else:
+                rows = sorted(
+                    (self._seqs[e["id"]], e)
+                    for _, events in self.in_range(start or date.min, end or date.max)
+                    for e in events
+                    if self._seqs[e["id"]] > after
+                )
+                return make_page(rows, limit, after)
+            return make_page([(seq, record.to_dict()) for seq, record in rows], limit, after)
+
+    def clear(self):
+        with self._lock:
+            self._events.clear()
+            self._log.clear()
+            self._seqs.clear()
+            self._by_date.clear()
+            self._sorted_dates.clear()
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+
+def _dicts(records: Iterable[EventRecord]) -> List[dict]:
+    return [record.to_dict() for record in records]
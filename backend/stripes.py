@@ -0,0 +1,79 @@
+"""Per-thread stripes of numbers for lock-free counters.
+
+Each thread that records gets its own fixed-size list, so writes are plain
+list increments with no lock. Threads come and go (the anyio threadpool
+retires workers after 10 s idle), so a thread's stripe is folded into a
+shared base stripe when the thread exits and then dropped: memory stays
+proportional to the live threads, not to every thread that ever recorded.
+
+The base is replaced rather than updated in place, so a reader that took
+its snapshot (base and live stripes) before a fold still sees every value
+exactly once.
+"""
+
+import threading
+import weakref
+from typing import Callable, Dict, List, Optional
+
+
+def add_into(base: list, stripe: list):
+    for i, value in enumerate(stripe):
+        base[i] += value
+
+
+class _ThreadToken:
+    """Lives in the thread's locals; its finalizer runs when the thread's locals are freed"""
+
+    __slots__ = ("__weakref__",)
+
+
+class ThreadStripes:
+    """Per-thread fixed-size lists plus the folded-in totals of exited threads"""
+
+    def __init__(self, size: int, fold: Optional[Callable[[list, list], None]] = None):
+        self.size = size
+        self.local = threading.local()
+        self._fold = fold or add_into
+        self._base = [0] * size
+        self._live: Dict[int, list] = {}
+        self._lock = threading.Lock()  # only taken when a thread starts or stops recording, and by readers
+
+    def get(self) -> list:
+        """The calling thread's stripe"""
+        try:
+            return self.local.stripe
+        except AttributeError:
+            return self.register()
+
+    def register(self) -> list:
+        stripe = [0] * self.size
+        token = _ThreadToken()
+        with self._lock:
+            self._live[id(stripe)] = stripe
+        finalizer = weakref.finalize(token, self._retire, stripe)
+        finalizer.atexit = False
+        self.local.token = token
+        self.local.stripe = stripe
+        return stripe
+
+    def _retire(self, stripe: list):
+        with self._lock:
+            base = list(self._base)
+            self._fold(base, stripe)
+            self._base = base
+            del self._live[id(stripe)]
+
+    def snapshot(self) -> List[list]:
+        """The base stripe followed by every live thread's stripe"""
+        with self._lock:
+            return [self._base] + list(self._live.values())
+
+    def merged(self) -> list:
+        merged = [0] * self.size
+        for stripe in self.snapshot():
+            add_into(merged, stripe)
+        return merged
+
+    def __len__(self) -> int:
+        """Number of live stripes"""
+        return len(self._live)
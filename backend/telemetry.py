@@ -0,0 +1,236 @@
+"""Request, agent and stage latency telemetry in Prometheus text format.
+
+Histograms have fixed bucket bounds and, like the automation metrics, keep
+one preallocated stripe of bucket counts per live thread, so ``observe()`` is a
+thread-local lookup, a bisect and two list increments with no lock (well
+under a microsecond). Scrapes merge the stripes. Label sets are created on
+first use; routes are labelled by their template (``/task/{task_id}/complete``)
+so cardinality stays bounded.
+
+Values are per process: in multi-worker mode each worker reports its own.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from functools import wraps
+from typing import Callable, Dict, List, Sequence, Tuple
+
+from stripes import ThreadStripes
+
+# Seconds; the +Inf bucket is implicit
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class _Striped:
+    """Per-thread fixed-size lists of numbers, summed on read (exited threads' folded into a base)"""
+
+    def __init__(self, size: int):
+        self._stripes = ThreadStripes(size)
+        self._local = self._stripes.local  # fast path: an attribute lookup per observation
+
+    def _stripe(self) -> list:
+        return self._stripes.register()
+
+    def _merged(self) -> list:
+        return self._stripes.merged()
+
+
+class Counter(_Striped):
+    def __init__(self):
+        super().__init__(1)
+
+    def inc(self, amount: float = 1):
+        try:
+            stripe = self._local.stripe
+        except AttributeError:
+            stripe = self._stripe()
+        stripe[0] += amount
+
+    def value(self) -> float:
+        return self._merged()[0]
+
+
+class Histogram(_Striped):
+    """Bucket counts followed by the +Inf bucket and the running sum"""
+
+    def __init__(self, bounds: Sequence[float] = LATENCY_BUCKETS):
+        self.bounds = tuple(bounds)
+        super().__init__(len(self.bounds) + 2)
+
+    def observe(self, value: float):
+        try:
+            stripe = self._local.stripe
+        except AttributeError:
+            stripe = self._stripe()
+        stripe[bisect_left(self.bounds, value)] += 1
+        stripe[-1] += value
+
+    def snapshot(self) -> Tuple[List[int], float]:
+        """(cumulative counts per bound, ending with +Inf), sum"""
+        merged = self._merged()
+        cumulative, total = [], 0
+        for count in merged[:-1]:
+            total += count
+            cumulative.append(total)
+        return cumulative, merged[-1]
+
+
+class Family:
+    """A metric name with one child (Counter or Histogram) per label values"""
+
+    def __init__(self, name: str, help: str, kind: str, labelnames: Sequence[str],
+                 factory: Callable[[], _Striped]):
+        self.name = name
+        self.help = help
+        self.kind = kind
+        self.labelnames = tuple(labelnames)
+        self._factory = factory
+        self._children: Dict[tuple, _Striped] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values: str):
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.get(values)
+                if child is None:
+                    child = self._children[values] = self._factory()
+        return child
+
+    def children(self) -> List[Tuple[tuple, _Striped]]:
+        with self._lock:
+            return list(self._children.items())
+
+
+class Telemetry:
+    """The app's request, agent and stage metrics"""
+
+    def __init__(self, prefix: str = "flowpilot"):
+        self.prefix = prefix
+        self.requests = Family(f"{prefix}_http_requests_total", "HTTP requests by route and status",
+                               "counter", ("method", "route", "status"), Counter)
+        self.request_seconds = Family(f"{prefix}_http_request_duration_seconds", "HTTP request latency",
+                                      "histogram", ("method", "route"), Histogram)
+        # In-flight gauge = started - finished, so neither side needs a lock
+        self.started = Family(f"{prefix}_http_requests_started", "", "counter", ("method",), Counter)
+        self.finished = Family(f"{prefix}_http_requests_finished", "", "counter", ("method",), Counter)
+        self.agent_seconds = Family(f"{prefix}_agent_duration_seconds", "Agent process() latency",
+                                    "histogram", ("agent", "status"), Histogram)
+        self.stage_seconds = Family(f"{prefix}_stage_duration_seconds",
+                                    "Latency of pipeline stages (extraction, rules, audit append, JSON rendering)",
+                                    "histogram", ("stage",), Histogram)
+
+    @contextmanager
+    def stage(self, name: str):
+        histogram = self.stage_seconds.labels(name)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            histogram.observe(time.perf_counter() - start)
+
+    def timed(self, name: str):
+        """Decorator recording every call of a function as stage ``name``"""
+        def decorator(func):
+            histogram = self.stage_seconds.labels(name)
+
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    histogram.observe(time.perf_counter() - start)
+            return wrapper
+        return decorator
+
+    def render(self, gauges: Sequence[Tuple[str, str, List[Tuple[Dict[str, str], float]]]] = ()) -> str:
+        """Prometheus text exposition; gauges are extra (name, help, [(labels, value)]) computed by the caller"""
+        lines: List[str] = []
+        for family in (self.requests, self.request_seconds, self.agent_seconds, self.stage_seconds):
+            lines.append(f"# HELP {family.name} {family.help}")
+            lines.append(f"# TYPE {family.name} {family.kind}")
+            for values, child in sorted(family.children(), key=lambda item: item[0]):
+                labels = dict(zip(family.labelnames, values))
+                if family.kind == "counter":
+                    lines.append(f"{family.name}{_labels(labels)} {_number(child.value())}")
+                    continue
+                cumulative, total = child.snapshot()
+                for bound, count in zip(child.bounds + (float("inf"),), cumulative):
+                    le = "+Inf" if bound == float("inf") else _number(bound)
+                    lines.append(f"{family.name}_bucket{_labels({**labels, 'le': le})} {count}")
+                lines.append(f"{family.name}_sum{_labels(labels)} {_number(total)}")
+                lines.append(f"{family.name}_count{_labels(labels)} {cumulative[-1]}")
+
+        in_flight = f"{self.prefix}_http_requests_in_flight"
+        lines.append(f"# HELP {in_flight} HTTP requests being served")
+        lines.append(f"# TYPE {in_flight} gauge")
+        finished = dict(self.finished.children())
+        for values, started in sorted(self.started.children(), key=lambda item: item[0]):
+            done = finished.get(values)
+            value = started.value() - (done.value() if done is not None else 0)
+            lines.append(f"{in_flight}{_labels(dict(zip(self.started.labelnames, values)))} {_number(value)}")
+
+        for name, help, samples in gauges:
+            lines.append(f"# HELP {self.prefix}_{name} {help}")
+            lines.append(f"# TYPE {self.prefix}_{name} gauge")
+            for labels, value in samples:
+                lines.append(f"{self.prefix}_{name}{_labels(labels)} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(str(value))}"' for key, value in labels.items()) + "}"
+
+
+def _number(value: float) -> str:
+    if isinstance(value, int) or float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class TelemetryMiddleware:
+    """Pure ASGI middleware timing every HTTP request by route template and status"""
+
+    def __init__(self, app, telemetry: "Telemetry"):
+        self.app = app
+        self.telemetry = telemetry
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        # The route is only known once routing ran, so in-flight requests are counted by method
+        method = scope["method"]
+        self.telemetry.started.labels(method).inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            self.telemetry.finished.labels(method).inc()
+            template = getattr(scope.get("route"), "path", None) or "unmatched"
+            self.telemetry.request_seconds.labels(method, template).observe(time.perf_counter() - start)
+            self.telemetry.requests.labels(method, template, str(status)).inc()
+
+
+# Shared telemetry for the app process
+telemetry = Telemetry()
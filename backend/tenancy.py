@@ -0,0 +1,103 @@
+"""Tenant resolution for requests and the context variable that carries it.
+
+``TenantMiddleware`` resolves the tenant once per request and stores it in
+a ContextVar, which follows the request into threadpool workers and the
+async agents. Storage, the change feed, workflows and the rule registry
+read it through ``current_tenant()``.
+
+With TENANT_API_KEYS set (``key:tenant,key:tenant``), the tenant comes from
+the ``X-API-Key`` header or an ``Authorization: Bearer`` token, and unknown
+keys are rejected. Without it, the TENANT_HEADER value is trusted as-is,
+which suits a deployment behind an authenticating proxy. Requests that
+name no tenant use DEFAULT_TENANT, so single-tenant clients keep working.
+"""
+
+import os
+import re
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional, Tuple
+
+from starlette.responses import JSONResponse
+
+DEFAULT_TENANT = "default"
+TENANT_HEADER = os.getenv("TENANT_HEADER", "X-Tenant-ID")
+TENANT_API_KEYS = os.getenv("TENANT_API_KEYS", "")
+
+# Tenant ids end up in file names (audit segments, SQLite shards)
+TENANT_ID_RE = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+_current_tenant: ContextVar[str] = ContextVar("current_tenant", default=DEFAULT_TENANT)
+
+
+def current_tenant() -> str:
+    return _current_tenant.get()
+
+
+@contextmanager
+def tenant_scope(tenant: str):
+    """Run a block as tenant (for work started outside a request)"""
+    token = _current_tenant.set(tenant)
+    try:
+        yield tenant
+    finally:
+        _current_tenant.reset(token)
+
+
+def parse_api_keys(spec: str) -> Dict[str, str]:
+    """Parse ``key:tenant,key:tenant`` into {key: tenant}"""
+    keys = {}
+    for item in spec.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        key, sep, tenant = item.rpartition(":")
+        if not sep or not key or not TENANT_ID_RE.match(tenant):
+            raise ValueError(f"Invalid TENANT_API_KEYS entry: {item!r}")
+        keys[key] = tenant
+    return keys
+
+
+class TenantMiddleware:
+    """Pure ASGI middleware that sets the current tenant for each request"""
+
+    def __init__(self, app, header: str = TENANT_HEADER, api_keys: Optional[Dict[str, str]] = None):
+        self.app = app
+        self.header = header.lower().encode("latin-1")
+        self.api_keys = parse_api_keys(TENANT_API_KEYS) if api_keys is None else api_keys
+
+    def resolve(self, headers) -> Tuple[Optional[str], Optional[Tuple[int, str]]]:
+        """(tenant, None) for a request's raw headers, or (None, (status, detail)) to reject it"""
+        values = dict(headers)
+        if self.api_keys:
+            key = values.get(b"x-api-key", b"").decode("latin-1")
+            if not key:
+                scheme, _, token = values.get(b"authorization", b"").decode("latin-1").partition(" ")
+                key = token.strip() if scheme.lower() == "bearer" else ""
+            if not key:
+                return DEFAULT_TENANT, None
+            tenant = self.api_keys.get(key)
+            if tenant is None:
+                return None, (401, "Invalid API key")
+            return tenant, None
+        tenant = values.get(self.header, b"").decode("latin-1").strip()
+        if not tenant:
+            return DEFAULT_TENANT, None
+        if not TENANT_ID_RE.match(tenant):
+            return None, (400, "Invalid tenant id")
+        return tenant, None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        tenant, error = self.resolve(scope["headers"])
+        if error is not None:
+            status, detail = error
+            await JSONResponse({"detail": detail}, status_code=status)(scope, receive, send)
+            return
+        token = _current_tenant.set(tenant)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _current_tenant.reset(token)
@@ -0,0 +1,51 @@
+"""Per-store change counters behind the read endpoints' ETags.
+
+Every write to a store bumps that store's version; an ETag derived from the
+versions a response depends on therefore changes whenever the response
+would, and a request whose If-None-Match still matches can be answered with
+304 before the body is built. Each run picks a random epoch that is part of
+every token, so counters restarting at zero never revive an old ETag.
+
+Versions are process-local unless SharedCounters are given (multi-worker
+SQLite, where every worker sees the same data and must agree on them).
+"""
+
+import secrets
+import threading
+from typing import Dict, Optional, Sequence
+
+from shared_state import SharedCounters
+
+STORE_NAMES = ("tasks", "audit", "calendar", "slack", "metrics")
+
+# Slots for the versions in SharedCounters
+VERSION_COUNTER_NAMES = ("version_epoch",) + tuple(f"version_{name}" for name in STORE_NAMES)
+
+
+class StoreVersions:
+    def __init__(self, names: Sequence[str] = STORE_NAMES, counters: Optional[SharedCounters] = None):
+        self.names = tuple(names)
+        self.counters = counters
+        self._lock = threading.Lock()
+        self._versions: Dict[str, int] = dict.fromkeys(self.names, 0)
+        if counters is None:
+            self._epoch = secrets.randbits(62)
+        else:
+            # Workers starting together may each raise it once; that only costs a few extra 200s
+            counters.raise_to("version_epoch", secrets.randbits(62))
+
+    def bump(self, *names: str):
+        if self.counters is not None:
+            self.counters.incr_many({f"version_{name}": 1 for name in names})
+            return
+        with self._lock:
+            for name in names:
+                self._versions[name] += 1
+
+    def token(self, *names: str) -> str:
+        """Changes whenever any of the named stores changed"""
+        if self.counters is not None:
+            values = [self.counters.get("version_epoch")] + [self.counters.get(f"version_{n}") for n in names]
+        else:
+            values = [self._epoch] + [self._versions[n] for n in names]
+        return ".".join(map(str, values))
@@ -32,15 +32,6 @@ function ApprovalButtons({ task, autonomousMode = false, onTaskApproved }: Props
           onTaskApproved();
         }
         
-        // Record metrics - task created
-        try {
-          await fetch(`${API_BASE_URL}/metrics/record-task`, { 
-            method: "POST",
-            headers: { "Content-Type": "application/json" },
-            body: JSON.stringify({ autonomous: autonomousMode })
-          });
-        } catch {}
-        
         setTimeout(() => setMessage(""), 3000);
       }
     } catch (error) {
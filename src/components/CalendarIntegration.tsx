@@ -55,7 +55,7 @@ function CalendarIntegration({ refreshTrigger = 0, prefillData }: Props) {
   const fetchEvents = async () => {
     setLoading(true);
     try {
-      const response = await fetch("http://127.0.0.1:8000/calendar/events");
+      const response = await fetch("http://127.0.0.1:8000/calendar/events?fields=id,title,date,time,attendees,status");
       const data = await response.json();
       setEvents(data.events || []);
     } catch (error) {
@@ -107,15 +107,6 @@ const createEvent = async () => {
         if (data.conflict_warning?.has_conflicts) {
           alert("⚠️ Warning: Calendar conflict detected! Please review suggestions.");
         }
-
-        // Record metrics - meeting scheduled
-        try {
-          await fetch("http://127.0.0.1:8000/metrics/record-meeting", {
-            method: "POST"
-          });
-        } catch (metricError) {
-          console.error("Failed to record meeting metric:", metricError);
-        }
       }
     } catch (error) {
       console.error("Failed to create event:", error);
@@ -66,11 +66,6 @@ Senior Finance Director`;
       } else {
         setResult(data);
       }
-      
-      // Record metrics - email processed
-      try {
-        await fetch(`${API_BASE_URL}/metrics/record-email`, { method: "POST" });
-      } catch {}
     } catch (err) {
       setError(err instanceof Error ? err.message : "Failed to analyze email");
       console.error("Error analyzing email:", err);
@@ -109,11 +104,6 @@ Senior Finance Director`;
           draftReply: data.reply,
           reminder: "Reply generated - ready to send"
         });
-        
-        // Record metrics - email processed
-        try {
-          await fetch(`${API_BASE_URL}/metrics/record-email`, { method: "POST" });
-        } catch {}
       }
     } catch (err) {
       setError(err instanceof Error ? err.message : "Failed to generate smart reply");
@@ -30,7 +30,7 @@ function SlackIntegration({ refreshTrigger = 0 }: Props) {
   const fetchMessages = async () => {
     setLoading(true);
     try {
-      const response = await fetch("http://127.0.0.1:8000/slack/messages");
+      const response = await fetch("http://127.0.0.1:8000/slack/messages?fields=id,channel,message,created_at");
       const data = await response.json();
       setMessages(data.messages || []);
     } catch (error) {
@@ -56,9 +56,6 @@ function SlackIntegration({ refreshTrigger = 0 }: Props) {
 if (data.success) {
         setMessages([...messages, data.data]);
         setNewMessage({ channel: "#general", message: "" });
-        
-        // Record slack metric
-        try { await fetch("http://127.0.0.1:8000/metrics/record-slack", { method: "POST" }); } catch {}
       }
     } catch (error) {
       console.error("Failed to send message:", error);
@@ -42,15 +42,6 @@ const markComplete = async (taskId: number) => {
         method: "POST",
       });
       
-      // Record metrics - task completed
-      try {
-        await fetch("http://127.0.0.1:8000/metrics/record-completion", {
-          method: "POST"
-        });
-      } catch (metricError) {
-        console.error("Failed to record completion metric:", metricError);
-      }
-      
       fetchTasks();
     } catch (error) {
       console.error("Failed to complete task:", error);